@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Benchmark for Crestron device resolution
+
+Builds a synthetic house (2,000 devices by default), then times the token
+index behind crestron_resolve_device against the previous per-request scan
+that lowercased and compared every device. No server or network needed.
+
+Usage:
+    python bench_resolve.py [--devices 2000] [--rounds 200]
+"""
+
+import argparse
+import random
+import statistics
+import time
+from typing import Any, Dict, List, Tuple
+
+from crestron_mcp import ResolutionIndex
+
+ROOM_NAMES = [
+    "Soggiorno", "Cucina", "Camera da Letto", "Bagno", "Studio", "Sala da Pranzo",
+    "Cantina", "Taverna", "Ingresso", "Corridoio", "Lavanderia", "Veranda",
+    "Camera Ospiti", "Cabina Armadio", "Palestra", "Biblioteca",
+]
+DEVICE_KINDS = [
+    ("light", ["Lampadario", "Applique", "Luce", "Luci", "Lampada", "Faretti", "Striscia LED"]),
+    ("shade", ["Tapparella", "Tenda", "Persiana"]),
+    ("sensor", ["Sensore Presenza", "Sensore Porta", "Sensore Luce"]),
+    ("thermostat", ["Termostato"]),
+]
+POSITIONS = ["Nord", "Sud", "Est", "Ovest", "Sinistra", "Destra", "Centrale", "Grande", "Piccola"]
+
+
+def synthetic_house(device_count: int, seed: int = 7) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Rooms named like the real ones (per floor) and devices spread across them."""
+    rng = random.Random(seed)
+    room_count = max(1, device_count // 20)
+    rooms = [
+        {"id": i + 1, "name": f"{ROOM_NAMES[i % len(ROOM_NAMES)]} Piano {i // len(ROOM_NAMES)}",
+         "base": ROOM_NAMES[i % len(ROOM_NAMES)]}
+        for i in range(room_count)
+    ]
+    devices = []
+    for i in range(device_count):
+        device_type, names = rng.choice(DEVICE_KINDS)
+        room = rooms[i % room_count]
+        devices.append({
+            "id": 10_000 + i,
+            "name": f"{rng.choice(names)} {rng.choice(POSITIONS)} {room['base']}",
+            "type": device_type,
+            "roomId": room["id"],
+        })
+    return devices, rooms
+
+
+def utterances(devices: List[Dict[str, Any]], rounds: int, seed: int = 11) -> List[str]:
+    """A mix of exact names, partial names, type+room phrases and misses."""
+    rng = random.Random(seed)
+    phrases = []
+    for _ in range(rounds):
+        device = rng.choice(devices)
+        words = device["name"].split()
+        phrases.append(rng.choice([
+            device["name"].lower(),
+            f"accendi la {' '.join(words[:2]).lower()}",
+            f"luce in {words[-1].lower()} piano {rng.randrange(7)}",
+            "tapparella cucina piano 3",
+            "xyz qualcosa",
+        ]))
+    return phrases
+
+
+def legacy_match(devices: List[Dict[str, Any]], rooms: List[Dict[str, Any]], utterance: str) -> List[Dict[str, Any]]:
+    """The scan crestron_resolve_device did per request before the index."""
+    room_map = {r["id"]: r["name"].lower() for r in rooms}
+    utterance_lower = utterance.lower()
+    matches = []
+    for device in devices:
+        score = 0.0
+        device_name = device.get("name", "").lower()
+        device_type = device.get("type", "").lower()
+        if device_name in utterance_lower or utterance_lower in device_name:
+            score += 0.5
+        if device_type in utterance_lower:
+            score += 0.3
+        room_name = room_map.get(device.get("roomId"))
+        if room_name and room_name in utterance_lower:
+            score += 0.2
+        overlap = set(utterance_lower.split()) & set(device_name.split())
+        if overlap:
+            score += 0.1 * len(overlap)
+        if score > 0:
+            matches.append({"device": device, "score": min(score, 1.0)})
+    matches.sort(key=lambda x: x["score"], reverse=True)
+    return matches
+
+
+def timed(func, phrases: List[str]) -> List[float]:
+    samples = []
+    for phrase in phrases:
+        start = time.perf_counter()
+        func(phrase)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def summary(label: str, samples: List[float]) -> str:
+    ordered = sorted(samples)
+    p95 = ordered[int(len(ordered) * 0.95) - 1] if len(ordered) > 1 else ordered[0]
+    return f"{label:<8} mean {statistics.mean(samples):7.3f} ms   p95 {p95:7.3f} ms   max {ordered[-1]:7.3f} ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--devices", type=int, default=2000)
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    devices, rooms = synthetic_house(args.devices)
+    phrases = utterances(devices, args.rounds)
+
+    index = ResolutionIndex()
+    start = time.perf_counter()
+    index.build(devices, rooms)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    print(f"{len(devices)} devices in {len(rooms)} rooms, {len(phrases)} utterances")
+    print(f"index build {build_ms:.1f} ms, {len(index._by_token)} name tokens")
+    print(summary("legacy", timed(lambda p: legacy_match(devices, rooms, p), phrases)))
+    print(summary("index", timed(lambda p: index.match(p, limit=5), phrases)))
+
+
+if __name__ == "__main__":
+    main()
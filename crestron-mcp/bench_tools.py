@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+End-to-end latency benchmark for the Crestron MCP tools
+
+Starts mock_crestron_server.py in load-test mode with a synthetic house,
+then calls each tool through the real client stack (session, pool,
+coalescing, inventory cache) at a fixed concurrency. Per tool it reports
+p50/p95/p99 latency, throughput, bytes returned and the upstream requests
+the calls caused, and writes everything to a JSON file. Given a baseline
+file from an earlier run, it flags tools that got slower or chattier and
+exits non-zero.
+
+Usage:
+    python bench_tools.py [--devices 2000] [--rooms 100] [--scenes 200]
+                          [--calls 200] [--concurrency 8] [--cold]
+                          [--profile none] [--tools list_devices,resolve_device]
+                          [--out bench_tools.json] [--baseline baseline.json]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+# The mock serves plain HTTP; must be set before crestron_mcp reads it
+os.environ.setdefault("CRESTRON_SCHEME", "http")
+
+import crestron_mcp as cm
+import mock_crestron_server as mock
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Compared against the baseline, per tool
+COMPARED_METRICS = ("p50_ms", "p95_ms", "p99_ms", "upstream_per_call")
+
+
+class House:
+    """Ids and names of the synthetic house, for building tool inputs."""
+
+    def __init__(self, rooms: int, devices: int, scenes: int, seed: int):
+        # Same generator and seed as the server process, so ids line up
+        mock.generate_house(rooms, devices, scenes, seed)
+        self.rooms = [r["id"] for r in mock.ROOMS if r["id"] != 1001]
+        self.names = [d["name"] for d in mock.DEVICES]
+        self.by_type = {t: [d["id"] for d in mock.devices_of_type(t)] for t in ("light", "shade", "thermostat")}
+        self.scenes = [s["id"] for s in mock.SCENES]
+
+
+def scenarios(house: House) -> Dict[str, Tuple[Callable[..., Awaitable[str]], Callable[[random.Random], Any]]]:
+    """Tool name -> (tool function, input factory)."""
+    def pick(rng: random.Random, ids: List[int]) -> int:
+        return rng.choice(ids)
+
+    return {
+        "list_rooms": (cm.crestron_list_rooms, lambda rng: cm.ListRoomsInput(response_format="json")),
+        "list_devices": (cm.crestron_list_devices, lambda rng: cm.ListDevicesInput(
+            room_id=pick(rng, house.rooms), response_format="json")),
+        "list_devices_markdown": (cm.crestron_list_devices, lambda rng: cm.ListDevicesInput(limit=100)),
+        "get_shades": (cm.crestron_get_shades, lambda rng: cm.GetShadesInput(response_format="json", limit=100)),
+        "list_scenes": (cm.crestron_list_scenes, lambda rng: cm.ListScenesInput(response_format="json", limit=100)),
+        "get_thermostats": (cm.crestron_get_thermostats, lambda rng: cm.GetThermostatsInput(response_format="compact")),
+        "get_sensors": (cm.crestron_get_sensors, lambda rng: cm.GetSensorsInput(response_format="json", limit=100)),
+        "resolve_device": (cm.crestron_resolve_device, lambda rng: cm.ResolveDeviceInput(
+            utterance=rng.choice(house.names).lower())),
+        "set_shade_position": (cm.crestron_set_shade_position, lambda rng: cm.SetShadeStateInput(
+            shades=[{"id": pick(rng, house.by_type["shade"]), "position": rng.randrange(101)}])),
+        "activate_scene": (cm.crestron_activate_scene, lambda rng: cm.RecallSceneInput(
+            scene_id=pick(rng, house.scenes))),
+        "set_thermostat_setpoint": (cm.crestron_set_thermostat_setpoint, lambda rng: cm.SetThermostatSetpointInput(
+            thermostat_id=pick(rng, house.by_type["thermostat"]),
+            setpoints=[{"type": "Cool", "temperature": rng.randrange(180, 300, 5)}])),
+        "set_thermostat_mode": (cm.crestron_set_thermostat_mode, lambda rng: cm.SetThermostatModeInput(
+            thermostats=[{"id": pick(rng, house.by_type["thermostat"]), "mode": rng.choice(["HEAT", "COOL"])}])),
+        "set_thermostat_fan": (cm.crestron_set_thermostat_fan, lambda rng: cm.SetThermostatFanInput(
+            thermostats=[{"id": pick(rng, house.by_type["thermostat"]), "mode": rng.choice(["AUTO", "ON"])}])),
+        "batch_command": (cm.crestron_batch_command, lambda rng: cm.BatchCommandInput(commands=[
+            {"id": pick(rng, house.by_type["light"]), "level": rng.randrange(101)},
+            {"id": pick(rng, house.by_type["light"]), "level": rng.randrange(101)},
+            {"id": pick(rng, house.by_type["shade"]), "position": rng.randrange(101)},
+            {"id": pick(rng, house.by_type["thermostat"]), "mode": "AUTO"},
+        ])),
+    }
+
+
+def percentile(ordered: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    rank = max(1, round(pct / 100 * len(ordered) + 0.5 - 1e-9))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+async def run_tool(tool: Callable[..., Awaitable[str]], make_input: Callable[[random.Random], Any],
+                   calls: int, concurrency: int, cold: bool, seed: int) -> Dict[str, Any]:
+    """Call one tool `calls` times from `concurrency` workers and summarise."""
+    rng = random.Random(seed)
+    inputs = [make_input(rng) for _ in range(calls)]
+    samples: List[float] = []
+    sizes: List[int] = []
+    errors = 0
+
+    async def worker() -> None:
+        nonlocal errors
+        while inputs:
+            params = inputs.pop()
+            if cold:
+                cm._inventory.clear()
+            start = time.perf_counter()
+            result = await tool(params)
+            samples.append((time.perf_counter() - start) * 1000)
+            sizes.append(len(result.encode()))
+            if result.startswith("{") and '"error"' in result[:40]:
+                errors += 1
+
+    upstream_before = cm._pool_stats.requests
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - start
+    upstream = cm._pool_stats.requests - upstream_before
+
+    ordered = sorted(samples)
+    return {
+        "calls": calls,
+        "errors": errors,
+        "p50_ms": round(percentile(ordered, 50), 3),
+        "p95_ms": round(percentile(ordered, 95), 3),
+        "p99_ms": round(percentile(ordered, 99), 3),
+        "mean_ms": round(statistics.mean(ordered), 3),
+        "max_ms": round(ordered[-1], 3),
+        "throughput_per_s": round(calls / wall, 1),
+        "bytes_total": sum(sizes),
+        "bytes_mean": round(sum(sizes) / calls),
+        "upstream_requests": upstream,
+        "upstream_per_call": round(upstream / calls, 3),
+    }
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_mock(port: int, args: argparse.Namespace) -> subprocess.Popen:
+    """Launch the mock in load-test mode and wait until it accepts connections."""
+    command = [
+        sys.executable, os.path.join(HERE, "mock_crestron_server.py"), str(port), "--load-test", "--quiet",
+        "--rooms", str(args.rooms), "--devices", str(args.devices), "--scenes", str(args.scenes),
+        "--seed", str(args.seed), "--profile", args.profile, "--fault-seed", str(args.seed),
+    ]
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"mock server exited: {process.stderr.read().decode().strip()}")
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return process
+        except OSError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError("mock server did not start within 30 s")
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """One line per metric that is worse than the baseline by more than `threshold`."""
+    regressions = []
+    for name, now in results["tools"].items():
+        before = baseline.get("tools", {}).get(name)
+        if not before:
+            continue
+        for metric in COMPARED_METRICS:
+            old, new = before.get(metric), now.get(metric)
+            if old is None or new is None:
+                continue
+            # Ignore sub-millisecond noise on latency
+            floor = 0.0 if metric == "upstream_per_call" else 1.0
+            if new > old * (1 + threshold) and new - old > floor:
+                regressions.append(f"{name}: {metric} {old} -> {new}")
+    return regressions
+
+
+def report_line(name: str, m: Dict[str, Any], before: Optional[Dict[str, Any]]) -> str:
+    line = (
+        f"{name:<24} p50 {m['p50_ms']:8.2f}  p95 {m['p95_ms']:8.2f}  p99 {m['p99_ms']:8.2f} ms"
+        f"  {m['throughput_per_s']:8.1f}/s  {m['bytes_mean']:7d} B  up {m['upstream_per_call']:5.2f}"
+    )
+    if m["errors"]:
+        line += f"  errors {m['errors']}"
+    if before:
+        line += f"  (p95 was {before['p95_ms']:.2f})"
+    return line
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    house = House(args.rooms, args.devices, args.scenes, args.seed)
+    available = scenarios(house)
+    selected = args.tools.split(",") if args.tools else list(available)
+    unknown = [t for t in selected if t not in available]
+    if unknown:
+        raise SystemExit(f"Unknown tool(s): {', '.join(unknown)}; available: {', '.join(available)}")
+
+    port = args.port or free_port()
+    process = start_mock(port, args)
+    cm._session.client = cm.create_client()
+    try:
+        await cm.authenticate(f"localhost:{port}", mock.AUTH_TOKEN)
+        tools = {}
+        for i, name in enumerate(selected):
+            tool, make_input = available[name]
+            # Every tool starts from an empty cache; its first call pays the fetch
+            cm._inventory.clear()
+            cm._resolution.clear()
+            tools[name] = await run_tool(tool, make_input, args.calls, args.concurrency, args.cold, args.seed + i)
+        return {
+            "meta": {
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "python": platform.python_version(),
+                "rooms": args.rooms,
+                "devices": args.devices,
+                "scenes": args.scenes,
+                "seed": args.seed,
+                "calls": args.calls,
+                "concurrency": args.concurrency,
+                "cold": args.cold,
+                "profile": args.profile,
+            },
+            "tools": tools,
+        }
+    finally:
+        await cm._session.stop_renewal()
+        await cm._session.client.aclose()
+        process.terminate()
+        process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--devices", type=int, default=2000)
+    parser.add_argument("--rooms", type=int, default=100)
+    parser.add_argument("--scenes", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--calls", type=int, default=200, help="calls per tool")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--cold", action="store_true", help="clear the inventory cache before every call")
+    parser.add_argument("--profile", default="none", help="mock fault profile (see mock_crestron_server.py)")
+    parser.add_argument("--tools", default="", help="comma-separated subset of tools")
+    parser.add_argument("--port", type=int, default=0, help="mock port (default: any free port)")
+    parser.add_argument("--out", default="bench_tools.json")
+    parser.add_argument("--baseline", help="earlier --out file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown before flagging (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    # One INFO line per request would drown the report
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    logging.getLogger("httpcore").setLevel(logging.WARNING)
+
+    results = asyncio.run(run(args))
+    with open(args.out, "w") as f:
+        json.dump(results, f, indent=2)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    meta = results["meta"]
+    print(f"{meta['devices']} devices, {meta['rooms']} rooms, {meta['scenes']} scenes; "
+          f"{meta['calls']} calls per tool at concurrency {meta['concurrency']}"
+          f"{', cold cache' if meta['cold'] else ''}, profile {meta['profile']}")
+    for name, metrics in results["tools"].items():
+        before = baseline["tools"].get(name) if baseline else None
+        print(report_line(name, metrics, before))
+    print(f"results written to {args.out}")
+
+    if baseline:
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"no regressions over {args.threshold:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
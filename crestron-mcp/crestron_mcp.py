@@ -7,12 +7,19 @@ thermostats, sensors, and more through the Crestron Home REST API.
 """
 
 from mcp.server.fastmcp import FastMCP
-from pydantic import BaseModel, Field, field_validator, ConfigDict
-from typing import Optional, List, Dict, Any, Literal
+from pydantic import BaseModel, Field, field_validator, model_validator, ConfigDict
+from typing import Optional, List, Dict, Any, Literal, Tuple
 from enum import Enum
 import httpx
 import json
+import os
 import asyncio
+import base64
+import bisect
+import heapq
+from itertools import islice
+import re
+import unicodedata
 from datetime import datetime
 import time
 from contextlib import asynccontextmanager
@@ -21,6 +28,20 @@ from contextlib import asynccontextmanager
 CHARACTER_LIMIT = 25000
 API_TIMEOUT = 30.0
 SESSION_TIMEOUT = 540  # 9 minutes (10-minute session timeout with 1-minute buffer)
+SESSION_RENEW_AFTER = 480  # log in again in the background before SESSION_TIMEOUT
+SESSION_RENEW_RETRY = 15  # seconds between attempts when a background renewal fails
+
+# Processors only serve HTTPS; "http" is for the mock server (mock_crestron_server.py)
+CRESTRON_SCHEME = os.environ.get("CRESTRON_SCHEME", "https")
+
+# Connection pool to the processor (all requests go to one host over TLS)
+HTTP_MAX_CONNECTIONS = int(os.environ.get("CRESTRON_MAX_CONNECTIONS", "8"))
+HTTP_MAX_KEEPALIVE = int(os.environ.get("CRESTRON_MAX_KEEPALIVE", "8"))
+HTTP_KEEPALIVE_EXPIRY = float(os.environ.get("CRESTRON_KEEPALIVE_EXPIRY", "60"))  # httpx default is 5
+HTTP2_REQUESTED = os.environ.get("CRESTRON_HTTP2", "").lower() in ("1", "true", "yes")
+INVENTORY_STATIC_TTL = 600  # names, types and room assignments rarely change
+INVENTORY_STATE_TTL = 5  # levels, positions, temperatures, presence
+COMPACT_COLUMNAR_MIN = 20  # compact lists this long go columnar unless told otherwise
 
 # FastMCP server will be initialized after lifespan function
 
@@ -32,6 +53,7 @@ class ResponseFormat(str, Enum):
     """Output format for tool responses."""
     MARKDOWN = "markdown"
     JSON = "json"
+    COMPACT = "compact"  # minified JSON, projected fields, optionally columnar
 
 
 class ThermostatMode(str, Enum):
@@ -67,13 +89,23 @@ class SetPointType(str, Enum):
 # ============================================================================
 
 class CrestronSession:
-    """Manages Crestron API authentication and session lifecycle."""
+    """Manages Crestron API authentication and session lifecycle.
+
+    The auth token is kept after the first login so the AuthKey can be
+    renewed without the caller: a background task logs in again before
+    SESSION_TIMEOUT, and a request that finds the session expired (or gets a
+    401) renews it once. Concurrent renewals share a single login.
+    """
     
     def __init__(self):
         self.host: Optional[str] = None
+        self.auth_token: Optional[str] = None
         self.auth_key: Optional[str] = None
         self.session_start: Optional[float] = None
         self.client: Optional[httpx.AsyncClient] = None
+        self.renewals = 0
+        self._login_task: Optional[asyncio.Task] = None
+        self._renewal_task: Optional[asyncio.Task] = None
         
     def is_valid(self) -> bool:
         """Check if session is still valid."""
@@ -82,6 +114,70 @@ class CrestronSession:
         # Check if session has expired (with 1-minute buffer)
         elapsed = time.monotonic() - self.session_start
         return elapsed < SESSION_TIMEOUT
+
+    def can_renew(self) -> bool:
+        """True once a login has succeeded and its token is known."""
+        return bool(self.host and self.auth_token)
+    
+    async def login(self, host: str, auth_token: str) -> Dict[str, Any]:
+        """Log in and adopt the new AuthKey (raises httpx.HTTPStatusError on failure)."""
+        if not self.client:
+            raise RuntimeError("HTTP client not initialized")
+        url = f"{CRESTRON_SCHEME}://{host}/cws/api/login"
+        headers = {"Crestron-RestAPI-AuthToken": auth_token}
+        
+        response = await self.client.get(url, headers=headers)
+        response.raise_for_status()
+        
+        data = response.json()
+        self.host = host
+        self.auth_token = auth_token
+        self.auth_key = data.get("authkey") or data.get("AuthKey")
+        self.session_start = time.monotonic()
+        return data
+
+    async def renew(self, stale_key: Optional[str] = None) -> None:
+        """
+        Log in again with the stored token, joining a login already in flight.
+
+        Args:
+            stale_key: The AuthKey a failed request used; if the session has
+                moved on since, there is nothing to do
+        """
+        if stale_key is not None and self.auth_key != stale_key and self.is_valid():
+            return
+        if self._login_task is None or self._login_task.done():
+            self._login_task = asyncio.get_running_loop().create_task(
+                self.login(self.host, self.auth_token)
+            )
+            self.renewals += 1
+        await asyncio.shield(self._login_task)
+
+    def start_renewal(self) -> None:
+        """Keep the session alive in the background from now on."""
+        if self._renewal_task is None or self._renewal_task.done():
+            self._renewal_task = asyncio.get_running_loop().create_task(self._renewal_loop())
+
+    async def stop_renewal(self) -> None:
+        if self._renewal_task and not self._renewal_task.done():
+            self._renewal_task.cancel()
+            try:
+                await self._renewal_task
+            except asyncio.CancelledError:
+                pass
+        self._renewal_task = None
+
+    async def _renewal_loop(self) -> None:
+        while self.can_renew():
+            due = (self.session_start or 0) + SESSION_RENEW_AFTER - time.monotonic()
+            if due > 0:
+                await asyncio.sleep(due)
+                continue  # the session may have been renewed while we slept
+            try:
+                await self.renew()
+            except Exception:
+                # Requests still renew on demand; try again shortly
+                await asyncio.sleep(SESSION_RENEW_RETRY)
     
     def clear(self):
         """Clear session data."""
@@ -93,17 +189,106 @@ class CrestronSession:
 _session = CrestronSession()
 
 
-@asynccontextmanager
-async def app_lifespan(app):
-    """Manage HTTP client lifecycle."""
-    # Initialize HTTP client with SSL verification disabled for self-signed certs
-    _session.client = httpx.AsyncClient(
+def _http2_available() -> bool:
+    """HTTP/2 needs the optional h2 package (pip install 'httpx[http2]')."""
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class PoolStats:
+    """
+    Connection reuse counters for the Crestron client.
+
+    Fed by httpcore trace events, so a request that opened a new TCP/TLS
+    connection is told apart from one that reused a pooled connection.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        self.requests = 0
+        self.connections_opened = 0
+        self.tls_handshakes = 0
+        self.handshake_ms = 0.0
+
+    async def on_request(self, request: httpx.Request) -> None:
+        """httpx request hook: count the request and attach a tracer to it."""
+        self.requests += 1
+        tls_started: List[float] = []
+
+        async def trace(event: str, info: Dict[str, Any]) -> None:
+            if event == "connection.connect_tcp.complete":
+                self.connections_opened += 1
+            elif event == "connection.start_tls.started":
+                tls_started.append(time.perf_counter())
+            elif event == "connection.start_tls.complete" and tls_started:
+                self.tls_handshakes += 1
+                self.handshake_ms += (time.perf_counter() - tls_started.pop()) * 1000
+
+        request.extensions["trace"] = trace
+
+    def report(self, client: Optional[httpx.AsyncClient]) -> Dict[str, Any]:
+        reused = max(self.requests - self.connections_opened, 0)
+        report = {
+            "requests": self.requests,
+            "connections_opened": self.connections_opened,
+            "tls_handshakes": self.tls_handshakes,
+            "avg_handshake_ms": round(self.handshake_ms / self.tls_handshakes, 1) if self.tls_handshakes else None,
+            "reuse_ratio": round(reused / self.requests, 3) if self.requests else None,
+            "limits": {
+                "max_connections": HTTP_MAX_CONNECTIONS,
+                "max_keepalive": HTTP_MAX_KEEPALIVE,
+                "keepalive_expiry_s": HTTP_KEEPALIVE_EXPIRY,
+                "http2": HTTP2_REQUESTED and _http2_available(),
+            },
+        }
+        # Live pool contents (httpcore internals; best effort)
+        pool = getattr(getattr(client, "_transport", None), "_pool", None)
+        connections = getattr(pool, "connections", None)
+        if connections is not None:
+            report["pool"] = {
+                "open": len(connections),
+                "idle": sum(1 for c in connections if c.is_idle()),
+                "http2": sum(1 for c in connections if "HTTP/2" in repr(c)),
+            }
+        return report
+
+
+# Global pool statistics
+_pool_stats = PoolStats()
+
+
+def create_client() -> httpx.AsyncClient:
+    """
+    HTTP client for the processor, with pool limits and keep-alive tuned for
+    bursts of tool calls to a single host.
+    """
+    # SSL verification disabled for self-signed certs
+    return httpx.AsyncClient(
         verify=False,
         timeout=httpx.Timeout(API_TIMEOUT),
-        follow_redirects=True
+        follow_redirects=True,
+        limits=httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+        ),
+        http2=HTTP2_REQUESTED and _http2_available(),
+        event_hooks={"request": [_pool_stats.on_request]},
     )
+
+
+@asynccontextmanager
+async def app_lifespan(app):
+    """Manage HTTP client lifecycle."""
+    _session.client = create_client()
     yield {"client": _session.client}
     # Cleanup
+    await _session.stop_renewal()
     if _session.client:
         await _session.client.aclose()
 
@@ -119,6 +304,8 @@ async def authenticate(host: str, auth_token: str) -> Dict[str, Any]:
     """
     Authenticate with Crestron Home and obtain session key.
     
+    The token is kept so the session renews itself from then on.
+    
     Args:
         host: Crestron Home hostname or IP
         auth_token: Authorization token from Crestron Home app
@@ -129,25 +316,57 @@ async def authenticate(host: str, auth_token: str) -> Dict[str, Any]:
     Raises:
         httpx.HTTPStatusError: On authentication failure
     """
-    if not _session.client:
-        raise RuntimeError("HTTP client not initialized")
-        
-    url = f"https://{host}/cws/api/login"
-    headers = {"Crestron-RestAPI-AuthToken": auth_token}
-    
-    response = await _session.client.get(url, headers=headers)
-    response.raise_for_status()
-    
-    data = response.json()
+    data = await _session.login(host, auth_token)
     
-    # Update global session
-    _session.host = host
-    _session.auth_key = data.get("authkey") or data.get("AuthKey")
-    _session.session_start = time.monotonic()
+    # Cached inventory belonged to the previous session
+    _inventory.clear()
+    _resolution.clear()
+    _session.start_renewal()
     
     return data
 
 
+class GetCoalescer:
+    """
+    Single-flight for GETs: identical requests in flight at the same time
+    share one upstream request and one parsed result.
+
+    Parallel tool calls (list devices, get shades, resolve device, ...) often
+    ask the processor for the same endpoint at the same moment; only the
+    first goes out. Callers share the returned dict, so they must not mutate
+    it. A caller that is cancelled does not cancel the request for the rest.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[tuple, asyncio.Task] = {}
+        self.upstream = 0
+        self.coalesced = 0
+
+    async def get(self, key: tuple, fetch) -> Dict[str, Any]:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.get_running_loop().create_task(fetch())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._done(key, t))
+            self.upstream += 1
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _done(self, key: tuple, task: asyncio.Task) -> None:
+        self._inflight.pop(key, None)
+        if not task.cancelled():
+            task.exception()  # retrieved, even if every caller was cancelled
+
+    def stats(self) -> Dict[str, Any]:
+        return {"upstream_gets": self.upstream, "coalesced_gets": self.coalesced,
+                "in_flight": len(self._inflight)}
+
+
+# Global GET coalescer
+_coalescer = GetCoalescer()
+
+
 async def api_request(
     endpoint: str,
     method: str = "GET",
@@ -157,6 +376,10 @@ async def api_request(
     """
     Make authenticated request to Crestron API.
     
+    An expired session is renewed first, and a 401 triggers one renewal
+    and retry, as long as a login has succeeded before. Identical GETs in
+    flight at the same time are sent once and share the result.
+    
     Args:
         endpoint: API endpoint path (e.g., "/rooms", "/devices")
         method: HTTP method (GET or POST)
@@ -164,40 +387,453 @@ async def api_request(
         require_auth: Whether authentication is required
         
     Returns:
-        dict: API response data
+        dict: API response data (shared between coalesced GETs; do not mutate)
         
     Raises:
         ValueError: If not authenticated when required
         httpx.HTTPStatusError: On API error
     """
-    if require_auth:
-        if not _session.is_valid():
+    if require_auth and not _session.is_valid():
+        if not _session.can_renew():
             raise ValueError(
                 "Not authenticated or session expired. Please authenticate first using "
                 "crestron_authenticate tool."
             )
+        await _session.renew()
     
     if not _session.client:
         raise RuntimeError("HTTP client not initialized")
-    
-    url = f"https://{_session.host}/cws/api{endpoint}"
-    headers = {}
-    
-    if require_auth and _session.auth_key:
-        headers["Crestron-RestAPI-AuthKey"] = _session.auth_key
+    if method not in ("GET", "POST"):
+        raise ValueError(f"Unsupported HTTP method: {method}")
     
     if method == "GET":
-        response = await _session.client.get(url, headers=headers)
-    elif method == "POST":
-        headers["Content-Type"] = "application/json"
-        response = await _session.client.post(url, headers=headers, json=body)
-    else:
-        raise ValueError(f"Unsupported HTTP method: {method}")
+        return await _coalescer.get(
+            (_session.host, endpoint, require_auth),
+            lambda: _send_request(endpoint, method, body, require_auth),
+        )
+    return await _send_request(endpoint, method, body, require_auth)
+
+
+async def _send_request(
+    endpoint: str,
+    method: str,
+    body: Optional[Dict[str, Any]],
+    require_auth: bool
+) -> Dict[str, Any]:
+    """Send one request, renewing the session and retrying once on a 401."""
+    for attempt in range(2):
+        url = f"{CRESTRON_SCHEME}://{_session.host}/cws/api{endpoint}"
+        headers = {}
+        
+        auth_key = _session.auth_key if require_auth else None
+        if auth_key:
+            headers["Crestron-RestAPI-AuthKey"] = auth_key
+        
+        if method == "GET":
+            response = await _session.client.get(url, headers=headers)
+        else:
+            headers["Content-Type"] = "application/json"
+            response = await _session.client.post(url, headers=headers, json=body)
+        
+        if response.status_code == 401 and require_auth and attempt == 0 and _session.can_renew():
+            # AuthKey rejected early (controller restart, idle timeout): renew once
+            await _session.renew(stale_key=auth_key)
+            continue
+        break
     
     response.raise_for_status()
     return response.json()
 
 
+# ============================================================================
+# Inventory Cache
+# ============================================================================
+
+# Collection name -> (endpoint, response key)
+INVENTORY_COLLECTIONS = {
+    "rooms": ("/rooms", "rooms"),
+    "devices": ("/devices", "devices"),
+    "scenes": ("/scenes", "scenes"),
+    "shades": ("/shades", "shades"),
+    "thermostats": ("/thermostats", "thermostats"),
+    "sensors": ("/sensors", "sensors"),
+}
+
+# Fields that identify and place an item; everything else is live state
+STATIC_FIELDS = ("id", "name", "type", "subType", "roomId")
+
+
+class InventoryIndex:
+    """One cached collection with lookups by id, room and type."""
+
+    def __init__(self, items: List[Dict[str, Any]]):
+        self.items: List[Dict[str, Any]] = []
+        self.by_id: Dict[Any, Dict[str, Any]] = {}
+        self.by_room: Dict[Any, List[Dict[str, Any]]] = {}
+        self.by_type: Dict[str, List[Dict[str, Any]]] = {}
+        self.fetched_at = 0.0
+        self.state_valid = False
+        self.last_changed: List[Any] = []
+        self.layout = 0  # bumped whenever static fields change and the indexes are rebuilt
+        self.update(items)
+
+    @staticmethod
+    def _signature(items: List[Dict[str, Any]]) -> tuple:
+        return tuple(tuple(item.get(f) for f in STATIC_FIELDS) for item in items)
+
+    def update(self, items: List[Dict[str, Any]]) -> None:
+        """Apply a fresh listing, rebuilding the indexes only if static fields changed."""
+        self.last_changed = [
+            item.get("id") for item in items if self.by_id.get(item.get("id")) != item
+        ]
+        if self._signature(items) != self._signature(self.items):
+            self.layout += 1
+            self.items = items
+            self.by_id = {item.get("id"): item for item in items}
+            self.by_room = {}
+            self.by_type = {}
+            for item in items:
+                self.by_room.setdefault(item.get("roomId"), []).append(item)
+                self.by_type.setdefault(item.get("type", "unknown"), []).append(item)
+        elif self.last_changed:
+            # Same items in the same places: swap in only the changed items.
+            # Indexed dicts may be held by callers, so they are never mutated
+            changed = set(self.last_changed)
+            fresh = {item.get("id"): item for item in items if item.get("id") in changed}
+
+            def swap(item: Dict[str, Any]) -> Dict[str, Any]:
+                return fresh.get(item.get("id"), item)
+
+            self.items = [swap(item) for item in self.items]
+            self.by_id = {item_id: swap(item) for item_id, item in self.by_id.items()}
+            self.by_room = {room: [swap(item) for item in group] for room, group in self.by_room.items()}
+            self.by_type = {kind: [swap(item) for item in group] for kind, group in self.by_type.items()}
+        self.fetched_at = time.monotonic()
+        self.state_valid = True
+
+    def age(self) -> float:
+        return time.monotonic() - self.fetched_at
+
+
+class InventoryCache:
+    """
+    Shared in-process cache of rooms, devices, scenes and per-type listings.
+
+    Callers say how fresh they need the data: static lookups (names, rooms,
+    types) accept INVENTORY_STATIC_TTL, anything showing live state asks for
+    INVENTORY_STATE_TTL. Write tools invalidate the state of the collections
+    they touch, so the next state read refetches while name lookups keep
+    using the cached index. Concurrent refreshes of a collection share one
+    request.
+    """
+
+    def __init__(self):
+        self._collections: Dict[str, InventoryIndex] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self.hits = 0
+        self.fetches = 0
+
+    async def get(self, name: str, state: bool = True) -> InventoryIndex:
+        """
+        Return a collection, refetching it if it is too old for the caller.
+
+        Args:
+            name: Collection name (see INVENTORY_COLLECTIONS)
+            state: True if the caller shows live state, False for static fields only
+        """
+        cached = self._collections.get(name)
+        if self._fresh(cached, state):
+            self.hits += 1
+            return cached
+        lock = self._locks.setdefault(name, asyncio.Lock())
+        async with lock:
+            cached = self._collections.get(name)
+            if self._fresh(cached, state):
+                self.hits += 1
+                return cached
+            endpoint, key = INVENTORY_COLLECTIONS[name]
+            data = await api_request(endpoint)
+            self.fetches += 1
+            items = data.get(key, [])
+            if cached is None:
+                cached = self._collections[name] = InventoryIndex(items)
+            else:
+                cached.update(items)
+            return cached
+
+    def fresh(self, name: str, state: bool = True) -> bool:
+        """True if get(name, state) would be answered without a request."""
+        return self._fresh(self._collections.get(name), state)
+
+    @staticmethod
+    def _fresh(cached: Optional[InventoryIndex], state: bool) -> bool:
+        if cached is None:
+            return False
+        if state:
+            return cached.state_valid and cached.age() < INVENTORY_STATE_TTL
+        return cached.age() < INVENTORY_STATIC_TTL
+
+    def invalidate_state(self, *names: str) -> None:
+        """Mark live state stale after a write; static lookups stay cached."""
+        for name in names:
+            if name in self._collections:
+                self._collections[name].state_valid = False
+
+    def clear(self) -> None:
+        """Drop everything (e.g. after authenticating against another host)."""
+        self._collections.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "hits": self.hits,
+            "fetches": self.fetches,
+            "collections": {
+                name: {"items": len(c.items), "age_s": round(c.age(), 1), "state_valid": c.state_valid}
+                for name, c in self._collections.items()
+            },
+        }
+
+
+# Global inventory cache
+_inventory = InventoryCache()
+
+
+# Function words and command verbs dropped from names and utterances (IT + EN)
+STOPWORDS = frozenset("""
+    il lo la i gli le l un uno una di d del dello della dei degli delle in nel nello nella
+    nei negli nelle a al allo alla ai agli alle da dal dalla dai su sul sulla con per e o
+    accendi spegni apri chiudi alza abbassa imposta metti
+    the a an of in on at to for and or my please turn switch off open close set dim
+""".split())
+
+# Words that name a device type, in either language -> Crestron device type
+TYPE_SYNONYMS = {
+    "light": "light", "lights": "light", "lamp": "light", "lamps": "light",
+    "luce": "light", "luci": "light", "lampada": "light", "lampade": "light",
+    "lampadario": "light", "lampadari": "light", "chandelier": "light",
+    "shade": "shade", "shades": "shade", "blind": "shade", "blinds": "shade",
+    "tapparella": "shade", "tapparelle": "shade", "tenda": "shade", "tende": "shade",
+    "persiana": "shade", "persiane": "shade", "curtain": "shade", "curtains": "shade",
+    "thermostat": "thermostat", "thermostats": "thermostat", "termostato": "thermostat",
+    "termostati": "thermostat", "clima": "thermostat", "heating": "thermostat",
+    "riscaldamento": "thermostat",
+    "sensor": "sensor", "sensors": "sensor", "sensore": "sensor", "sensori": "sensor",
+    "lock": "lock", "locks": "lock", "serratura": "lock", "serrature": "lock",
+}
+
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_tokens(text: str) -> List[str]:
+    """Lowercase, fold accents, split on punctuation and drop stopwords.
+
+    A text made only of stopwords keeps its words, so no name indexes as empty.
+    """
+    folded = unicodedata.normalize("NFKD", text.lower())
+    folded = "".join(ch for ch in folded if not unicodedata.combining(ch))
+    words = [w for w in _NON_WORD.split(folded) if w]
+    return [w for w in words if w not in STOPWORDS] or words
+
+
+class DeviceEntry:
+    """A device joined with its room, reduced to normalized tokens."""
+
+    __slots__ = ("device", "tokens", "canonical", "type", "room_id", "room_tokens")
+
+    def __init__(self, device: Dict[str, Any], room_tokens: frozenset):
+        self.device = device
+        self.tokens = frozenset(normalize_tokens(device.get("name", "")))
+        # Type words replaced by their type, so "luce cucina" says all of "Luci Cucina"
+        self.canonical = frozenset(TYPE_SYNONYMS.get(t, t) for t in self.tokens)
+        device_type = device.get("type", "").lower()
+        self.type = TYPE_SYNONYMS.get(device_type, device_type)
+        self.room_id = device.get("roomId")
+        self.room_tokens = room_tokens
+
+
+class ResolutionIndex:
+    """
+    Devices joined with room names, indexed for crestron_resolve_device.
+
+    Built once per inventory layout: every device name and room name is
+    normalized (accents folded, stopwords dropped) and posted in inverted
+    maps from name token, type and room token to device positions. A resolve
+    normalizes the utterance, collects the devices those maps point at and
+    scores only them.
+
+    Lookups never wait on the network once the index exists: if the
+    inventory has aged past its static TTL the current index is served while
+    one background refresh fetches devices and rooms concurrently.
+    """
+
+    # Shortest utterance word expanded to the name words it prefixes ("lamp")
+    PREFIX_MIN = 3
+
+    def __init__(self):
+        self.entries: List[DeviceEntry] = []
+        self._by_token: Dict[str, List[int]] = {}
+        self._by_type: Dict[str, List[int]] = {}
+        self._rooms_by_token: Dict[str, List[Any]] = {}  # room token -> room ids
+        self._room_tokens: Dict[Any, frozenset] = {}
+        self._by_room_id: Dict[Any, List[int]] = {}
+        self._vocabulary: List[str] = []  # sorted name tokens, for prefix lookups
+        self._type_named: List[int] = []  # names made only of type words ("Luci")
+        self._layout: tuple = ()  # (devices, their layout, rooms, their layout) last built from
+        self._device_items: List[Dict[str, Any]] = []
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    @property
+    def built(self) -> bool:
+        return bool(self._layout)
+
+    async def get(self) -> "ResolutionIndex":
+        if not self.built:
+            await self.refresh()
+        elif not (_inventory.fresh("devices", state=False) and _inventory.fresh("rooms", state=False)):
+            self.refresh_in_background()
+        return self
+
+    async def refresh(self) -> None:
+        """Fetch devices and rooms at once and rebuild if their layout changed."""
+        devices, rooms = await asyncio.gather(
+            _inventory.get("devices", state=False),
+            _inventory.get("rooms", state=False),
+        )
+        layout = (devices, devices.layout, rooms, rooms.layout)
+        if layout != self._layout:
+            self.build(devices.items, rooms.items)
+            self._layout = layout
+        elif devices.items is not self._device_items:
+            # Same layout, newer state: same devices in the same order, so only
+            # point the entries at the current dicts
+            for entry, device in zip(self.entries, devices.items):
+                entry.device = device
+        self._device_items = devices.items
+
+    def build(self, devices: List[Dict[str, Any]], rooms: List[Dict[str, Any]]) -> None:
+        """Compile the token, type and room postings for a device/room listing."""
+        self._room_tokens = {r.get("id"): frozenset(normalize_tokens(r.get("name", ""))) for r in rooms}
+        self._rooms_by_token = {}
+        for room_id, tokens in self._room_tokens.items():
+            for token in tokens:
+                self._rooms_by_token.setdefault(token, []).append(room_id)
+        self.entries = [
+            DeviceEntry(d, self._room_tokens.get(d.get("roomId"), frozenset())) for d in devices
+        ]
+        self._by_token, self._by_type, self._by_room_id = {}, {}, {}
+        for position, entry in enumerate(self.entries):
+            for token in entry.tokens:
+                self._by_token.setdefault(token, []).append(position)
+            self._by_type.setdefault(entry.type, []).append(position)
+            self._by_room_id.setdefault(entry.room_id, []).append(position)
+        type_words = set(TYPE_SYNONYMS.values())
+        self._type_named = [p for p, e in enumerate(self.entries) if e.canonical <= type_words]
+        self._vocabulary = sorted(self._by_token)
+
+    def refresh_in_background(self) -> None:
+        """Start a refresh unless one is already running (errors keep the old index)."""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.get_running_loop().create_task(self._refresh_quietly())
+
+    async def _refresh_quietly(self) -> None:
+        try:
+            await self.refresh()
+        except Exception:
+            pass
+
+    def clear(self) -> None:
+        self.entries = []
+        self._layout = ()
+        self._device_items = []
+        self._by_token, self._by_type, self._by_room_id = {}, {}, {}
+        self._rooms_by_token, self._room_tokens = {}, {}
+        self._vocabulary = []
+        self._type_named = []
+        if self._refresh_task and not self._refresh_task.done():
+            self._refresh_task.cancel()
+        self._refresh_task = None
+
+    def _prefixed(self, token: str) -> List[str]:
+        """Name tokens starting with token ("lampad" -> lampada, lampadario)."""
+        start = bisect.bisect_left(self._vocabulary, token)
+        end = bisect.bisect_left(self._vocabulary, token + "\uffff")
+        return self._vocabulary[start:end]
+
+    def match(self, utterance: str, preferred_room_id: Optional[int] = None,
+              limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Score the devices the utterance's tokens point at, best first.
+
+        Devices reached only through their type score a flat 0.3, so they are
+        merged in inventory order without being scored one by one; with a
+        limit, only as many as can still make the cut are looked at.
+        """
+        words = set(normalize_tokens(utterance))
+        types = {TYPE_SYNONYMS.get(w, w) for w in words}  # words with type synonyms folded
+
+        # Per utterance word, the devices with a name word it equals or prefixes
+        word_hits = []
+        for word in words:
+            hits = set(self._by_token.get(word, ()))
+            if len(word) >= self.PREFIX_MIN:
+                for token in self._prefixed(word):
+                    hits.update(self._by_token[token])
+            word_hits.append(hits)
+        # Utterance is part of the name: every word hits the same device
+        partial = set.intersection(*word_hits) if word_hits else set()
+
+        candidates = set().union(*word_hits)
+        # Rooms whose whole name was said
+        for room_id in {r for word in words for r in self._rooms_by_token.get(word, ())}:
+            if self._room_tokens[room_id] <= words:
+                candidates.update(self._by_room_id.get(room_id, ()))
+        if preferred_room_id:
+            candidates.update(self._by_room_id.get(preferred_room_id, ()))
+        candidates.update(self._type_named)
+
+        scored = []
+        for position in candidates:
+            entry = self.entries[position]
+            score = 0.0
+
+            # Name match: the whole name said, or the utterance a part of the name
+            if entry.canonical <= types or position in partial:
+                score += 0.5
+
+            # Type match, through the IT/EN synonyms
+            if entry.type in types:
+                score += 0.3
+
+            # Room context match
+            if preferred_room_id and entry.room_id == preferred_room_id:
+                score += 0.2
+            elif entry.room_tokens and entry.room_tokens <= words:
+                score += 0.2
+
+            # Word overlap scoring
+            overlap = entry.tokens & words
+            if overlap:
+                score += 0.1 * len(overlap)
+
+            if score > 0:
+                scored.append((min(score, 1.0), position))
+
+        # Everything else of a named type scores exactly 0.3 (postings are in
+        # inventory order, so the first `limit` of them are the ones that rank)
+        type_postings = heapq.merge(*(self._by_type.get(t, ()) for t in types))
+        type_only = (p for p in type_postings if p not in candidates)
+        flat = [(0.3, p) for p in (type_only if limit is None else islice(type_only, limit))]
+
+        # Best first, inventory order among equal scores
+        ranked = scored + flat
+        rank = lambda x: (-x[0], x[1])
+        ranked = sorted(ranked, key=rank) if limit is None else heapq.nsmallest(limit, ranked, key=rank)
+        return [{"device": self.entries[p].device, "score": score} for score, p in ranked]
+
+
+# Global resolution index
+_resolution = ResolutionIndex()
+
+
 def format_markdown_list(items: List[Dict[str, Any]], fields: List[str]) -> str:
     """Format list of items as markdown table."""
     if not items:
@@ -239,6 +875,244 @@ def truncate_response(response: str, items_count: int = 0) -> str:
     return truncated + truncation_msg
 
 
+class MarkdownRenderer:
+    """
+    Markdown written into a list of parts against a character budget.
+
+    Items are added whole or not at all; once one does not fit the renderer
+    stops accepting more, so a large listing is never rendered past the
+    point where it would be cut. Room is kept for the footer that says how
+    many items were left out and which cursor continues the listing.
+    """
+
+    FOOTER_RESERVE = 300
+
+    def __init__(self, budget: int = CHARACTER_LIMIT):
+        self.budget = budget - self.FOOTER_RESERVE
+        self.parts: List[str] = []
+        self.size = 0
+        self.emitted = 0
+        self.full = False
+
+    def text(self, text: str) -> None:
+        """Write text that is not an item (titles)."""
+        self.parts.append(text)
+        self.size += len(text)
+
+    def item(self, text: str, heading: Optional[str] = None) -> bool:
+        """Write one item, preceded by its group heading; False once out of budget."""
+        if self.full:
+            return False
+        size = len(text) + (len(heading) if heading else 0)
+        if self.size + size > self.budget and self.emitted:
+            self.full = True
+            return False
+        if heading:
+            self.parts.append(heading)
+        self.parts.append(text)
+        self.size += size
+        self.emitted += 1
+        return True
+
+    def finish(self, total: int, offset: int = 0, next_cursor: Optional[str] = None) -> str:
+        """Join the parts, with a continuation footer if items were left out."""
+        omitted = total - offset - self.emitted
+        if omitted > 0 and next_cursor:
+            self.parts.append(
+                f"\n---\nShowing items {offset + 1}-{offset + self.emitted} of {total}; "
+                f"{omitted} more not shown. Call again with cursor=\"{next_cursor}\" "
+                "for the next page, or narrow the filters.\n"
+            )
+        return "".join(self.parts)
+
+
+def _item_id(item: Dict[str, Any]) -> int:
+    return item.get("id") or 0
+
+
+def encode_cursor(key: tuple) -> str:
+    """Opaque cursor for the sort key of the last item a page returned."""
+    return base64.urlsafe_b64encode(json.dumps(list(key)).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, width: int) -> tuple:
+    """Sort key from a cursor; ValueError if it is not one of ours."""
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (ValueError, TypeError):
+        key = None
+    if not isinstance(key, list) or len(key) != width:
+        raise ValueError(f"Invalid cursor '{cursor}'. Use next_cursor from the previous response or omit it.")
+    return tuple(key)
+
+
+def paginate(
+    items: List[Dict[str, Any]],
+    sort_key,
+    cursor: Optional[str] = None,
+) -> Tuple[List[Dict[str, Any]], List[tuple], int]:
+    """
+    Order items by a stable key and find where a page starts.
+
+    The cursor names the last item already returned (keyset pagination), so
+    items added or removed between calls neither repeat nor get skipped.
+
+    Returns:
+        (ordered items, their keys, index of the first item of this page)
+    """
+    ordered = sorted(items, key=sort_key)
+    keys = [sort_key(item) for item in ordered]
+    start = 0
+    if cursor:
+        after = decode_cursor(cursor, len(keys[0]) if keys else 1)
+        try:
+            start = bisect.bisect_right(keys, after)
+        except TypeError:
+            raise ValueError(f"Invalid cursor '{cursor}'. Use next_cursor from the previous response or omit it.")
+    return ordered, keys, start
+
+
+def page_json(
+    items: List[Dict[str, Any]],
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+) -> Dict[str, Any]:
+    """One page of items in id order, with the cursor for the next page."""
+    ordered, keys, start = paginate(items, lambda item: (_item_id(item),), cursor)
+    end = len(ordered) if limit is None else min(start + limit, len(ordered))
+    return {
+        "items": ordered[start:end],
+        "total": len(ordered),
+        "next_cursor": encode_cursor(keys[end - 1]) if end < len(ordered) else None,
+    }
+
+
+def render_grouped_markdown(
+    title: str,
+    items: List[Dict[str, Any]],
+    group_of,
+    heading,
+    render_item,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    group_end: str = "",
+) -> str:
+    """
+    Render one page of a listing grouped into sections, within CHARACTER_LIMIT.
+
+    Items are ordered by group, then id. A page ends at `limit` items or when
+    the character budget runs out, whichever comes first.
+
+    Args:
+        title: Title line, without the count
+        items: Items to list (already filtered)
+        group_of: Item -> group key (str); groups are listed in sorted order
+        heading: (group key, group size) -> section heading
+        render_item: Item -> markdown for that item
+        cursor: next_cursor of the previous page
+        limit: Maximum items on this page
+        group_end: Text written after the last item of each group
+
+    Returns:
+        str: The page, ending with a footer carrying the next cursor if more remain
+    """
+    ordered, keys, start = paginate(items, lambda item: (group_of(item), _item_id(item)), cursor)
+    group_sizes: Dict[Any, int] = {}
+    for key in keys:
+        group_sizes[key[0]] = group_sizes.get(key[0], 0) + 1
+    end = len(ordered) if limit is None else min(start + limit, len(ordered))
+
+    renderer = MarkdownRenderer()
+    renderer.text(f"# {title} ({len(items)} total)\n\n")
+    previous = keys[start - 1][0] if start else None
+    for position in range(start, end):
+        group = keys[position][0]
+        section = heading(group, group_sizes[group]) if group != previous or renderer.emitted == 0 else None
+        text = render_item(ordered[position])
+        if group_end and (position + 1 == len(ordered) or keys[position + 1][0] != group):
+            text += group_end
+        if not renderer.item(text, section):
+            break
+        previous = group
+    last = start + renderer.emitted
+    next_cursor = encode_cursor(keys[last - 1]) if last < len(ordered) and renderer.emitted else None
+    return renderer.finish(len(ordered), start, next_cursor)
+
+
+# Fields kept by the compact format when the caller names none, by device type
+# (or by collection, for items without a known type)
+COMPACT_DEFAULT_FIELDS = {
+    "rooms": ["id", "name"],
+    "scenes": ["id", "name", "type", "status", "roomId"],
+    "devices": ["id", "name", "type", "subType", "roomId"],
+    "light": ["id", "name", "type", "roomId", "level"],
+    "shade": ["id", "name", "type", "roomId", "position", "connectionStatus"],
+    "thermostat": ["id", "name", "type", "roomId", "mode", "currentTemperature", "setPoint", "currentFanMode"],
+    "sensor": ["id", "name", "type", "subType", "roomId", "presence", "level", "door status", "battery level"],
+}
+COMPACT_DEFAULT_FIELDS.update({
+    "shades": COMPACT_DEFAULT_FIELDS["shade"],
+    "thermostats": COMPACT_DEFAULT_FIELDS["thermostat"],
+    "sensors": COMPACT_DEFAULT_FIELDS["sensor"],
+})
+
+
+def compact_items(
+    items: List[Dict[str, Any]],
+    collection: str,
+    fields: Optional[List[str]] = None,
+    columnar: Optional[bool] = None,
+) -> Any:
+    """
+    Project items to the requested (or default) fields for the compact format.
+
+    Args:
+        items: Items to project
+        collection: Collection name, for the defaults of items without a known type
+        fields: Fields to keep; None for the per-type defaults
+        columnar: Encode as column/row tables; None to do so for lists of
+            COMPACT_COLUMNAR_MIN items or more
+
+    Returns:
+        A list of projected dicts (missing fields left out), or in columnar form
+        a list of {"columns": [...], "rows": [[...]]} tables, one per field set
+        (missing fields as null)
+    """
+    def keep(item: Dict[str, Any]) -> List[str]:
+        if fields:
+            return fields
+        return COMPACT_DEFAULT_FIELDS.get(item.get("type"), COMPACT_DEFAULT_FIELDS[collection])
+
+    if columnar is None:
+        columnar = len(items) >= COMPACT_COLUMNAR_MIN
+    if not columnar:
+        return [{f: item[f] for f in keep(item) if f in item} for item in items]
+
+    # One table per field set (one per device type with the defaults), so a
+    # mixed listing does not pad every row with the other types' columns
+    tables: Dict[tuple, List[List[Any]]] = {}
+    for item in items:
+        columns = tuple(keep(item))
+        tables.setdefault(columns, []).append([item.get(field) for field in columns])
+    return [{"columns": list(columns), "rows": rows} for columns, rows in tables.items()]
+
+
+def format_json(payload: Dict[str, Any], params: BaseModel, list_key: Optional[str] = None) -> str:
+    """
+    Serialize a JSON/compact response.
+
+    In compact format the list under list_key is projected (see compact_items)
+    and the output is minified; otherwise it is indented JSON as before.
+    """
+    if params.response_format != ResponseFormat.COMPACT:
+        return json.dumps(payload, indent=2)
+    if list_key is not None:
+        payload[list_key] = compact_items(
+            payload[list_key], list_key, getattr(params, "fields", None), getattr(params, "columnar", None)
+        )
+    return json.dumps(payload, separators=(",", ":"), ensure_ascii=False)
+
+
 def format_device_markdown(device: Dict[str, Any]) -> str:
     """Format a single device as markdown."""
     lines = [f"### {device.get('name', 'Unknown')} (ID: {device.get('id')})"]
@@ -287,6 +1161,36 @@ def format_device_markdown(device: Dict[str, Any]) -> str:
     return "\n".join(lines)
 
 
+def format_shade_markdown(shade: Dict[str, Any]) -> str:
+    """Format a single shade as markdown."""
+    position = int(shade.get('position', 0) * 100 / 65535)
+    return (
+        f"### {shade.get('name')} (ID: {shade.get('id')})\n"
+        f"- **Position**: {position}% open\n"
+        f"- **Connection**: {shade.get('connectionStatus', 'unknown')}\n"
+        f"- **Room ID**: {shade.get('roomId')}\n"
+        f"- **Subtype**: {shade.get('subType')}\n\n"
+    )
+
+
+def format_sensor_markdown(sensor: Dict[str, Any]) -> str:
+    """Format a single sensor reading as markdown."""
+    lines = [f"### {sensor.get('name')} (ID: {sensor.get('id')})"]
+    if 'presence' in sensor:
+        lines.append(f"- **Presence**: {sensor['presence']}")
+    if 'level' in sensor:
+        lines.append(f"- **Light Level**: {sensor['level']}")
+    if 'door status' in sensor:
+        lines.append(f"- **Door Status**: {sensor['door status']}")
+    if 'battery level' in sensor:
+        lines.append(f"- **Battery**: {sensor['battery level']}")
+    if 'connectionStatus' in sensor:
+        lines.append(f"- **Connection**: {sensor['connectionStatus']}")
+    lines.append(f"- **Room ID**: {sensor.get('roomId')}")
+    lines.append("")
+    return "\n".join(lines) + "\n"
+
+
 # ============================================================================
 # Authentication Tool
 # ============================================================================
@@ -326,7 +1230,8 @@ async def crestron_authenticate(params: AuthenticateInput) -> str:
     Authenticate with Crestron Home system and establish a session.
     
     This tool must be called first before using any other Crestron tools. The session
-    expires after 10 minutes of inactivity. Generate the auth token in the Crestron Home
+    expires after 10 minutes of inactivity; the server renews it in the background
+    with the same token, so it only needs calling again to switch host or token. Generate the auth token in the Crestron Home
     mobile app under: Installer Settings → System Control Options → Web API Settings → Update Token
     
     Args:
@@ -341,17 +1246,23 @@ async def crestron_authenticate(params: AuthenticateInput) -> str:
                 "host": "192.168.1.100",
                 "authenticated": true,
                 "session_valid_for": "10 minutes",
+                "auto_renew": true,
                 "api_version": "2.0"
             }
     """
     try:
         result = await authenticate(params.host, params.auth_token)
+        # Build the resolution index now so the first voice command finds it ready;
+        # its two concurrent fetches also leave a second TLS connection in the
+        # keep-alive pool next to the one the login opened
+        _resolution.refresh_in_background()
         
         response = {
             "status": "success",
             "host": params.host,
             "authenticated": True,
             "session_valid_for": "10 minutes",
+            "auto_renew": True,
             "api_version": result.get("version", "unknown"),
             "message": "Successfully authenticated with Crestron Home. You can now use other tools."
         }
@@ -389,7 +1300,18 @@ class ListRoomsInput(BaseModel):
     
     response_format: ResponseFormat = Field(
         default=ResponseFormat.MARKDOWN,
-        description="Output format: 'markdown' for human-readable or 'json' for machine-readable"
+        description=(
+            "Output format: 'markdown' for human-readable, 'json' for machine-readable, "
+            "'compact' for minified JSON with only the chosen fields"
+        )
+    )
+    fields: Optional[List[str]] = Field(
+        default=None,
+        description="Compact format: room fields to return (e.g. ['id', 'name']); default id and name"
+    )
+    columnar: Optional[bool] = Field(
+        default=None,
+        description="Compact format: encode the list as columns + rows; default for long lists"
     )
 
 
@@ -412,7 +1334,7 @@ async def crestron_list_rooms(params: ListRoomsInput) -> str:
     
     Args:
         params (ListRoomsInput): Input parameters containing:
-            - response_format (str): Output format ('markdown' or 'json')
+            - response_format (str): Output format ('markdown', 'json' or 'compact')
     
     Returns:
         str: List of rooms with their IDs and names in specified format:
@@ -420,11 +1342,10 @@ async def crestron_list_rooms(params: ListRoomsInput) -> str:
             JSON: Array of room objects with 'id' and 'name' fields
     """
     try:
-        data = await api_request("/rooms")
-        rooms = data.get("rooms", [])
+        rooms = (await _inventory.get("rooms", state=False)).items
         
-        if params.response_format == ResponseFormat.JSON:
-            result = json.dumps({"rooms": rooms, "count": len(rooms)}, indent=2)
+        if params.response_format != ResponseFormat.MARKDOWN:
+            result = format_json({"rooms": rooms, "count": len(rooms)}, params, "rooms")
         else:
             # Markdown format
             if not rooms:
@@ -461,9 +1382,30 @@ class ListDevicesInput(BaseModel):
             "'sensor', 'lock', 'security Device', 'media Zone'"
         )
     )
+    limit: Optional[int] = Field(
+        default=None,
+        description="Maximum items to return (pages of a large system); omit for as many as fit",
+        ge=1,
+        le=500
+    )
+    cursor: Optional[str] = Field(
+        default=None,
+        description="next_cursor from the previous page (JSON field, or the markdown footer)"
+    )
     response_format: ResponseFormat = Field(
         default=ResponseFormat.MARKDOWN,
-        description="Output format: 'markdown' for human-readable or 'json' for machine-readable"
+        description=(
+            "Output format: 'markdown' for human-readable, 'json' for machine-readable, "
+            "'compact' for minified JSON with only the chosen fields"
+        )
+    )
+    fields: Optional[List[str]] = Field(
+        default=None,
+        description="Compact format: fields to return (e.g. ['id', 'name', 'level']); default per device type"
+    )
+    columnar: Optional[bool] = Field(
+        default=None,
+        description="Compact format: encode the list as columns + rows; default for long lists"
     )
 
 
@@ -489,33 +1431,41 @@ async def crestron_list_devices(params: ListDevicesInput) -> str:
         params (ListDevicesInput): Input parameters containing:
             - room_id (Optional[int]): Filter by room ID
             - device_type (Optional[str]): Filter by device type
-            - response_format (str): Output format ('markdown' or 'json')
+            - limit (Optional[int]): Maximum items on this page
+            - cursor (Optional[str]): next_cursor of the previous page
+            - response_format (str): Output format ('markdown', 'json' or 'compact')
     
     Returns:
         str: List of devices with their properties in specified format:
-            Markdown: Formatted list with device details grouped by type
-            JSON: Array of device objects with all available fields
+            Markdown: Formatted list with device details grouped by type, rendered
+                up to CHARACTER_LIMIT with a footer giving the next cursor if cut off
+            JSON: Page of device objects with all available fields, plus "total" and
+                "next_cursor" (null on the last page)
     """
     try:
-        data = await api_request("/devices")
-        devices = data.get("devices", [])
+        inventory = await _inventory.get("devices")
         
-        # Apply filters
+        # Apply filters (room via the index)
         if params.room_id is not None:
-            devices = [d for d in devices if d.get("roomId") == params.room_id]
+            devices = list(inventory.by_room.get(params.room_id, []))
+        else:
+            devices = list(inventory.items)
         
         if params.device_type:
             devices = [d for d in devices if d.get("type") == params.device_type]
         
-        if params.response_format == ResponseFormat.JSON:
-            result = json.dumps({
-                "devices": devices,
-                "count": len(devices),
+        if params.response_format != ResponseFormat.MARKDOWN:
+            page = page_json(devices, params.cursor, params.limit)
+            result = format_json({
+                "devices": page["items"],
+                "count": len(page["items"]),
+                "total": page["total"],
+                "next_cursor": page["next_cursor"],
                 "filters": {
                     "room_id": params.room_id,
                     "device_type": params.device_type
                 }
-            }, indent=2)
+            }, params, "devices")
         else:
             # Markdown format
             if not devices:
@@ -527,22 +1477,16 @@ async def crestron_list_devices(params: ListDevicesInput) -> str:
                 filter_str = " with " + " and ".join(filter_msg) if filter_msg else ""
                 result = f"No devices found{filter_str}."
             else:
-                result = f"# Devices ({len(devices)} total)\n\n"
-                
-                # Group by type
-                by_type: Dict[str, List[Dict[str, Any]]] = {}
-                for device in devices:
-                    dtype = device.get('type', 'unknown')
-                    if dtype not in by_type:
-                        by_type[dtype] = []
-                    by_type[dtype].append(device)
-                
-                for dtype, devices_of_type in sorted(by_type.items()):
-                    result += f"## {dtype.title()} ({len(devices_of_type)})\n\n"
-                    for device in devices_of_type:
-                        result += format_device_markdown(device)
-        
-        return truncate_response(result, len(devices))
+                result = render_grouped_markdown(
+                    "Devices", devices,
+                    group_of=lambda d: d.get('type', 'unknown'),
+                    heading=lambda dtype, n: f"## {dtype.title()} ({n})\n\n",
+                    render_item=format_device_markdown,
+                    cursor=params.cursor,
+                    limit=params.limit,
+                )
+        
+        return result
         
     except ValueError as e:
         return json.dumps({"error": str(e)}, indent=2)
@@ -566,9 +1510,30 @@ class GetShadesInput(BaseModel):
         description="Optional shade ID to get specific shade (e.g., 1184). Omit to get all shades.",
         ge=1
     )
+    limit: Optional[int] = Field(
+        default=None,
+        description="Maximum items to return (pages of a large system); omit for as many as fit",
+        ge=1,
+        le=500
+    )
+    cursor: Optional[str] = Field(
+        default=None,
+        description="next_cursor from the previous page (JSON field, or the markdown footer)"
+    )
     response_format: ResponseFormat = Field(
         default=ResponseFormat.MARKDOWN,
-        description="Output format: 'markdown' for human-readable or 'json' for machine-readable"
+        description=(
+            "Output format: 'markdown' for human-readable, 'json' for machine-readable, "
+            "'compact' for minified JSON with only the chosen fields"
+        )
+    )
+    fields: Optional[List[str]] = Field(
+        default=None,
+        description="Compact format: shade fields to return (e.g. ['id', 'name', 'position']); default id, name, type, roomId, position, connectionStatus"
+    )
+    columnar: Optional[bool] = Field(
+        default=None,
+        description="Compact format: encode the list as columns + rows; default for long lists"
     )
 
 
@@ -592,7 +1557,9 @@ async def crestron_get_shades(params: GetShadesInput) -> str:
     Args:
         params (GetShadesInput): Input parameters containing:
             - shade_id (Optional[int]): Specific shade ID or None for all shades
-            - response_format (str): Output format ('markdown' or 'json')
+            - limit (Optional[int]): Maximum items on this page
+            - cursor (Optional[str]): next_cursor of the previous page
+            - response_format (str): Output format ('markdown', 'json' or 'compact')
     
     Returns:
         str: Shade information in specified format:
@@ -600,27 +1567,39 @@ async def crestron_get_shades(params: GetShadesInput) -> str:
             JSON: Array of shade objects with all fields including position, connectionStatus
     """
     try:
-        endpoint = f"/shades/{params.shade_id}" if params.shade_id else "/shades"
-        data = await api_request(endpoint)
-        shades = data.get("shades", [])
+        inventory = await _inventory.get("shades")
+        if params.shade_id is None:
+            shades = list(inventory.items)
+        elif params.shade_id in inventory.by_id:
+            shades = [inventory.by_id[params.shade_id]]
+        else:
+            # Not in the listing: let the processor answer (e.g. 404)
+            data = await api_request(f"/shades/{params.shade_id}")
+            shades = data.get("shades", [])
         
-        if params.response_format == ResponseFormat.JSON:
-            result = json.dumps({"shades": shades, "count": len(shades)}, indent=2)
+        if params.response_format != ResponseFormat.MARKDOWN:
+            page = page_json(shades, params.cursor, params.limit)
+            result = format_json({
+                "shades": page["items"],
+                "count": len(page["items"]),
+                "total": page["total"],
+                "next_cursor": page["next_cursor"]
+            }, params, "shades")
         else:
             # Markdown format
             if not shades:
                 result = "No shades found."
             else:
-                result = f"# Shades ({len(shades)} total)\n\n"
-                for shade in shades:
-                    position = int(shade.get('position', 0) * 100 / 65535)
-                    result += f"### {shade.get('name')} (ID: {shade.get('id')})\n"
-                    result += f"- **Position**: {position}% open\n"
-                    result += f"- **Connection**: {shade.get('connectionStatus', 'unknown')}\n"
-                    result += f"- **Room ID**: {shade.get('roomId')}\n"
-                    result += f"- **Subtype**: {shade.get('subType')}\n\n"
+                result = render_grouped_markdown(
+                    "Shades", shades,
+                    group_of=lambda sh: "",
+                    heading=lambda _, n: "",
+                    render_item=format_shade_markdown,
+                    cursor=params.cursor,
+                    limit=params.limit,
+                )
         
-        return truncate_response(result, len(shades))
+        return result
         
     except ValueError as e:
         return json.dumps({"error": str(e)}, indent=2)
@@ -695,6 +1674,7 @@ async def crestron_set_shade_position(params: SetShadeStateInput) -> str:
         
         body = {"shades": shades_data}
         result = await api_request("/shades/SetState", method="POST", body=body)
+        _inventory.invalidate_state("shades", "devices")
         
         status = result.get("status", "unknown")
         response = {
@@ -748,9 +1728,30 @@ class ListScenesInput(BaseModel):
             "'Climate', 'Lock', 'Shade Group', 'I/O', 'Daylight', 'Generic I/O', 'None'"
         )
     )
+    limit: Optional[int] = Field(
+        default=None,
+        description="Maximum items to return (pages of a large system); omit for as many as fit",
+        ge=1,
+        le=500
+    )
+    cursor: Optional[str] = Field(
+        default=None,
+        description="next_cursor from the previous page (JSON field, or the markdown footer)"
+    )
     response_format: ResponseFormat = Field(
         default=ResponseFormat.MARKDOWN,
-        description="Output format: 'markdown' for human-readable or 'json' for machine-readable"
+        description=(
+            "Output format: 'markdown' for human-readable, 'json' for machine-readable, "
+            "'compact' for minified JSON with only the chosen fields"
+        )
+    )
+    fields: Optional[List[str]] = Field(
+        default=None,
+        description="Compact format: scene fields to return (e.g. ['id', 'name', 'status']); default id, name, type, status, roomId"
+    )
+    columnar: Optional[bool] = Field(
+        default=None,
+        description="Compact format: encode the list as columns + rows; default for long lists"
     )
 
 
@@ -775,7 +1776,9 @@ async def crestron_list_scenes(params: ListScenesInput) -> str:
         params (ListScenesInput): Input parameters containing:
             - room_id (Optional[int]): Filter by room ID
             - scene_type (Optional[str]): Filter by scene type
-            - response_format (str): Output format ('markdown' or 'json')
+            - limit (Optional[int]): Maximum items on this page
+            - cursor (Optional[str]): next_cursor of the previous page
+            - response_format (str): Output format ('markdown', 'json' or 'compact')
     
     Returns:
         str: List of scenes in specified format:
@@ -783,8 +1786,7 @@ async def crestron_list_scenes(params: ListScenesInput) -> str:
             JSON: Array of scene objects with id, name, type, status, roomId
     """
     try:
-        data = await api_request("/scenes")
-        scenes = data.get("scenes", [])
+        scenes = list((await _inventory.get("scenes")).items)
         
         # Apply filters
         if params.room_id is not None:
@@ -793,38 +1795,37 @@ async def crestron_list_scenes(params: ListScenesInput) -> str:
         if params.scene_type:
             scenes = [s for s in scenes if s.get("type") == params.scene_type]
         
-        if params.response_format == ResponseFormat.JSON:
-            result = json.dumps({
-                "scenes": scenes,
-                "count": len(scenes),
+        if params.response_format != ResponseFormat.MARKDOWN:
+            page = page_json(scenes, params.cursor, params.limit)
+            result = format_json({
+                "scenes": page["items"],
+                "count": len(page["items"]),
+                "total": page["total"],
+                "next_cursor": page["next_cursor"],
                 "filters": {
                     "room_id": params.room_id,
                     "scene_type": params.scene_type
                 }
-            }, indent=2)
+            }, params, "scenes")
         else:
             # Markdown format
             if not scenes:
                 result = "No scenes found."
             else:
-                result = f"# Scenes ({len(scenes)} total)\n\n"
-                
-                # Group by type
-                by_type: Dict[str, List[Dict[str, Any]]] = {}
-                for scene in scenes:
-                    stype = scene.get('type', 'unknown')
-                    if stype not in by_type:
-                        by_type[stype] = []
-                    by_type[stype].append(scene)
-                
-                for stype, scenes_of_type in sorted(by_type.items()):
-                    result += f"## {stype} Scenes ({len(scenes_of_type)})\n\n"
-                    for scene in scenes_of_type:
-                        status_emoji = "✓" if scene.get('status') else "○"
-                        result += f"- {status_emoji} **{scene.get('name')}** (ID: {scene.get('id')}) - Room {scene.get('roomId')}\n"
-                    result += "\n"
-        
-        return truncate_response(result, len(scenes))
+                result = render_grouped_markdown(
+                    "Scenes", scenes,
+                    group_of=lambda sc: sc.get('type', 'unknown'),
+                    heading=lambda stype, n: f"## {stype} Scenes ({n})\n\n",
+                    render_item=lambda sc: (
+                        f"- {'✓' if sc.get('status') else '○'} **{sc.get('name')}** "
+                        f"(ID: {sc.get('id')}) - Room {sc.get('roomId')}\n"
+                    ),
+                    cursor=params.cursor,
+                    limit=params.limit,
+                    group_end="\n",
+                )
+        
+        return result
         
     except ValueError as e:
         return json.dumps({"error": str(e)}, indent=2)
@@ -874,6 +1875,8 @@ async def crestron_activate_scene(params: RecallSceneInput) -> str:
     """
     try:
         result = await api_request(f"/scenes/recall/{params.scene_id}", method="POST")
+        # A scene can move anything; only names and rooms stay trustworthy
+        _inventory.invalidate_state(*INVENTORY_COLLECTIONS)
         
         response = {
             "status": "success",
@@ -919,7 +1922,18 @@ class GetThermostatsInput(BaseModel):
     )
     response_format: ResponseFormat = Field(
         default=ResponseFormat.MARKDOWN,
-        description="Output format: 'markdown' for human-readable or 'json' for machine-readable"
+        description=(
+            "Output format: 'markdown' for human-readable, 'json' for machine-readable, "
+            "'compact' for minified JSON with only the chosen fields"
+        )
+    )
+    fields: Optional[List[str]] = Field(
+        default=None,
+        description="Compact format: thermostat fields to return (e.g. ['id', 'mode', 'currentTemperature']); default id, name, type, roomId, mode, currentTemperature, setPoint, currentFanMode"
+    )
+    columnar: Optional[bool] = Field(
+        default=None,
+        description="Compact format: encode the list as columns + rows; default for long lists"
     )
 
 
@@ -943,7 +1957,7 @@ async def crestron_get_thermostats(params: GetThermostatsInput) -> str:
     Args:
         params (GetThermostatsInput): Input parameters containing:
             - thermostat_id (Optional[int]): Specific thermostat ID or None for all
-            - response_format (str): Output format ('markdown' or 'json')
+            - response_format (str): Output format ('markdown', 'json' or 'compact')
     
     Returns:
         str: Thermostat information in specified format:
@@ -952,15 +1966,17 @@ async def crestron_get_thermostats(params: GetThermostatsInput) -> str:
                   currentTemperature, availableSystemModes, availableFanModes, etc.
     """
     try:
-        data = await api_request("/thermostats")
-        thermostats = data.get("thermostats", [])
+        inventory = await _inventory.get("thermostats")
         
         # Filter if specific ID requested
         if params.thermostat_id is not None:
-            thermostats = [t for t in thermostats if t.get("id") == params.thermostat_id]
+            thermostat = inventory.by_id.get(params.thermostat_id)
+            thermostats = [thermostat] if thermostat else []
+        else:
+            thermostats = list(inventory.items)
         
-        if params.response_format == ResponseFormat.JSON:
-            result = json.dumps({"thermostats": thermostats, "count": len(thermostats)}, indent=2)
+        if params.response_format != ResponseFormat.MARKDOWN:
+            result = format_json({"thermostats": thermostats, "count": len(thermostats)}, params, "thermostats")
         else:
             # Markdown format
             if not thermostats:
@@ -1067,6 +2083,7 @@ async def crestron_set_thermostat_setpoint(params: SetThermostatSetpointInput) -
         }
         
         result = await api_request("/thermostats/SetPoint", method="POST", body=body)
+        _inventory.invalidate_state("thermostats", "devices")
         
         response = {
             "status": "success",
@@ -1150,6 +2167,7 @@ async def crestron_set_thermostat_mode(params: SetThermostatModeInput) -> str:
         
         body = {"thermostats": thermostats_data}
         result = await api_request("/thermostats/mode", method="POST", body=body)
+        _inventory.invalidate_state("thermostats", "devices")
         
         response = {
             "status": result.get("status", "success"),
@@ -1223,6 +2241,7 @@ async def crestron_set_thermostat_fan(params: SetThermostatFanInput) -> str:
         
         body = {"thermostats": thermostats_data}
         result = await api_request("/thermostats/fanmode", method="POST", body=body)
+        _inventory.invalidate_state("thermostats", "devices")
         
         response = {
             "status": "success",
@@ -1259,9 +2278,30 @@ class GetSensorsInput(BaseModel):
         default=None,
         description="Optional filter by sensor subtype: 'OccupancySensor', 'PhotoSensor', 'DoorSensor'"
     )
+    limit: Optional[int] = Field(
+        default=None,
+        description="Maximum items to return (pages of a large system); omit for as many as fit",
+        ge=1,
+        le=500
+    )
+    cursor: Optional[str] = Field(
+        default=None,
+        description="next_cursor from the previous page (JSON field, or the markdown footer)"
+    )
     response_format: ResponseFormat = Field(
         default=ResponseFormat.MARKDOWN,
-        description="Output format: 'markdown' for human-readable or 'json' for machine-readable"
+        description=(
+            "Output format: 'markdown' for human-readable, 'json' for machine-readable, "
+            "'compact' for minified JSON with only the chosen fields"
+        )
+    )
+    fields: Optional[List[str]] = Field(
+        default=None,
+        description="Compact format: sensor fields to return (e.g. ['id', 'name', 'presence']); default id, name, type, subType, roomId and the readings (presence, level, door status, battery level)"
+    )
+    columnar: Optional[bool] = Field(
+        default=None,
+        description="Compact format: encode the list as columns + rows; default for long lists"
     )
 
 
@@ -1286,7 +2326,9 @@ async def crestron_get_sensors(params: GetSensorsInput) -> str:
         params (GetSensorsInput): Input parameters containing:
             - sensor_id (Optional[int]): Specific sensor ID or None for all
             - sensor_subtype (Optional[str]): Filter by subtype
-            - response_format (str): Output format ('markdown' or 'json')
+            - limit (Optional[int]): Maximum items on this page
+            - cursor (Optional[str]): next_cursor of the previous page
+            - response_format (str): Output format ('markdown', 'json' or 'compact')
     
     Returns:
         str: Sensor readings in specified format:
@@ -1294,50 +2336,43 @@ async def crestron_get_sensors(params: GetSensorsInput) -> str:
             JSON: Array of sensor objects with readings (presence, level, door status, battery)
     """
     try:
-        endpoint = f"/sensors/{params.sensor_id}" if params.sensor_id else "/sensors"
-        data = await api_request(endpoint)
-        sensors = data.get("sensors", [])
+        inventory = await _inventory.get("sensors")
+        if params.sensor_id is None:
+            sensors = list(inventory.items)
+        elif params.sensor_id in inventory.by_id:
+            sensors = [inventory.by_id[params.sensor_id]]
+        else:
+            # Not in the listing: let the processor answer (e.g. 404)
+            data = await api_request(f"/sensors/{params.sensor_id}")
+            sensors = data.get("sensors", [])
         
         # Apply subtype filter
         if params.sensor_subtype:
             sensors = [s for s in sensors if s.get("subType") == params.sensor_subtype]
         
-        if params.response_format == ResponseFormat.JSON:
-            result = json.dumps({"sensors": sensors, "count": len(sensors)}, indent=2)
+        if params.response_format != ResponseFormat.MARKDOWN:
+            page = page_json(sensors, params.cursor, params.limit)
+            result = format_json({
+                "sensors": page["items"],
+                "count": len(page["items"]),
+                "total": page["total"],
+                "next_cursor": page["next_cursor"]
+            }, params, "sensors")
         else:
             # Markdown format
             if not sensors:
                 result = "No sensors found."
             else:
-                result = f"# Sensors ({len(sensors)} total)\n\n"
-                
-                # Group by subtype
-                by_subtype: Dict[str, List[Dict[str, Any]]] = {}
-                for sensor in sensors:
-                    subtype = sensor.get('subType', 'unknown')
-                    if subtype not in by_subtype:
-                        by_subtype[subtype] = []
-                    by_subtype[subtype].append(sensor)
-                
-                for subtype, sensors_of_type in sorted(by_subtype.items()):
-                    result += f"## {subtype} ({len(sensors_of_type)})\n\n"
-                    for sensor in sensors_of_type:
-                        result += f"### {sensor.get('name')} (ID: {sensor.get('id')})\n"
-                        
-                        if 'presence' in sensor:
-                            result += f"- **Presence**: {sensor['presence']}\n"
-                        if 'level' in sensor:
-                            result += f"- **Light Level**: {sensor['level']}\n"
-                        if 'door status' in sensor:
-                            result += f"- **Door Status**: {sensor['door status']}\n"
-                        if 'battery level' in sensor:
-                            result += f"- **Battery**: {sensor['battery level']}\n"
-                        if 'connectionStatus' in sensor:
-                            result += f"- **Connection**: {sensor['connectionStatus']}\n"
-                        
-                        result += f"- **Room ID**: {sensor.get('roomId')}\n\n"
-        
-        return truncate_response(result, len(sensors))
+                result = render_grouped_markdown(
+                    "Sensors", sensors,
+                    group_of=lambda sn: sn.get('subType', 'unknown'),
+                    heading=lambda subtype, n: f"## {subtype} ({n})\n\n",
+                    render_item=format_sensor_markdown,
+                    cursor=params.cursor,
+                    limit=params.limit,
+                )
+        
+        return result
         
     except ValueError as e:
         return json.dumps({"error": str(e)}, indent=2)
@@ -1348,6 +2383,242 @@ async def crestron_get_sensors(params: GetSensorsInput) -> str:
         }, indent=2)
 
 
+# ============================================================================
+# Batch Control Tool
+# ============================================================================
+
+# Command field -> device type it applies to
+BATCH_FIELD_TYPES = {
+    "level": "light",
+    "position": "shade",
+    "setpoints": "thermostat",
+    "mode": "thermostat",
+    "fan_mode": "thermostat",
+}
+
+# Batch endpoint -> inventory collection whose state it changes ("devices" lists them all)
+BATCH_ENDPOINT_COLLECTIONS = {
+    "/lights/SetState": "devices",
+    "/shades/SetState": "shades",
+    "/thermostats/SetPoint": "thermostats",
+    "/thermostats/mode": "thermostats",
+    "/thermostats/fanmode": "thermostats",
+}
+
+
+class DeviceCommand(BaseModel):
+    """One device's part of a batch: set any of the fields that apply to it."""
+    model_config = ConfigDict(validate_assignment=True, extra='forbid')
+    
+    id: int = Field(..., description="Device ID (light, shade or thermostat)", ge=1)
+    level: Optional[int] = Field(
+        default=None,
+        description="Light brightness: 0 (off) to 100 (full)",
+        ge=0,
+        le=100
+    )
+    position: Optional[int] = Field(
+        default=None,
+        description="Shade position: 0 (fully closed) to 100 (fully open)",
+        ge=0,
+        le=100
+    )
+    setpoints: Optional[List[ThermostatSetpoint]] = Field(
+        default=None,
+        description="Thermostat setpoints (Heat, Cool, or Auto)",
+        min_length=1,
+        max_length=3
+    )
+    mode: Optional[ThermostatMode] = Field(default=None, description="Thermostat mode: HEAT, COOL, AUTO or OFF")
+    fan_mode: Optional[FanMode] = Field(default=None, description="Thermostat fan mode: AUTO or ON")
+
+    @model_validator(mode="after")
+    def check_has_action(self) -> "DeviceCommand":
+        if all(getattr(self, f) is None for f in BATCH_FIELD_TYPES):
+            raise ValueError(f"Command for device {self.id} sets nothing; give one of {', '.join(BATCH_FIELD_TYPES)}")
+        return self
+
+
+class BatchCommandInput(BaseModel):
+    """Input for a batch of device commands."""
+    model_config = ConfigDict(str_strip_whitespace=True, validate_assignment=True, extra='forbid')
+    
+    commands: List[DeviceCommand] = Field(
+        ...,
+        description=(
+            "Commands for lights (level), shades (position) and thermostats "
+            "(setpoints, mode, fan_mode), in any mix"
+        ),
+        min_length=1,
+        max_length=200
+    )
+
+    @model_validator(mode="after")
+    def check_no_duplicates(self) -> "BatchCommandInput":
+        seen = set()
+        for command in self.commands:
+            for field in BATCH_FIELD_TYPES:
+                if getattr(command, field) is None:
+                    continue
+                if (command.id, field) in seen:
+                    raise ValueError(f"Device {command.id} is given {field} more than once; send one value per device")
+                seen.add((command.id, field))
+        return self
+
+
+def plan_batch(commands: List[DeviceCommand]) -> List[Tuple[str, Dict[str, Any], List[Tuple[int, str]]]]:
+    """
+    Group commands into the fewest API requests.
+
+    Lights, shades, thermostat modes and fan modes each take a list, so each
+    becomes one request; setpoints are per thermostat in the API.
+
+    Returns:
+        [(endpoint, body, [(device id, command field), ...]), ...]
+    """
+    lights, shades, modes, fans = [], [], [], []
+    requests: List[Tuple[str, Dict[str, Any], List[Tuple[int, str]]]] = []
+    for command in commands:
+        if command.level is not None:
+            lights.append({"id": command.id, "level": int(command.level * 65535 / 100)})
+        if command.position is not None:
+            shades.append({"id": command.id, "position": int(command.position * 65535 / 100)})
+        if command.mode is not None:
+            modes.append({"id": command.id, "mode": command.mode.value})
+        if command.fan_mode is not None:
+            fans.append({"id": command.id, "mode": command.fan_mode.value})
+        if command.setpoints:
+            requests.append((
+                "/thermostats/SetPoint",
+                {"id": command.id, "setpoints": [
+                    {"type": sp.type.value, "temperature": sp.temperature} for sp in command.setpoints
+                ]},
+                [(command.id, "setpoints")],
+            ))
+    for endpoint, key, field, items in (
+        ("/lights/SetState", "lights", "level", lights),
+        ("/shades/SetState", "shades", "position", shades),
+        ("/thermostats/mode", "thermostats", "mode", modes),
+        ("/thermostats/fanmode", "thermostats", "fan_mode", fans),
+    ):
+        if items:
+            requests.append((endpoint, {key: items}, [(item["id"], field) for item in items]))
+    return requests
+
+
+@mcp.tool(
+    name="crestron_batch_command",
+    annotations={
+        "title": "Batch Control Lights, Shades and Thermostats",
+        "readOnlyHint": False,
+        "destructiveHint": False,
+        "idempotentHint": True,
+        "openWorldHint": True
+    }
+)
+async def crestron_batch_command(params: BatchCommandInput) -> str:
+    """
+    Apply a mixed set of device commands in one call (e.g. an "evening mode").
+    
+    Commands are grouped by endpoint into as few requests as the API allows
+    (one per device kind; one per thermostat for setpoints), and the groups
+    are sent concurrently. Devices unknown to the system, or given a field
+    that does not apply to their type, are reported without being sent.
+    
+    Args:
+        params (BatchCommandInput): Input parameters containing:
+            - commands (List[DeviceCommand]): Each with a device id and any of
+              level (lights, 0-100), position (shades, 0-100), setpoints, mode
+              and fan_mode (thermostats)
+    
+    Returns:
+        str: JSON response with overall and per-device results:
+            {
+                "status": "success" | "partial" | "failure",
+                "requests": 3,
+                "results": [
+                    {"id": 10, "status": "success", "applied": ["level"]},
+                    {"id": 80, "status": "failed", "failed": {"mode": "..."}}
+                ]
+            }
+    """
+    try:
+        devices = (await _inventory.get("devices", state=False)).by_id
+        
+        # Check each field against the device's type before sending anything
+        failed: Dict[int, Dict[str, str]] = {}
+        sendable = []
+        for command in params.commands:
+            device = devices.get(command.id)
+            fields = [f for f in BATCH_FIELD_TYPES if getattr(command, f) is not None]
+            wrong = [f for f in fields if device is None or device.get("type") != BATCH_FIELD_TYPES[f]]
+            for field in wrong:
+                reason = (
+                    f"device {command.id} not found" if device is None
+                    else f"{field} does not apply to a {device.get('type')}"
+                )
+                failed.setdefault(command.id, {})[field] = reason
+            if len(wrong) < len(fields):
+                sendable.append(command.model_copy(update={f: None for f in wrong}))
+        
+        requests = plan_batch(sendable)
+        outcomes = await asyncio.gather(
+            *(api_request(endpoint, method="POST", body=body) for endpoint, body, _ in requests),
+            return_exceptions=True,
+        )
+        
+        applied: Dict[int, List[str]] = {}
+        touched = set()
+        for (endpoint, _, targets), outcome in zip(requests, outcomes):
+            touched.add(BATCH_ENDPOINT_COLLECTIONS[endpoint])
+            if isinstance(outcome, BaseException):
+                reason = (
+                    f"HTTP {outcome.response.status_code}" if isinstance(outcome, httpx.HTTPStatusError)
+                    else str(outcome)
+                )
+                for device_id, field in targets:
+                    failed.setdefault(device_id, {})[field] = reason
+                continue
+            error_devices = set(outcome.get("errorDevices") or [])
+            if outcome.get("status") == "failure" and not error_devices:
+                error_devices = {device_id for device_id, _ in targets}
+            for device_id, field in targets:
+                if device_id in error_devices:
+                    failed.setdefault(device_id, {})[field] = outcome.get("errorMessage", "rejected by the processor")
+                else:
+                    applied.setdefault(device_id, []).append(field)
+        
+        # Next state read refetches what changed; name lookups stay cached
+        _inventory.invalidate_state("devices", *touched)
+        
+        results = []
+        for device_id in dict.fromkeys(c.id for c in params.commands):
+            entry: Dict[str, Any] = {"id": device_id}
+            if device_id in applied:
+                entry["applied"] = applied[device_id]
+            if device_id in failed:
+                entry["failed"] = failed[device_id]
+            entry["status"] = "failed" if device_id not in applied else "partial" if device_id in failed else "success"
+            results.append(entry)
+        
+        statuses = {r["status"] for r in results}
+        response = {
+            "status": "success" if statuses == {"success"} else "failure" if statuses == {"failed"} else "partial",
+            "commands": len(params.commands),
+            "requests": len(requests),
+            "results": results,
+        }
+        return json.dumps(response, indent=2)
+        
+    except ValueError as e:
+        return json.dumps({"error": str(e)}, indent=2)
+    except Exception as e:
+        return json.dumps({
+            "error": "Failed to run batch command",
+            "details": str(e)
+        }, indent=2)
+
+
 # ============================================================================
 # Device Resolution Tool (MCP Requirement)
 # ============================================================================
@@ -1407,57 +2678,9 @@ async def crestron_resolve_device(params: ResolveDeviceInput) -> str:
                 }
     """
     try:
-        # Get all devices
-        data = await api_request("/devices")
-        devices = data.get("devices", [])
-        
-        # Also get rooms for name matching
-        rooms_data = await api_request("/rooms")
-        rooms = rooms_data.get("rooms", [])
-        room_map = {r["id"]: r["name"].lower() for r in rooms}
-        
-        # Normalize utterance for matching
-        utterance_lower = params.utterance.lower()
-        
-        # Scoring function
-        matches = []
-        for device in devices:
-            score = 0.0
-            device_name = device.get("name", "").lower()
-            device_type = device.get("type", "").lower()
-            device_room_id = device.get("roomId")
-            
-            # Exact name match
-            if device_name in utterance_lower or utterance_lower in device_name:
-                score += 0.5
-            
-            # Type match
-            if device_type in utterance_lower:
-                score += 0.3
-            
-            # Room context match
-            if params.preferred_room_id and device_room_id == params.preferred_room_id:
-                score += 0.2
-            elif device_room_id in room_map:
-                room_name = room_map[device_room_id]
-                if room_name in utterance_lower:
-                    score += 0.2
-            
-            # Word overlap scoring
-            utterance_words = set(utterance_lower.split())
-            device_words = set(device_name.split())
-            overlap = utterance_words.intersection(device_words)
-            if overlap:
-                score += 0.1 * len(overlap)
-            
-            if score > 0:
-                matches.append({
-                    "device": device,
-                    "score": min(score, 1.0)
-                })
-        
-        # Sort by score
-        matches.sort(key=lambda x: x["score"], reverse=True)
+        # Prebuilt device/room index; no request unless it was never built
+        index = await _resolution.get()
+        matches = index.match(params.utterance, params.preferred_room_id, limit=5)
         
         if not matches:
             response = {
@@ -1517,6 +2740,61 @@ async def crestron_resolve_device(params: ResolveDeviceInput) -> str:
         }, indent=2)
 
 
+# ============================================================================
+# Diagnostics Tool
+# ============================================================================
+
+class ServerStatsInput(BaseModel):
+    """Input for server statistics."""
+    model_config = ConfigDict(str_strip_whitespace=True, validate_assignment=True, extra='forbid')
+    
+    reset: bool = Field(
+        default=False,
+        description="Reset the connection counters after reporting them"
+    )
+
+
+@mcp.tool(
+    name="crestron_server_stats",
+    annotations={
+        "title": "Crestron Connection and Cache Statistics",
+        "readOnlyHint": True,
+        "destructiveHint": False,
+        "idempotentHint": False,
+        "openWorldHint": False
+    }
+)
+async def crestron_server_stats(params: ServerStatsInput) -> str:
+    """
+    Report how the server talks to the processor: connection pool reuse,
+    TLS handshakes, coalesced GETs, session renewals and inventory cache hits.
+    
+    Makes no request to the processor.
+    
+    Args:
+        params (ServerStatsInput): Input parameters containing:
+            - reset (bool): Reset the connection counters after reporting
+    
+    Returns:
+        str: JSON with "connections", "requests", "session" and "inventory" sections
+    """
+    session_age = time.monotonic() - _session.session_start if _session.session_start else None
+    response = {
+        "connections": _pool_stats.report(_session.client),
+        "requests": _coalescer.stats(),
+        "session": {
+            "host": _session.host,
+            "valid": _session.is_valid(),
+            "age_s": round(session_age, 1) if session_age is not None else None,
+            "renewals": _session.renewals,
+        },
+        "inventory": _inventory.stats(),
+    }
+    if params.reset:
+        _pool_stats.reset()
+    return json.dumps(response, indent=2)
+
+
 # ============================================================================
 # Main Entry Point
 # ============================================================================
@@ -5,13 +5,33 @@ Simulates a Crestron Home system with a typical Italian home setup.
 Runs on HTTP port 8080 for testing the Crestron MCP server.
 
 Usage:
-    python mock_crestron_server.py
+    python mock_crestron_server.py [port]
 
 Then configure your MCP to use: http://localhost:8080
+
+Load testing:
+    python mock_crestron_server.py 8080 --load-test --devices 5000 --rooms 250 --scenes 500
+
+--load-test serves requests on a thread pool with HTTP/1.1 keep-alive and
+compact JSON, and replaces the demo house with a synthetic one generated
+from --seed. Request logging is off unless --log-rate is given (lines per
+second; the rest are counted and summarised).
+
+Fault injection:
+    python mock_crestron_server.py 8080 --profile flaky --fault-seed 7
+
+Profiles (none, lan, wifi, busy-processor, flaky, slow-link, or a JSON
+file) add per-endpoint latency, random 5xx and 401s, dropped connections
+and throttled bodies. GET /mock/admin/profile shows the active profile and
+what it has injected; POST {"profile": "wifi"} there switches it live.
 """
 
-from http.server import HTTPServer, BaseHTTPRequestHandler
+from http.server import HTTPServer, ThreadingHTTPServer, BaseHTTPRequestHandler
+import argparse
+import itertools
 import json
+import random
+import socket
 import time
 from typing import Dict, Any, List, Optional
 from urllib.parse import urlparse, parse_qs
@@ -255,9 +275,12 @@ SCENES = [
 # Helper Functions
 # ============================================================================
 
+_session_counter = itertools.count(1)
+
+
 def generate_session_key() -> str:
     """Generate a mock session key."""
-    return f"session-{int(time.time())}-{threading.get_ident()}"
+    return f"session-{int(time.time())}-{threading.get_ident()}-{next(_session_counter)}"
 
 
 def validate_session(auth_key: str) -> bool:
@@ -270,26 +293,334 @@ def validate_session(auth_key: str) -> bool:
     
     # 10-minute timeout
     if elapsed > 600:
-        del SESSIONS[auth_key]
+        SESSIONS.pop(auth_key, None)
         return False
     
     return True
 
 
+# Lookup tables over the lists above; rebuilt by index_data() whenever the
+# lists are replaced. Entries are the same dicts, so writes show up in both.
+DEVICES_BY_ID: Dict[int, Dict[str, Any]] = {}
+DEVICES_BY_TYPE: Dict[str, List[Dict[str, Any]]] = {}
+SCENES_BY_ID: Dict[int, Dict[str, Any]] = {}
+
+
+def index_data() -> None:
+    """Rebuild the id and type lookups from DEVICES and SCENES."""
+    DEVICES_BY_ID.clear()
+    DEVICES_BY_TYPE.clear()
+    SCENES_BY_ID.clear()
+    for device in DEVICES:
+        DEVICES_BY_ID[device["id"]] = device
+        DEVICES_BY_TYPE.setdefault(device["type"], []).append(device)
+    for scene in SCENES:
+        SCENES_BY_ID[scene["id"]] = scene
+
+
 def get_device_by_id(device_id: int) -> Optional[Dict[str, Any]]:
     """Get device by ID."""
-    for device in DEVICES:
-        if device["id"] == device_id:
-            return device
-    return None
+    return DEVICES_BY_ID.get(device_id)
 
 
 def get_scene_by_id(scene_id: int) -> Optional[Dict[str, Any]]:
     """Get scene by ID."""
-    for scene in SCENES:
-        if scene["id"] == scene_id:
-            return scene
-    return None
+    return SCENES_BY_ID.get(scene_id)
+
+
+def devices_of_type(device_type: str) -> List[Dict[str, Any]]:
+    """All devices of one type, in DEVICES order."""
+    return DEVICES_BY_TYPE.get(device_type, [])
+
+
+index_data()
+
+
+# ============================================================================
+# Logging and Serialization
+# ============================================================================
+
+# Indent for JSON responses; None (compact) in load-test mode
+JSON_INDENT: Optional[int] = 2
+
+
+class RateLimitedLog:
+    """
+    Print log lines (one at a time across handler threads), at most `rate`
+    per second when a rate is set.
+
+    Lines over the limit are dropped and counted; the count is printed with
+    the next line that gets through. Disabled entirely when `enabled` is False.
+    """
+
+    def __init__(self, enabled: bool = True, rate: Optional[float] = None):
+        self.enabled = enabled
+        self.rate = rate
+        self._lock = threading.Lock()
+        self._window = 0
+        self._sent = 0
+        self._dropped = 0
+
+    def __call__(self, message: str) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            if self.rate is not None:
+                window = int(time.monotonic())
+                if window != self._window:
+                    self._window, self._sent = window, 0
+                if self._sent >= self.rate:
+                    self._dropped += 1
+                    return
+                self._sent += 1
+            if self._dropped:
+                print(f"[MOCK CRESTRON] ... {self._dropped} log lines suppressed")
+                self._dropped = 0
+            print(message)
+
+
+log = RateLimitedLog()
+
+
+# ============================================================================
+# Synthetic House (load testing)
+# ============================================================================
+
+SYNTHETIC_ROOM_NAMES = [
+    "Soggiorno", "Cucina", "Camera da Letto", "Bagno", "Studio", "Sala da Pranzo",
+    "Cantina", "Taverna", "Ingresso", "Corridoio", "Lavanderia", "Veranda",
+    "Camera Ospiti", "Cabina Armadio", "Palestra", "Biblioteca",
+]
+SYNTHETIC_DEVICE_NAMES = {
+    "light": ["Lampadario", "Applique", "Luce", "Luci", "Lampada", "Faretti", "Striscia LED"],
+    "shade": ["Tapparella", "Tenda", "Persiana"],
+    "sensor": ["Sensore Presenza", "Sensore Porta", "Sensore Luce"],
+    "thermostat": ["Termostato"],
+}
+# Relative frequency of each device type
+SYNTHETIC_DEVICE_WEIGHTS = {"light": 6, "shade": 3, "sensor": 2, "thermostat": 1}
+SYNTHETIC_POSITIONS = ["Nord", "Sud", "Est", "Ovest", "Sinistra", "Destra", "Centrale", "Grande", "Piccola"]
+SYNTHETIC_SCENE_NAMES = [
+    ("Lighting", ["Tutto Acceso", "Tutto Spento", "Film", "Cena", "Notte", "Lettura", "Festa"]),
+    ("Shade", ["Buongiorno", "Buonanotte", "Privacy", "Sole"]),
+]
+
+
+def _synthetic_device(rng: random.Random, device_id: int, device_type: str,
+                      room: Dict[str, Any]) -> Dict[str, Any]:
+    """One device shaped like the demo ones of the same type."""
+    name = f"{rng.choice(SYNTHETIC_DEVICE_NAMES[device_type])} {rng.choice(SYNTHETIC_POSITIONS)} {room['name']}"
+    device = {"id": device_id, "name": name, "type": device_type, "roomId": room["id"]}
+    if device_type == "light":
+        level = rng.choice([0, 16384, 32768, 49152, 65535])
+        device.update(subType=rng.choice(["Dimmer", "Switch"]), level=level, state="on" if level else "off")
+    elif device_type == "shade":
+        device.update(subType="Shade", position=rng.choice([0, 32768, 65535]), connectionStatus="online")
+    elif device_type == "sensor":
+        sub_type = rng.choice(["OccupancySensor", "PhotoSensor", "DoorSensor"])
+        device["subType"] = sub_type
+        if sub_type == "OccupancySensor":
+            device["presence"] = rng.choice(["occupied", "vacant"])
+        elif sub_type == "PhotoSensor":
+            device.update(level=rng.randrange(1000), connectionStatus="online")
+        else:
+            device.update({"door status": rng.choice(["Open", "Closed"]), "battery level": "Normal"})
+    else:
+        setpoint = rng.randrange(180, 260, 5)
+        device.update(
+            subType=None,
+            mode=rng.choice(["Cool", "Heat", "Auto", "Off"]),
+            setPoint={"type": "Cool", "temperature": setpoint, "minValue": 180, "maxValue": 300},
+            currentTemperature=setpoint + rng.randrange(-20, 21, 5),
+            temperatureUnits="CelsiusHalfDegrees",
+            currentFanMode="Auto",
+            schedulerState="run",
+            availableFanModes=["Auto", "On"],
+            availableSystemModes=["Off", "Cool", "Heat", "Auto"],
+            availableSetPoints=[
+                {"type": "Heat", "minValue": 150, "maxValue": 250},
+                {"type": "Cool", "minValue": 180, "maxValue": 300},
+            ],
+        )
+    return device
+
+
+def generate_house(rooms: int, devices: int, scenes: int, seed: int = 1) -> None:
+    """
+    Replace ROOMS, DEVICES and SCENES with a synthetic house.
+
+    The same arguments always give the same house. Room ids start at 1
+    (plus the whole-house room 1001 as in the demo data), device ids at
+    10000 and scene ids at 1. Devices are spread evenly over the rooms.
+    """
+    rng = random.Random(seed)
+    rooms = max(1, rooms)
+    new_rooms = [{"id": 1001, "name": "Tutta la Casa"}]
+    for i in range(rooms):
+        base = SYNTHETIC_ROOM_NAMES[i % len(SYNTHETIC_ROOM_NAMES)]
+        new_rooms.append({"id": i + 1, "name": f"{base} {i // len(SYNTHETIC_ROOM_NAMES) + 1}"})
+
+    types = list(SYNTHETIC_DEVICE_WEIGHTS)
+    weights = list(SYNTHETIC_DEVICE_WEIGHTS.values())
+    new_devices = [
+        _synthetic_device(rng, 10_000 + i, rng.choices(types, weights)[0], new_rooms[1 + i % rooms])
+        for i in range(devices)
+    ]
+
+    new_scenes = []
+    for i in range(scenes):
+        scene_type, names = rng.choice(SYNTHETIC_SCENE_NAMES)
+        room = rng.choice(new_rooms)
+        new_scenes.append({
+            "id": i + 1,
+            "name": f"{rng.choice(names)} {room['name']}",
+            "type": scene_type,
+            "status": False,
+            "roomId": room["id"],
+        })
+
+    # Replace contents in place so modules holding the lists see the new house
+    ROOMS[:] = new_rooms
+    DEVICES[:] = new_devices
+    SCENES[:] = new_scenes
+    index_data()
+
+
+# ============================================================================
+# Fault Injection
+# ============================================================================
+
+class FaultProfile:
+    """
+    Latency and failures applied to API requests, to exercise client retries,
+    timeouts and caching offline.
+    
+    latency maps an endpoint prefix under /cws/api ("/devices",
+    "/shades/SetState"; "*" for everything else) to a distribution:
+        {"dist": "fixed", "ms": 20}
+        {"dist": "normal", "ms": 40, "sd": 10}
+        {"dist": "longtail", "ms": 30, "tail_ms": 1500, "tail_p": 0.05}
+    The longest matching prefix wins.
+    
+    error_rate, unauthorized_rate and drop_rate are per-request chances of a
+    random 5xx, of expiring the caller's session (so the request gets a 401
+    and the client must log in again), and of closing the connection without
+    answering. slow_body_bps caps response bodies at that many bytes/second.
+    Draws come from one RNG seeded with `seed`, so a run with a single client
+    is reproducible.
+    """
+    
+    DISTRIBUTIONS = ("fixed", "normal", "longtail")
+    FIELDS = ("latency", "error_rate", "unauthorized_rate", "drop_rate", "slow_body_bps")
+    
+    def __init__(self, name: str = "none", latency: Optional[Dict[str, Dict[str, Any]]] = None,
+                 error_rate: float = 0.0, unauthorized_rate: float = 0.0, drop_rate: float = 0.0,
+                 slow_body_bps: Optional[int] = None, seed: int = 0):
+        self.name = name
+        self.latency = latency or {}
+        self.error_rate = error_rate
+        self.unauthorized_rate = unauthorized_rate
+        self.drop_rate = drop_rate
+        self.slow_body_bps = slow_body_bps
+        self.seed = seed
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "delayed_ms": 0, "errors": 0, "unauthorized": 0, "drops": 0}
+        
+        for prefix, spec in self.latency.items():
+            if spec.get("dist") not in self.DISTRIBUTIONS:
+                raise ValueError(f"latency[{prefix!r}]: dist must be one of {', '.join(self.DISTRIBUTIONS)}")
+        for field in ("error_rate", "unauthorized_rate", "drop_rate"):
+            if not 0.0 <= getattr(self, field) <= 1.0:
+                raise ValueError(f"{field} must be between 0 and 1")
+        # Longest prefix first, "*" last
+        self._prefixes = sorted((p for p in self.latency if p != "*"), key=len, reverse=True)
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], seed: int = 0) -> "FaultProfile":
+        unknown = set(data) - set(cls.FIELDS) - {"name", "seed"}
+        if unknown:
+            raise ValueError(f"Unknown profile field(s): {', '.join(sorted(unknown))}")
+        return cls(**{"seed": seed, **data})
+    
+    @classmethod
+    def named(cls, name: str, seed: int = 0) -> "FaultProfile":
+        if name not in FAULT_PROFILES:
+            raise ValueError(f"Unknown profile {name!r}; available: {', '.join(FAULT_PROFILES)}")
+        return cls.from_dict({"name": name, **FAULT_PROFILES[name]}, seed)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        data = {field: getattr(self, field) for field in self.FIELDS}
+        return {"name": self.name, "seed": self.seed, **data}
+    
+    def _delay_ms(self, endpoint: str) -> float:
+        prefix = next((p for p in self._prefixes if endpoint.startswith(p)), "*")
+        spec = self.latency.get(prefix)
+        if not spec:
+            return 0.0
+        ms = spec.get("ms", 0)
+        if spec["dist"] == "normal":
+            ms = self._rng.gauss(ms, spec.get("sd", ms / 4))
+        elif spec["dist"] == "longtail" and self._rng.random() < spec.get("tail_p", 0.05):
+            ms = spec.get("tail_ms", ms * 20)
+        return max(0.0, ms)
+    
+    def draw(self, endpoint: str, authenticated: bool) -> Dict[str, Any]:
+        """
+        Decide what happens to one request.
+        
+        Returns:
+            {"delay_ms": float, "fault": None | "drop" | "error" | "unauthorized",
+             "status": 5xx code when fault is "error"}
+        """
+        with self._lock:
+            delay_ms = self._delay_ms(endpoint)
+            fault, status = None, None
+            if self._rng.random() < self.drop_rate:
+                fault = "drop"
+            elif self._rng.random() < self.error_rate:
+                fault, status = "error", self._rng.choice([500, 502, 503, 504])
+            elif authenticated and self._rng.random() < self.unauthorized_rate:
+                fault = "unauthorized"
+            self.stats["requests"] += 1
+            self.stats["delayed_ms"] += int(delay_ms)
+            if fault:
+                self.stats[{"drop": "drops", "error": "errors", "unauthorized": "unauthorized"}[fault]] += 1
+        return {"delay_ms": delay_ms, "fault": fault, "status": status}
+
+
+# Built-in profiles for --profile and the admin endpoint
+FAULT_PROFILES: Dict[str, Dict[str, Any]] = {
+    "none": {},
+    "lan": {"latency": {"*": {"dist": "fixed", "ms": 5}}},
+    "wifi": {"latency": {"*": {"dist": "normal", "ms": 25, "sd": 8}}},
+    # Real processors take longest over the full device list
+    "busy-processor": {
+        "latency": {
+            "*": {"dist": "longtail", "ms": 40, "tail_ms": 1200, "tail_p": 0.05},
+            "/devices": {"dist": "longtail", "ms": 150, "tail_ms": 3000, "tail_p": 0.05},
+        },
+        "error_rate": 0.01,
+    },
+    "flaky": {
+        "latency": {"*": {"dist": "normal", "ms": 40, "sd": 15}},
+        "error_rate": 0.05,
+        "unauthorized_rate": 0.02,
+        "drop_rate": 0.01,
+    },
+    "slow-link": {"latency": {"*": {"dist": "fixed", "ms": 80}}, "slow_body_bps": 200_000},
+}
+
+PROFILE = FaultProfile()
+
+
+def load_profile(spec: str, seed: int = 0) -> FaultProfile:
+    """A built-in profile by name, or a JSON file holding a profile dict."""
+    if spec.endswith(".json"):
+        with open(spec) as f:
+            data = json.load(f)
+        return FaultProfile.from_dict({"name": spec, **data}, seed)
+    return FaultProfile.named(spec, seed)
 
 
 # ============================================================================
@@ -301,20 +632,92 @@ class CrestronMockHandler(BaseHTTPRequestHandler):
     
     def log_message(self, format, *args):
         """Custom logging."""
-        print(f"[MOCK CRESTRON] {self.command} {args[0]} - {args[1]}")
+        log(f"[MOCK CRESTRON] {self.command} {args[0]} - {args[1]}")
     
-    def _set_headers(self, status_code: int = 200):
+    def _set_headers(self, status_code: int = 200, content_length: Optional[int] = None):
         """Set response headers."""
         self.send_response(status_code)
         self.send_header('Content-Type', 'application/json')
         self.send_header('Access-Control-Allow-Origin', '*')
+        if content_length is not None:
+            self.send_header('Content-Length', str(content_length))
         self.end_headers()
     
     def _send_json(self, data: Dict[str, Any], status_code: int = 200):
         """Send JSON response."""
-        self._set_headers(status_code)
-        response = json.dumps(data, indent=2)
-        self.wfile.write(response.encode())
+        if JSON_INDENT is None:
+            response = json.dumps(data, separators=(',', ':')).encode()
+        else:
+            response = json.dumps(data, indent=JSON_INDENT).encode()
+        self._set_headers(status_code, len(response))
+        bps = PROFILE.slow_body_bps
+        if not bps:
+            self.wfile.write(response)
+            return
+        # Trickle the body out in 50 ms slices
+        chunk = max(1, bps // 20)
+        for start in range(0, len(response), chunk):
+            self.wfile.write(response[start:start + chunk])
+            time.sleep(0.05)
+    
+    def _inject_faults(self, path: str) -> bool:
+        """
+        Apply the active fault profile to this request.
+        
+        Returns True when the request has been dealt with (error sent or
+        connection dropped) and the handler should stop.
+        """
+        if PROFILE.name == "none" or not path.startswith("/cws/api"):
+            return False
+        endpoint = path[len("/cws/api"):]
+        auth_key = self._get_auth_key()
+        outcome = PROFILE.draw(endpoint, authenticated=bool(auth_key) and endpoint != "/login")
+        if outcome["delay_ms"]:
+            time.sleep(outcome["delay_ms"] / 1000)
+        
+        if outcome["fault"] == "drop":
+            log(f"💥 [FAULT] Dropping connection on {endpoint}")
+            self.close_connection = True
+            try:
+                self.connection.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            return True
+        if outcome["fault"] == "error":
+            log(f"💥 [FAULT] HTTP {outcome['status']} on {endpoint}")
+            self._send_json({"error": "Injected fault", "status": outcome["status"]}, outcome["status"])
+            return True
+        if outcome["fault"] == "unauthorized":
+            # Expire the session for real so the client has to log in again
+            log(f"💥 [FAULT] Expiring session on {endpoint}")
+            SESSIONS.pop(auth_key, None)
+        return False
+    
+    def _handle_admin(self, path: str, data: Optional[Dict[str, Any]] = None) -> None:
+        """
+        /mock/admin/profile: GET shows the active profile and its fault counts;
+        POST switches profile with {"profile": "<name>" | {...}, "seed": 0}.
+        """
+        global PROFILE
+        if path != "/mock/admin/profile":
+            self._send_json({"error": "Endpoint not found"}, 404)
+            return
+        if data is not None:
+            try:
+                spec, seed = data.get("profile", "none"), int(data.get("seed", 0))
+                if isinstance(spec, dict):
+                    PROFILE = FaultProfile.from_dict({"name": "custom", **spec}, seed)
+                else:
+                    PROFILE = FaultProfile.named(spec, seed)
+            except (TypeError, ValueError) as e:
+                self._send_json({"error": str(e)}, 400)
+                return
+            print(f"⚙️  [ADMIN] Fault profile → {PROFILE.name}")
+        self._send_json({
+            "profile": PROFILE.to_dict(),
+            "stats": PROFILE.stats,
+            "available": list(FAULT_PROFILES),
+        })
     
     def _get_auth_key(self) -> Optional[str]:
         """Extract auth key from headers."""
@@ -338,6 +741,12 @@ class CrestronMockHandler(BaseHTTPRequestHandler):
         parsed_path = urlparse(self.path)
         path = parsed_path.path
         
+        if path.startswith("/mock/admin/"):
+            self._handle_admin(path)
+            return
+        if self._inject_faults(path):
+            return
+        
         # Login endpoint
         if path == "/cws/api/login":
             auth_token = self.headers.get('Crestron-RestAPI-AuthToken')
@@ -348,13 +757,13 @@ class CrestronMockHandler(BaseHTTPRequestHandler):
                     "created_at": time.time()
                 }
                 
-                print(f"✅ [AUTH] New session created: {session_key}")
+                log(f"✅ [AUTH] New session created: {session_key}")
                 self._send_json({
                     "version": "2.0",
                     "AuthKey": session_key
                 })
             else:
-                print(f"❌ [AUTH] Invalid token: {auth_token}")
+                log(f"❌ [AUTH] Invalid token: {auth_token}")
                 self._send_json({
                     "error": "Invalid authorization token"
                 }, 401)
@@ -366,7 +775,7 @@ class CrestronMockHandler(BaseHTTPRequestHandler):
         
         # Rooms
         if path == "/cws/api/rooms":
-            print("📋 [ROOMS] Listing all rooms")
+            log("📋 [ROOMS] Listing all rooms")
             self._send_json({
                 "rooms": ROOMS,
                 "version": "2.0"
@@ -375,7 +784,7 @@ class CrestronMockHandler(BaseHTTPRequestHandler):
         
         # Devices
         if path == "/cws/api/devices":
-            print("📋 [DEVICES] Listing all devices")
+            log("📋 [DEVICES] Listing all devices")
             self._send_json({
                 "devices": DEVICES,
                 "version": "2.0"
@@ -384,8 +793,8 @@ class CrestronMockHandler(BaseHTTPRequestHandler):
         
         # Shades
         if path == "/cws/api/shades":
-            shades = [d for d in DEVICES if d["type"] == "shade"]
-            print(f"📋 [SHADES] Listing {len(shades)} shades")
+            shades = devices_of_type("shade")
+            log(f"📋 [SHADES] Listing {len(shades)} shades")
             self._send_json({
                 "shades": shades,
                 "version": "2.0"
@@ -398,13 +807,13 @@ class CrestronMockHandler(BaseHTTPRequestHandler):
             shade = get_device_by_id(shade_id)
             
             if shade and shade["type"] == "shade":
-                print(f"📋 [SHADE] Getting shade {shade_id}")
+                log(f"📋 [SHADE] Getting shade {shade_id}")
                 self._send_json({
                     "shades": [shade],
                     "version": "2.0"
                 })
             else:
-                print(f"❌ [SHADE] Shade {shade_id} not found")
+                log(f"❌ [SHADE] Shade {shade_id} not found")
                 self._send_json({
                     "error": f"Shade with ID {shade_id} not found"
                 }, 404)
@@ -412,7 +821,7 @@ class CrestronMockHandler(BaseHTTPRequestHandler):
         
         # Scenes
         if path == "/cws/api/scenes":
-            print(f"📋 [SCENES] Listing {len(SCENES)} scenes")
+            log(f"📋 [SCENES] Listing {len(SCENES)} scenes")
             self._send_json({
                 "scenes": SCENES,
                 "version": "2.0"
@@ -421,8 +830,8 @@ class CrestronMockHandler(BaseHTTPRequestHandler):
         
         # Thermostats
         if path == "/cws/api/thermostats":
-            thermostats = [d for d in DEVICES if d["type"] == "thermostat"]
-            print(f"📋 [THERMOSTATS] Listing {len(thermostats)} thermostats")
+            thermostats = devices_of_type("thermostat")
+            log(f"📋 [THERMOSTATS] Listing {len(thermostats)} thermostats")
             self._send_json({
                 "thermostats": thermostats,
                 "version": "2.0"
@@ -431,8 +840,8 @@ class CrestronMockHandler(BaseHTTPRequestHandler):
         
         # Sensors
         if path == "/cws/api/sensors":
-            sensors = [d for d in DEVICES if d["type"] == "sensor"]
-            print(f"📋 [SENSORS] Listing {len(sensors)} sensors")
+            sensors = devices_of_type("sensor")
+            log(f"📋 [SENSORS] Listing {len(sensors)} sensors")
             self._send_json({
                 "sensors": sensors,
                 "version": "2.0"
@@ -445,20 +854,20 @@ class CrestronMockHandler(BaseHTTPRequestHandler):
             sensor = get_device_by_id(sensor_id)
             
             if sensor and sensor["type"] == "sensor":
-                print(f"📋 [SENSOR] Getting sensor {sensor_id}")
+                log(f"📋 [SENSOR] Getting sensor {sensor_id}")
                 self._send_json({
                     "sensors": [sensor],
                     "version": "2.0"
                 })
             else:
-                print(f"❌ [SENSOR] Sensor {sensor_id} not found")
+                log(f"❌ [SENSOR] Sensor {sensor_id} not found")
                 self._send_json({
                     "error": f"Sensor with ID {sensor_id} not found"
                 }, 404)
             return
         
         # Unknown endpoint
-        print(f"❌ [UNKNOWN] Unknown GET endpoint: {path}")
+        log(f"❌ [UNKNOWN] Unknown GET endpoint: {path}")
         self._send_json({
             "error": "Endpoint not found"
         }, 404)
@@ -468,11 +877,8 @@ class CrestronMockHandler(BaseHTTPRequestHandler):
         parsed_path = urlparse(self.path)
         path = parsed_path.path
         
-        # Require authentication
-        if not self._require_auth():
-            return
-        
-        # Read request body
+        # Read request body (first, so a kept-alive connection stays in sync
+        # whatever the response)
         content_length = int(self.headers.get('Content-Length', 0))
         body = self.rfile.read(content_length).decode() if content_length > 0 else "{}"
         
@@ -482,10 +888,57 @@ class CrestronMockHandler(BaseHTTPRequestHandler):
             self._send_json({"error": "Invalid JSON"}, 400)
             return
         
+        if path.startswith("/mock/admin/"):
+            self._handle_admin(path, data)
+            return
+        if self._inject_faults(path):
+            return
+        
+        # Require authentication
+        if not self._require_auth():
+            return
+        
+        # Set light state
+        if path == "/cws/api/lights/SetState":
+            lights = data.get("lights", [])
+            log(f"💡 [LIGHTS] Setting state for {len(lights)} lights")
+            
+            success_ids = []
+            failed_ids = []
+            
+            for light_cmd in lights:
+                light_id = light_cmd.get("id")
+                level = light_cmd.get("level")
+                
+                light = get_device_by_id(light_id)
+                
+                if light and light["type"] == "light":
+                    light["level"] = level
+                    success_ids.append(light_id)
+                    percentage = int(level * 100 / 65535)
+                    log(f"   ✅ Light {light_id} ({light['name']}) → {percentage}%")
+                else:
+                    failed_ids.append(light_id)
+                    log(f"   ❌ Light {light_id} not found")
+            
+            if failed_ids:
+                self._send_json({
+                    "status": "partial" if success_ids else "failure",
+                    "errorMessage": f"Light(s) with ID(s) {failed_ids} failed to update.",
+                    "errorDevices": failed_ids,
+                    "version": "1.000.0001"
+                })
+            else:
+                self._send_json({
+                    "status": "success",
+                    "version": "1.000.0001"
+                })
+            return
+        
         # Set shade state
         if path == "/cws/api/shades/SetState":
             shades = data.get("shades", [])
-            print(f"🎛️  [SHADES] Setting state for {len(shades)} shades")
+            log(f"🎛️  [SHADES] Setting state for {len(shades)} shades")
             
             success_ids = []
             failed_ids = []
@@ -500,10 +953,10 @@ class CrestronMockHandler(BaseHTTPRequestHandler):
                     shade["position"] = position
                     success_ids.append(shade_id)
                     percentage = int(position * 100 / 65535)
-                    print(f"   ✅ Shade {shade_id} ({shade['name']}) → {percentage}%")
+                    log(f"   ✅ Shade {shade_id} ({shade['name']}) → {percentage}%")
                 else:
                     failed_ids.append(shade_id)
-                    print(f"   ❌ Shade {shade_id} not found")
+                    log(f"   ❌ Shade {shade_id} not found")
             
             if failed_ids:
                 self._send_json({
@@ -527,22 +980,22 @@ class CrestronMockHandler(BaseHTTPRequestHandler):
             if scene:
                 # Toggle scene status
                 scene["status"] = not scene["status"]
-                print(f"🎬 [SCENE] Activated scene {scene_id} ({scene['name']})")
+                log(f"🎬 [SCENE] Activated scene {scene_id} ({scene['name']})")
                 
                 # Simulate scene effects
                 if "Film" in scene["name"]:
-                    print("   📺 Dimming living room lights to 10%...")
+                    log("   📺 Dimming living room lights to 10%...")
                 elif "Notte" in scene["name"]:
-                    print("   🌙 Turning off all lights...")
+                    log("   🌙 Turning off all lights...")
                 elif "Buongiorno" in scene["name"]:
-                    print("   ☀️ Opening all shades...")
+                    log("   ☀️ Opening all shades...")
                 
                 self._send_json({
                     "status": "success",
                     "version": "1.000.0001"
                 })
             else:
-                print(f"❌ [SCENE] Scene {scene_id} not found")
+                log(f"❌ [SCENE] Scene {scene_id} not found")
                 self._send_json({
                     "error": f"Scene with ID {scene_id} not found in the system."
                 }, 404)
@@ -556,12 +1009,12 @@ class CrestronMockHandler(BaseHTTPRequestHandler):
             thermostat = get_device_by_id(thermostat_id)
             
             if thermostat and thermostat["type"] == "thermostat":
-                print(f"🌡️  [THERMOSTAT] Setting {len(setpoints)} setpoint(s) for {thermostat_id}")
+                log(f"🌡️  [THERMOSTAT] Setting {len(setpoints)} setpoint(s) for {thermostat_id}")
                 
                 for sp in setpoints:
                     sp_type = sp.get("type")
                     temperature = sp.get("temperature")
-                    print(f"   ✅ {sp_type} setpoint → {temperature/10}°C")
+                    log(f"   ✅ {sp_type} setpoint → {temperature/10}°C")
                     
                     if sp_type == thermostat["setPoint"]["type"]:
                         thermostat["setPoint"]["temperature"] = temperature
@@ -571,7 +1024,7 @@ class CrestronMockHandler(BaseHTTPRequestHandler):
                     "version": "1.000.0001"
                 })
             else:
-                print(f"❌ [THERMOSTAT] Thermostat {thermostat_id} not found")
+                log(f"❌ [THERMOSTAT] Thermostat {thermostat_id} not found")
                 self._send_json({
                     "error": f"Thermostat with ID {thermostat_id} not found in the system."
                 }, 404)
@@ -580,7 +1033,7 @@ class CrestronMockHandler(BaseHTTPRequestHandler):
         # Thermostat mode
         if path == "/cws/api/thermostats/mode":
             thermostats = data.get("thermostats", [])
-            print(f"🌡️  [THERMOSTAT] Setting mode for {len(thermostats)} thermostat(s)")
+            log(f"🌡️  [THERMOSTAT] Setting mode for {len(thermostats)} thermostat(s)")
             
             for tstat in thermostats:
                 tstat_id = tstat.get("id")
@@ -589,7 +1042,7 @@ class CrestronMockHandler(BaseHTTPRequestHandler):
                 thermostat = get_device_by_id(tstat_id)
                 if thermostat and thermostat["type"] == "thermostat":
                     thermostat["mode"] = mode
-                    print(f"   ✅ Thermostat {tstat_id} mode → {mode}")
+                    log(f"   ✅ Thermostat {tstat_id} mode → {mode}")
             
             self._send_json({
                 "status": "success",
@@ -600,7 +1053,7 @@ class CrestronMockHandler(BaseHTTPRequestHandler):
         # Thermostat fan mode
         if path == "/cws/api/thermostats/fanmode":
             thermostats = data.get("thermostats", [])
-            print(f"🌡️  [THERMOSTAT] Setting fan mode for {len(thermostats)} thermostat(s)")
+            log(f"🌡️  [THERMOSTAT] Setting fan mode for {len(thermostats)} thermostat(s)")
             
             for tstat in thermostats:
                 tstat_id = tstat.get("id")
@@ -609,7 +1062,7 @@ class CrestronMockHandler(BaseHTTPRequestHandler):
                 thermostat = get_device_by_id(tstat_id)
                 if thermostat and thermostat["type"] == "thermostat":
                     thermostat["currentFanMode"] = mode
-                    print(f"   ✅ Thermostat {tstat_id} fan → {mode}")
+                    log(f"   ✅ Thermostat {tstat_id} fan → {mode}")
             
             self._send_json({
                 "status": "success",
@@ -618,7 +1071,7 @@ class CrestronMockHandler(BaseHTTPRequestHandler):
             return
         
         # Unknown endpoint
-        print(f"❌ [UNKNOWN] Unknown POST endpoint: {path}")
+        log(f"❌ [UNKNOWN] Unknown POST endpoint: {path}")
         self._send_json({
             "error": "Endpoint not found"
         }, 404)
@@ -629,6 +1082,7 @@ class CrestronMockHandler(BaseHTTPRequestHandler):
         self.send_header('Access-Control-Allow-Origin', '*')
         self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
         self.send_header('Access-Control-Allow-Headers', 'Content-Type, Crestron-RestAPI-AuthToken, Crestron-RestAPI-AuthKey')
+        self.send_header('Content-Length', '0')
         self.end_headers()
 
 
@@ -636,10 +1090,34 @@ class CrestronMockHandler(BaseHTTPRequestHandler):
 # Main Server
 # ============================================================================
 
-def run_server(port: int = 8080):
-    """Run the mock Crestron server."""
+class LoadTestHandler(CrestronMockHandler):
+    """Keep-alive variant of the handler for load tests (every response has a length)."""
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately; without this, small responses
+    # on a kept-alive connection wait out the client's delayed ACK
+    disable_nagle_algorithm = True
+
+
+class LoadTestServer(ThreadingHTTPServer):
+    """One thread per connection, with a listen backlog sized for bursts."""
+    daemon_threads = True
+    request_queue_size = 128
+
+
+def run_server(port: int = 8080, load_test: bool = False):
+    """
+    Run the mock Crestron server.
+    
+    With load_test, requests are handled on their own threads over
+    keep-alive connections and responses are compact JSON.
+    """
+    global JSON_INDENT
     server_address = ('', port)
-    httpd = HTTPServer(server_address, CrestronMockHandler)
+    if load_test:
+        JSON_INDENT = None
+        httpd = LoadTestServer(server_address, LoadTestHandler)
+    else:
+        httpd = HTTPServer(server_address, CrestronMockHandler)
     
     print("=" * 70)
     print("🏠 MOCK CRESTRON HOME SERVER")
@@ -650,21 +1128,26 @@ def run_server(port: int = 8080):
     print("\n📊 Mock Data Loaded:")
     print(f"   - Stanze: {len(ROOMS)}")
     print(f"   - Dispositivi: {len(DEVICES)}")
-    print(f"     • Luci: {len([d for d in DEVICES if d['type'] == 'light'])}")
-    print(f"     • Tapparelle: {len([d for d in DEVICES if d['type'] == 'shade'])}")
-    print(f"     • Sensori: {len([d for d in DEVICES if d['type'] == 'sensor'])}")
-    print(f"     • Termostati: {len([d for d in DEVICES if d['type'] == 'thermostat'])}")
+    print(f"     • Luci: {len(devices_of_type('light'))}")
+    print(f"     • Tapparelle: {len(devices_of_type('shade'))}")
+    print(f"     • Sensori: {len(devices_of_type('sensor'))}")
+    print(f"     • Termostati: {len(devices_of_type('thermostat'))}")
     print(f"   - Scene: {len(SCENES)}")
+    if load_test:
+        print("\n⚡ Load-test mode: threaded, keep-alive, compact JSON")
+    if PROFILE.name != "none":
+        print(f"💥 Fault profile: {PROFILE.name} (seed {PROFILE.seed}); see /mock/admin/profile")
     
     print("\n📝 Configuration for MCP:")
     print(f"   CRESTRON_HOST=localhost:{port}")
     print(f"   CRESTRON_AUTH_TOKEN={AUTH_TOKEN}")
     
-    print("\n🏘️  Stanze:")
-    for room in ROOMS:
-        if room["id"] != 1001:
-            devices_in_room = [d for d in DEVICES if d.get("roomId") == room["id"]]
-            print(f"   • {room['name']} (ID: {room['id']}) - {len(devices_in_room)} dispositivi")
+    if len(ROOMS) <= 20:
+        print("\n🏘️  Stanze:")
+        for room in ROOMS:
+            if room["id"] != 1001:
+                devices_in_room = [d for d in DEVICES if d.get("roomId") == room["id"]]
+                print(f"   • {room['name']} (ID: {room['id']}) - {len(devices_in_room)} dispositivi")
     
     print("\n💡 Esempi di comandi da testare con Claude:")
     print("   1. 'Spegni il lampadario in soggiorno'")
@@ -685,15 +1168,40 @@ def run_server(port: int = 8080):
         print("✅ Server stopped")
 
 
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Mock Crestron Home API server")
+    parser.add_argument("port", nargs="?", type=int, default=8080)
+    parser.add_argument("--load-test", action="store_true",
+                        help="threaded server, keep-alive, compact JSON, synthetic house, quiet log")
+    parser.add_argument("--rooms", type=int, default=100, help="synthetic rooms (--load-test)")
+    parser.add_argument("--devices", type=int, default=2000, help="synthetic devices (--load-test)")
+    parser.add_argument("--scenes", type=int, default=200, help="synthetic scenes (--load-test)")
+    parser.add_argument("--seed", type=int, default=1, help="synthetic house seed (--load-test)")
+    parser.add_argument("--demo-data", action="store_true",
+                        help="keep the demo house in --load-test mode")
+    parser.add_argument("--log-rate", type=float, default=None,
+                        help="log at most this many request lines per second")
+    parser.add_argument("--quiet", action="store_true", help="no request logging")
+    parser.add_argument("--profile", default="none",
+                        help=f"fault profile: {', '.join(FAULT_PROFILES)}, or a .json file")
+    parser.add_argument("--fault-seed", type=int, default=0, help="seed for fault and latency draws")
+    return parser.parse_args(argv)
+
+
 if __name__ == "__main__":
-    port = 8080
+    args = parse_args()
     
-    # Check if port is specified
-    if len(sys.argv) > 1:
-        try:
-            port = int(sys.argv[1])
-        except ValueError:
-            print(f"Invalid port: {sys.argv[1]}")
-            sys.exit(1)
+    try:
+        PROFILE = load_profile(args.profile, args.fault_seed)
+    except (OSError, ValueError) as e:
+        print(f"Invalid profile: {e}")
+        sys.exit(1)
+    
+    if args.load_test and not args.demo_data:
+        generate_house(args.rooms, args.devices, args.scenes, args.seed)
+    
+    # Load tests log nothing per request unless a rate is asked for
+    log.enabled = not args.quiet and (args.log_rate is not None or not args.load_test)
+    log.rate = args.log_rate
     
-    run_server(port)
+    run_server(args.port, load_test=args.load_test)
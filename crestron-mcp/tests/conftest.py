@@ -0,0 +1,54 @@
+"""Shared fixtures for crestron-mcp tests."""
+
+import asyncio
+import sys
+import os
+import pytest
+
+# Ensure crestron_mcp is importable
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import crestron_mcp
+
+
+@pytest.fixture(autouse=True)
+def _fresh_globals(monkeypatch):
+    """The session, coalescer and caches are module-level; isolate each test."""
+    monkeypatch.setattr(crestron_mcp, "_session", crestron_mcp.CrestronSession())
+    monkeypatch.setattr(crestron_mcp, "_coalescer", crestron_mcp.GetCoalescer())
+    monkeypatch.setattr(crestron_mcp, "_inventory", crestron_mcp.InventoryCache())
+    monkeypatch.setattr(crestron_mcp, "_resolution", crestron_mcp.ResolutionIndex())
+
+
+class FakeProcessor:
+    """
+    Stands in for api_request: answers GETs from `data` and POSTs from
+    `responses` (an exception there is raised), recording every call.
+    """
+
+    def __init__(self, data=None, delay=0.0):
+        self.data = data or {}
+        self.responses = {}
+        self.delay = delay
+        self.calls = []
+
+    async def __call__(self, endpoint, method="GET", body=None, require_auth=True):
+        self.calls.append((method, endpoint, body))
+        await asyncio.sleep(self.delay)
+        if method == "GET":
+            return self.data[endpoint]
+        response = self.responses.get(endpoint, {"status": "success"})
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    def gets(self, endpoint):
+        return sum(1 for method, path, _ in self.calls if method == "GET" and path == endpoint)
+
+
+@pytest.fixture
+def processor(monkeypatch):
+    """Replace api_request with a FakeProcessor."""
+    fake = FakeProcessor()
+    monkeypatch.setattr(crestron_mcp, "api_request", fake)
+    return fake
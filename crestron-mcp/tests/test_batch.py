@@ -0,0 +1,173 @@
+"""Test batch command validation, grouping and partial-failure reporting."""
+
+import json
+
+import httpx
+import pytest
+from pydantic import ValidationError
+import crestron_mcp
+from crestron_mcp import BatchCommandInput, DeviceCommand, crestron_batch_command, plan_batch
+
+pytestmark = pytest.mark.unit
+
+DEVICES = [
+    {"id": 10, "name": "Ceiling", "type": "light", "roomId": 1},
+    {"id": 11, "name": "Lamp", "type": "light", "roomId": 1},
+    {"id": 20, "name": "Blind", "type": "shade", "roomId": 1},
+    {"id": 30, "name": "Lounge", "type": "thermostat", "roomId": 1},
+    {"id": 31, "name": "Bedroom", "type": "thermostat", "roomId": 2},
+]
+
+
+def batch(*commands):
+    return BatchCommandInput(commands=[DeviceCommand(**c) for c in commands])
+
+
+async def run(params):
+    return json.loads(await crestron_batch_command(params))
+
+
+@pytest.fixture
+def system(processor):
+    processor.data["/devices"] = {"devices": DEVICES}
+    return processor
+
+
+def posts(processor):
+    return {endpoint: body for method, endpoint, body in processor.calls if method == "POST"}
+
+
+class TestDeviceCommand:
+
+    def test_needs_an_action(self):
+        with pytest.raises(ValidationError, match="sets nothing"):
+            DeviceCommand(id=10)
+
+    def test_duplicate_field_for_a_device_is_rejected(self):
+        with pytest.raises(ValidationError, match="Device 10 is given level more than once"):
+            batch({"id": 10, "level": 20}, {"id": 11, "level": 0}, {"id": 10, "level": 80})
+
+    def test_different_fields_for_a_device_are_allowed(self):
+        params = batch({"id": 30, "mode": "COOL"}, {"id": 30, "fan_mode": "AUTO"})
+        assert len(params.commands) == 2
+
+    @pytest.mark.parametrize("command", [
+        {"id": 10, "level": 101},
+        {"id": 20, "position": -1},
+        {"id": 0, "level": 5},
+        {"id": 30, "mode": "DRY"},
+        {"id": 30, "setpoints": []},
+        {"id": 10, "brightness": 5},
+    ])
+    def test_rejects_invalid_values(self, command):
+        with pytest.raises(ValidationError):
+            DeviceCommand(**command)
+
+
+class TestPlanBatch:
+
+    def test_groups_by_endpoint(self):
+        plan = plan_batch(batch(
+            {"id": 10, "level": 100},
+            {"id": 11, "level": 0},
+            {"id": 20, "position": 50},
+            {"id": 30, "mode": "COOL", "fan_mode": "AUTO"},
+            {"id": 31, "mode": "HEAT"},
+        ).commands)
+        by_endpoint = {endpoint: (body, targets) for endpoint, body, targets in plan}
+        assert list(by_endpoint) == [
+            "/lights/SetState", "/shades/SetState", "/thermostats/mode", "/thermostats/fanmode",
+        ]
+        assert by_endpoint["/lights/SetState"] == (
+            {"lights": [{"id": 10, "level": 65535}, {"id": 11, "level": 0}]},
+            [(10, "level"), (11, "level")],
+        )
+        assert by_endpoint["/shades/SetState"][0] == {"shades": [{"id": 20, "position": 32767}]}
+        assert by_endpoint["/thermostats/mode"][0] == {
+            "thermostats": [{"id": 30, "mode": "COOL"}, {"id": 31, "mode": "HEAT"}]
+        }
+        assert by_endpoint["/thermostats/fanmode"][1] == [(30, "fan_mode")]
+
+    def test_setpoints_are_one_request_per_thermostat(self):
+        plan = plan_batch(batch(
+            {"id": 30, "setpoints": [{"type": "Cool", "temperature": 230}]},
+            {"id": 31, "setpoints": [{"type": "Heat", "temperature": 200}, {"type": "Cool", "temperature": 250}]},
+        ).commands)
+        assert [(endpoint, targets) for endpoint, _, targets in plan] == [
+            ("/thermostats/SetPoint", [(30, "setpoints")]),
+            ("/thermostats/SetPoint", [(31, "setpoints")]),
+        ]
+        assert plan[1][1] == {"id": 31, "setpoints": [
+            {"type": "Heat", "temperature": 200}, {"type": "Cool", "temperature": 250},
+        ]}
+
+    def test_empty(self):
+        assert plan_batch([]) == []
+
+
+class TestBatchCommand:
+
+    async def test_success(self, system):
+        result = await run(batch({"id": 10, "level": 40}, {"id": 11, "level": 40}, {"id": 20, "position": 0}))
+        assert result["status"] == "success"
+        assert result["requests"] == 2
+        assert [r["status"] for r in result["results"]] == ["success"] * 3
+        assert set(posts(system)) == {"/lights/SetState", "/shades/SetState"}
+
+    async def test_fields_checked_against_device_type_before_sending(self, system):
+        result = await run(batch({"id": 10, "level": 40, "position": 10}, {"id": 99, "level": 5}))
+        assert result["status"] == "partial"
+        ceiling, unknown = result["results"]
+        assert ceiling == {"id": 10, "applied": ["level"],
+                           "failed": {"position": "position does not apply to a light"},
+                           "status": "partial"}
+        assert unknown == {"id": 99, "failed": {"level": "device 99 not found"}, "status": "failed"}
+        assert posts(system) == {"/lights/SetState": {"lights": [{"id": 10, "level": 26214}]}}
+
+    async def test_nothing_sendable(self, system):
+        result = await run(batch({"id": 20, "level": 5}))
+        assert result["status"] == "failure"
+        assert result["requests"] == 0
+        assert posts(system) == {}
+
+    async def test_partial_failure_per_request(self, system):
+        request = httpx.Request("POST", "http://cp4r/cws/api/shades/SetState")
+        system.responses["/shades/SetState"] = httpx.HTTPStatusError(
+            "boom", request=request, response=httpx.Response(500, request=request)
+        )
+        system.responses["/thermostats/mode"] = {
+            "status": "partial", "errorDevices": [31], "errorMessage": "thermostat offline",
+        }
+        result = await run(batch(
+            {"id": 10, "level": 100},
+            {"id": 20, "position": 100},
+            {"id": 30, "mode": "COOL"},
+            {"id": 31, "mode": "COOL"},
+        ))
+        assert result["status"] == "partial"
+        by_id = {r["id"]: r for r in result["results"]}
+        assert by_id[10]["status"] == "success"
+        assert by_id[20] == {"id": 20, "failed": {"position": "HTTP 500"}, "status": "failed"}
+        assert by_id[30]["applied"] == ["mode"]
+        assert by_id[31]["failed"] == {"mode": "thermostat offline"}
+
+    async def test_failure_status_without_error_devices_fails_the_whole_request(self, system):
+        system.responses["/lights/SetState"] = {"status": "failure"}
+        result = await run(batch({"id": 10, "level": 1}, {"id": 11, "level": 1}))
+        assert result["status"] == "failure"
+        assert all(r["failed"] == {"level": "rejected by the processor"} for r in result["results"])
+
+    async def test_invalidates_state_of_touched_collections(self, system):
+        system.data["/shades"] = {"shades": [DEVICES[2]]}
+        await crestron_mcp._inventory.get("shades")
+        await run(batch({"id": 20, "position": 0}))
+        assert not crestron_mcp._inventory.fresh("shades", state=True)
+        assert not crestron_mcp._inventory.fresh("devices", state=True)
+        assert crestron_mcp._inventory.fresh("devices", state=False)
+
+    async def test_invalidates_only_real_collections(self, system, monkeypatch):
+        invalidated = []
+        monkeypatch.setattr(crestron_mcp._inventory, "invalidate_state", lambda *names: invalidated.extend(names))
+        await run(batch({"id": 10, "level": 40}, {"id": 30, "mode": "HEAT"}))
+        assert set(invalidated) == {"devices", "thermostats"}
+        assert set(invalidated) <= set(crestron_mcp.INVENTORY_COLLECTIONS)
@@ -0,0 +1,77 @@
+"""Test single-flight GETs in GetCoalescer."""
+
+import asyncio
+
+import pytest
+from crestron_mcp import GetCoalescer
+
+pytestmark = pytest.mark.unit
+
+
+class Upstream:
+    """A fetch that counts calls and answers (or fails) after a short wait."""
+
+    def __init__(self, error=None, delay=0.02):
+        self.error = error
+        self.delay = delay
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return {"call": self.calls}
+
+
+class TestGetCoalescer:
+
+    async def test_identical_gets_share_one_request(self):
+        coalescer = GetCoalescer()
+        fetch = Upstream()
+        results = await asyncio.gather(*(coalescer.get(("h", "/rooms"), fetch) for _ in range(5)))
+        assert fetch.calls == 1
+        assert all(r is results[0] for r in results)
+        assert coalescer.stats() == {"upstream_gets": 1, "coalesced_gets": 4, "in_flight": 0}
+
+    async def test_different_keys_are_separate(self):
+        coalescer = GetCoalescer()
+        rooms, devices = Upstream(), Upstream()
+        await asyncio.gather(coalescer.get(("h", "/rooms"), rooms),
+                             coalescer.get(("h", "/devices"), devices))
+        assert rooms.calls == devices.calls == 1
+
+    async def test_error_reaches_every_waiter(self):
+        coalescer = GetCoalescer()
+        fetch = Upstream(error=ConnectionError("down"))
+        results = await asyncio.gather(*(coalescer.get(("h", "/rooms"), fetch) for _ in range(3)),
+                                       return_exceptions=True)
+        assert fetch.calls == 1
+        assert all(isinstance(r, ConnectionError) for r in results)
+
+    async def test_key_released_after_success(self):
+        coalescer = GetCoalescer()
+        fetch = Upstream()
+        first = await coalescer.get(("h", "/rooms"), fetch)
+        second = await coalescer.get(("h", "/rooms"), fetch)
+        assert fetch.calls == 2
+        assert first is not second
+        assert coalescer.stats()["in_flight"] == 0
+
+    async def test_key_released_after_failure(self):
+        coalescer = GetCoalescer()
+        failing = Upstream(error=ConnectionError("down"))
+        with pytest.raises(ConnectionError):
+            await coalescer.get(("h", "/rooms"), failing)
+        assert coalescer.stats()["in_flight"] == 0
+        assert await coalescer.get(("h", "/rooms"), Upstream()) == {"call": 1}
+
+    async def test_cancelled_caller_does_not_cancel_the_others(self):
+        coalescer = GetCoalescer()
+        fetch = Upstream()
+        impatient = asyncio.ensure_future(coalescer.get(("h", "/rooms"), fetch))
+        patient = asyncio.ensure_future(coalescer.get(("h", "/rooms"), fetch))
+        await asyncio.sleep(0)
+        impatient.cancel()
+        assert await patient == {"call": 1}
+        assert impatient.cancelled()
@@ -0,0 +1,98 @@
+"""Test the compact response format: field projection and columnar tables."""
+
+import json
+
+import pytest
+from crestron_mcp import (
+    COMPACT_COLUMNAR_MIN, COMPACT_DEFAULT_FIELDS, GetThermostatsInput, ListDevicesInput,
+    compact_items, format_json,
+)
+
+pytestmark = pytest.mark.unit
+
+LIGHT = {"id": 1, "name": "Ceiling", "type": "light", "subType": "dimmer", "roomId": 10,
+         "level": 65535, "connectionStatus": "online"}
+SHADE = {"id": 2, "name": "Blind", "type": "shade", "roomId": 10, "position": 0,
+         "connectionStatus": "online"}
+THERMOSTAT = {"id": 3, "name": "Lounge", "type": "thermostat", "roomId": 10, "mode": "Cool",
+              "currentTemperature": 245, "setPoint": {"type": "Cool", "temperature": 230},
+              "currentFanMode": "Auto", "schedulerState": "run"}
+SENSOR = {"id": 4, "name": "Motion", "type": "sensor", "subType": "OccupancySensor", "roomId": 10,
+          "presence": "Vacant", "battery level": "Normal", "rawValue": 0}
+LOCK = {"id": 5, "name": "Front Door", "type": "lock", "roomId": 20, "status": "locked"}
+
+
+class TestCompactItems:
+
+    @pytest.mark.parametrize("kind", ["light", "shade", "thermostat", "sensor"])
+    def test_every_type_default_keeps_id_name_and_type(self, kind):
+        assert COMPACT_DEFAULT_FIELDS[kind][:3] == ["id", "name", "type"]
+
+    def test_per_type_defaults(self):
+        compact = compact_items([LIGHT, SHADE, THERMOSTAT, SENSOR], "devices")
+        assert compact[0] == {"id": 1, "name": "Ceiling", "type": "light", "roomId": 10, "level": 65535}
+        assert compact[1] == {"id": 2, "name": "Blind", "type": "shade", "roomId": 10, "position": 0,
+                              "connectionStatus": "online"}
+        assert compact[2]["type"] == "thermostat"
+        assert "schedulerState" not in compact[2]
+        assert compact[3] == {"id": 4, "name": "Motion", "type": "sensor", "subType": "OccupancySensor",
+                              "roomId": 10, "presence": "Vacant", "battery level": "Normal"}
+
+    def test_unknown_type_uses_collection_defaults(self):
+        assert compact_items([LOCK], "devices") == [
+            {"id": 5, "name": "Front Door", "type": "lock", "roomId": 20}
+        ]
+        assert compact_items([{"id": 9, "name": "Lounge", "floor": 1}], "rooms") == [
+            {"id": 9, "name": "Lounge"}
+        ]
+
+    def test_explicit_fields_override_defaults(self):
+        compact = compact_items([LIGHT, LOCK], "devices", fields=["id", "status"])
+        assert compact == [{"id": 1}, {"id": 5, "status": "locked"}]
+
+    def test_columnar_groups_rows_by_field_set(self):
+        tables = compact_items([LIGHT, SHADE, dict(LIGHT, id=6, level=0)], "devices", columnar=True)
+        assert len(tables) == 2
+        lights = tables[0]
+        assert lights["columns"] == COMPACT_DEFAULT_FIELDS["light"]
+        assert lights["rows"] == [[1, "Ceiling", "light", 10, 65535], [6, "Ceiling", "light", 10, 0]]
+        assert tables[1]["rows"] == [[2, "Blind", "shade", 10, 0, "online"]]
+
+    def test_columnar_missing_fields_are_null(self):
+        tables = compact_items([LOCK], "devices", fields=["id", "level"], columnar=True)
+        assert tables == [{"columns": ["id", "level"], "rows": [[5, None]]}]
+
+    def test_columnar_threshold(self):
+        lights = [dict(LIGHT, id=i) for i in range(COMPACT_COLUMNAR_MIN)]
+        assert isinstance(compact_items(lights[:-1], "devices")[0], dict)
+        assert "columns" in compact_items(lights, "devices")[0]
+        assert isinstance(compact_items(lights, "devices", columnar=False)[0], dict)
+        assert "columns" in compact_items(lights[:2], "devices", columnar=True)[0]
+
+
+class TestFormatJson:
+
+    def test_json_format_is_unchanged(self):
+        params = ListDevicesInput(response_format="json")
+        payload = {"devices": [LIGHT], "count": 1}
+        assert format_json(payload, params, "devices") == json.dumps(payload, indent=2)
+
+    def test_compact_is_minified_and_projected(self):
+        params = ListDevicesInput(response_format="compact")
+        result = format_json({"devices": [LIGHT, LOCK], "count": 2}, params, "devices")
+        assert " " not in result.replace("Front Door", "")
+        assert json.loads(result) == {
+            "devices": [{"id": 1, "name": "Ceiling", "type": "light", "roomId": 10, "level": 65535},
+                        {"id": 5, "name": "Front Door", "type": "lock", "roomId": 20}],
+            "count": 2,
+        }
+
+    def test_compact_uses_fields_and_columnar_from_params(self):
+        params = GetThermostatsInput(response_format="compact", fields=["id", "mode"], columnar=True)
+        result = json.loads(format_json({"thermostats": [THERMOSTAT]}, params, "thermostats"))
+        assert result == {"thermostats": [{"columns": ["id", "mode"], "rows": [[3, "Cool"]]}]}
+
+    def test_compact_keeps_non_ascii(self):
+        params = ListDevicesInput(response_format="compact")
+        result = format_json({"devices": [dict(LIGHT, name="Lampadario Città")]}, params, "devices")
+        assert "Città" in result
@@ -0,0 +1,129 @@
+"""Test the inventory cache: TTLs, single-flight refreshes and state diffs."""
+
+import asyncio
+
+import pytest
+import crestron_mcp
+from crestron_mcp import InventoryIndex
+
+pytestmark = pytest.mark.unit
+
+DEVICES = [
+    {"id": 1, "name": "Ceiling", "type": "dimmer", "roomId": 10, "level": 0},
+    {"id": 2, "name": "Floor Lamp", "type": "switch", "roomId": 10, "level": 0},
+    {"id": 3, "name": "Pendant", "type": "dimmer", "roomId": 20, "level": 100},
+]
+
+
+def listing(**levels):
+    """DEVICES with some levels changed, as fresh dicts like a new response."""
+    return [dict(d, level=levels.get(f"d{d['id']}", d["level"])) for d in DEVICES]
+
+
+def age(index, seconds):
+    index.fetched_at -= seconds
+
+
+@pytest.fixture
+def devices(processor):
+    processor.data["/devices"] = {"devices": listing()}
+    processor.data["/rooms"] = {"rooms": [{"id": 10, "name": "Lounge"}]}
+    return processor
+
+
+class TestInventoryIndex:
+
+    def test_indexes(self):
+        index = InventoryIndex(listing())
+        assert index.by_id[2]["name"] == "Floor Lamp"
+        assert [d["id"] for d in index.by_room[10]] == [1, 2]
+        assert [d["id"] for d in index.by_type["dimmer"]] == [1, 3]
+
+    def test_last_changed_lists_only_changed_items(self):
+        index = InventoryIndex(listing())
+        assert index.last_changed == [1, 2, 3]
+        index.update(listing(d2=50))
+        assert index.last_changed == [2]
+        index.update(listing(d2=50))
+        assert index.last_changed == []
+
+    def test_state_change_replaces_items_without_mutating_them(self):
+        index = InventoryIndex(listing())
+        handed_out = index.by_id[2]
+        unchanged = index.by_id[1]
+        index.update(listing(d2=50))
+        assert handed_out["level"] == 0
+        assert index.by_id[2]["level"] == 50
+        assert index.by_id[1] is unchanged
+        assert index.by_room[10][1] is index.by_id[2]
+        assert index.by_type["switch"][0] is index.by_id[2]
+        assert index.items[1] is index.by_id[2]
+
+    def test_static_change_rebuilds_indexes(self):
+        index = InventoryIndex(listing())
+        moved = listing()
+        moved[0]["roomId"] = 20
+        index.update(moved)
+        assert index.last_changed == [1]
+        assert [d["id"] for d in index.by_room[10]] == [2]
+        assert [d["id"] for d in index.by_room[20]] == [1, 3]
+
+
+class TestInventoryCache:
+
+    async def test_second_read_is_a_hit(self, devices):
+        first = await crestron_mcp._inventory.get("devices")
+        second = await crestron_mcp._inventory.get("devices")
+        assert first is second
+        assert devices.gets("/devices") == 1
+        assert crestron_mcp._inventory.stats()["hits"] == 1
+
+    async def test_state_expires_before_static(self, devices):
+        cache = crestron_mcp._inventory
+        index = await cache.get("devices")
+        age(index, crestron_mcp.INVENTORY_STATE_TTL + 1)
+        assert cache.fresh("devices", state=False)
+        assert not cache.fresh("devices", state=True)
+        await cache.get("devices", state=False)
+        assert devices.gets("/devices") == 1
+        await cache.get("devices", state=True)
+        assert devices.gets("/devices") == 2
+
+    async def test_static_expires_after_static_ttl(self, devices):
+        cache = crestron_mcp._inventory
+        index = await cache.get("devices", state=False)
+        age(index, crestron_mcp.INVENTORY_STATIC_TTL + 1)
+        assert not cache.fresh("devices", state=False)
+        await cache.get("devices", state=False)
+        assert devices.gets("/devices") == 2
+
+    async def test_concurrent_refreshes_share_one_request(self, devices):
+        devices.delay = 0.02
+        cache = crestron_mcp._inventory
+        results = await asyncio.gather(*(cache.get("devices") for _ in range(5)),
+                                       cache.get("rooms"), cache.get("rooms"))
+        assert devices.gets("/devices") == 1
+        assert devices.gets("/rooms") == 1
+        assert all(r is results[0] for r in results[:5])
+        assert cache.stats()["fetches"] == 2
+
+    async def test_invalidate_state_after_write(self, devices):
+        cache = crestron_mcp._inventory
+        await cache.get("devices")
+        cache.invalidate_state("devices", "shades")  # unknown collections are ignored
+        assert not cache.fresh("devices", state=True)
+        assert cache.fresh("devices", state=False)
+        await cache.get("devices", state=False)
+        assert devices.gets("/devices") == 1
+
+        devices.data["/devices"] = {"devices": listing(d3=0)}
+        index = await cache.get("devices", state=True)
+        assert devices.gets("/devices") == 2
+        assert index.state_valid
+        assert index.last_changed == [3]
+
+    async def test_clear_drops_collections(self, devices):
+        cache = crestron_mcp._inventory
+        await cache.get("devices")
+        cache.clear()
+        assert not cache.fresh("devices", state=False)
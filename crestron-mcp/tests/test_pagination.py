@@ -0,0 +1,104 @@
+"""Test keyset cursors and paged JSON listings."""
+
+import json
+
+import pytest
+import crestron_mcp
+from crestron_mcp import (
+    ListDevicesInput, crestron_list_devices, decode_cursor, encode_cursor, page_json, paginate,
+)
+
+pytestmark = pytest.mark.unit
+
+ITEMS = [{"id": i, "name": f"Device {i}"} for i in (7, 3, 12, 1, 9, 4, 10)]
+
+
+def walk(items, limit):
+    """Every page of page_json, following next_cursor until it is None."""
+    pages, cursor = [], None
+    while True:
+        page = page_json(items, cursor, limit)
+        pages.append(page)
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return pages
+
+
+class TestCursor:
+
+    def test_round_trip(self):
+        for key in [(5,), ("light", 12), ("Lounge", "dimmer", 0)]:
+            assert decode_cursor(encode_cursor(key), len(key)) == key
+
+    def test_cursor_is_url_safe(self):
+        cursor = encode_cursor(("àèì ~?/+", 99))
+        assert set(cursor) <= set("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_")
+
+    @pytest.mark.parametrize("cursor", ["not-a-cursor", "!!!", "", encode_cursor(("a",))[:-2] + "**"])
+    def test_garbage_is_rejected(self, cursor):
+        with pytest.raises(ValueError, match="Invalid cursor"):
+            decode_cursor(cursor, 1)
+
+    def test_wrong_width_is_rejected(self):
+        with pytest.raises(ValueError, match="Invalid cursor"):
+            decode_cursor(encode_cursor(("light", 12)), 1)
+
+    def test_tampered_key_type_is_rejected(self):
+        # Decodes fine, but a string cannot be compared with the integer ids
+        with pytest.raises(ValueError, match="Invalid cursor"):
+            paginate(ITEMS, lambda item: (item["id"],), encode_cursor(("seven",)))
+
+
+class TestPageJson:
+
+    def test_pages_cover_every_item_once_in_id_order(self):
+        pages = walk(ITEMS, limit=3)
+        assert [len(p["items"]) for p in pages] == [3, 3, 1]
+        ids = [item["id"] for page in pages for item in page["items"]]
+        assert ids == sorted(item["id"] for item in ITEMS)
+        assert all(page["total"] == len(ITEMS) for page in pages)
+
+    def test_last_page_has_no_next_cursor(self):
+        assert walk(ITEMS, limit=7)[-1]["next_cursor"] is None
+        assert page_json(ITEMS)["next_cursor"] is None
+        assert page_json([], limit=5) == {"items": [], "total": 0, "next_cursor": None}
+
+    def test_order_is_stable_across_calls(self):
+        first = page_json(ITEMS, limit=4)
+        shuffled = list(reversed(ITEMS))
+        assert page_json(shuffled, limit=4) == first
+
+    def test_cursor_survives_inventory_changes(self):
+        first = page_json(ITEMS, limit=3)  # ids 1, 3, 4
+        changed = [item for item in ITEMS if item["id"] != 3] + [{"id": 2}, {"id": 5}]
+        second = page_json(changed, first["next_cursor"], limit=3)
+        assert [item["id"] for item in second["items"]] == [5, 7, 9]
+
+    def test_cursor_past_the_end_gives_empty_page(self):
+        page = page_json(ITEMS, encode_cursor((100,)), limit=3)
+        assert page["items"] == []
+        assert page["next_cursor"] is None
+
+
+class TestListTool:
+
+    @pytest.fixture
+    def devices(self, processor):
+        processor.data["/devices"] = {"devices": [dict(item, type="light", roomId=1) for item in ITEMS]}
+        return processor
+
+    async def test_json_pages(self, devices):
+        params = ListDevicesInput(limit=5, response_format="json")
+        first = json.loads(await crestron_list_devices(params))
+        assert first["count"] == 5
+        assert first["total"] == len(ITEMS)
+        params = ListDevicesInput(limit=5, cursor=first["next_cursor"], response_format="json")
+        second = json.loads(await crestron_list_devices(params))
+        assert [d["id"] for d in second["devices"]] == [10, 12]
+        assert second["next_cursor"] is None
+
+    async def test_bad_cursor_is_a_clear_error(self, devices):
+        params = ListDevicesInput(cursor="bogus", response_format="json")
+        result = json.loads(await crestron_list_devices(params))
+        assert result["error"].startswith("Invalid cursor 'bogus'")
+        assert "next_cursor" in result["error"]
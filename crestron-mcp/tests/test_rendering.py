@@ -0,0 +1,110 @@
+"""Test budgeted markdown rendering of grouped listings."""
+
+import re
+
+import pytest
+from crestron_mcp import CHARACTER_LIMIT, MarkdownRenderer, render_grouped_markdown
+
+pytestmark = pytest.mark.unit
+
+DEVICES = [
+    {"id": 4, "name": "Pendant", "type": "light"},
+    {"id": 2, "name": "Blind", "type": "shade"},
+    {"id": 1, "name": "Ceiling", "type": "light"},
+    {"id": 3, "name": "Curtain", "type": "shade"},
+    {"id": 5, "name": "Lamp", "type": "light"},
+]
+
+
+def render(items, cursor=None, limit=None, item_text=None):
+    return render_grouped_markdown(
+        "Devices", items,
+        group_of=lambda d: d["type"],
+        heading=lambda group, n: f"## {group} ({n})\n",
+        render_item=item_text or (lambda d: f"- {d['name']} [{d['id']}]\n"),
+        cursor=cursor,
+        limit=limit,
+    )
+
+
+def next_cursor(page):
+    match = re.search(r'cursor="([^"]+)"', page)
+    return match.group(1) if match else None
+
+
+def names(page):
+    return re.findall(r"^- (\w+)", page, re.M)
+
+
+class TestMarkdownRenderer:
+
+    def test_stops_at_budget_and_counts(self):
+        renderer = MarkdownRenderer(budget=MarkdownRenderer.FOOTER_RESERVE + 25)
+        accepted = [renderer.item("x" * 10) for _ in range(4)]
+        assert accepted == [True, True, False, False]
+        assert renderer.emitted == 2
+        footer = renderer.finish(4, 0, "abc")
+        assert "Showing items 1-2 of 4; 2 more not shown" in footer
+        assert 'cursor="abc"' in footer
+
+    def test_first_item_is_always_written(self):
+        renderer = MarkdownRenderer(budget=MarkdownRenderer.FOOTER_RESERVE + 5)
+        assert renderer.item("x" * 100)
+        assert renderer.emitted == 1
+
+    def test_no_footer_when_complete(self):
+        renderer = MarkdownRenderer()
+        renderer.item("one\n")
+        assert renderer.finish(1) == "one\n"
+
+
+class TestRenderGroupedMarkdown:
+
+    def test_groups_in_order_with_sizes(self):
+        page = render(DEVICES)
+        assert page.startswith("# Devices (5 total)\n\n## light (3)\n")
+        assert names(page) == ["Ceiling", "Pendant", "Lamp", "Blind", "Curtain"]
+        assert "## shade (2)" in page
+        assert next_cursor(page) is None
+
+    def test_round_trip_by_limit(self):
+        seen, cursor, pages = [], None, 0
+        while True:
+            page = render(DEVICES, cursor, limit=2)
+            seen += names(page)
+            pages += 1
+            cursor = next_cursor(page)
+            if cursor is None:
+                break
+        assert pages == 3
+        assert seen == ["Ceiling", "Pendant", "Lamp", "Blind", "Curtain"]
+
+    def test_heading_repeated_when_a_page_starts_mid_group(self):
+        first = render(DEVICES, limit=2)
+        second = render(DEVICES, next_cursor(first), limit=2)
+        assert second.count("## light (3)") == 1
+        assert names(second) == ["Lamp", "Blind"]
+
+    def test_budget_cut_continues_where_it_stopped(self):
+        big = [{"id": i, "name": f"D{i}", "type": "light"} for i in range(1, 41)]
+        item_text = lambda d: f"- {d['name']} " + "." * 1000 + "\n"
+        seen, cursor = [], None
+        while True:
+            page = render(big, cursor, item_text=item_text)
+            assert len(page) <= CHARACTER_LIMIT
+            seen += names(page)
+            cursor = next_cursor(page)
+            if cursor is None:
+                break
+        assert seen == [f"D{i}" for i in range(1, 41)]
+
+    def test_last_page_has_no_cursor(self):
+        first = render(DEVICES, limit=3)
+        last = render(DEVICES, next_cursor(first), limit=3)
+        assert names(last) == ["Blind", "Curtain"]
+        assert next_cursor(last) is None
+        assert "more not shown" not in last
+
+    def test_tampered_cursor_is_rejected(self):
+        with pytest.raises(ValueError, match="Invalid cursor"):
+            render(DEVICES, cursor="eyJ0YW1wZXJlZCI6MX0")
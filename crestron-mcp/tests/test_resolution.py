@@ -0,0 +1,64 @@
+"""Test that the resolution index follows inventory layout, not live state."""
+
+import pytest
+import crestron_mcp
+
+pytestmark = pytest.mark.unit
+
+ROOMS = [{"id": 1, "name": "Cucina"}, {"id": 2, "name": "Soggiorno"}]
+
+
+def devices(**changes):
+    listing = [
+        {"id": 10, "name": "Lampadario", "type": "light", "roomId": 1, "level": 0},
+        {"id": 20, "name": "Tenda", "type": "shade", "roomId": 2, "position": 0},
+    ]
+    return [dict(d, **changes.get(f"d{d['id']}", {})) for d in listing]
+
+
+@pytest.fixture
+def system(processor, monkeypatch):
+    processor.data["/devices"] = {"devices": devices()}
+    processor.data["/rooms"] = {"rooms": ROOMS}
+    builds = []
+    build = crestron_mcp.ResolutionIndex.build
+
+    def counted_build(self, *args):
+        builds.append(args)
+        build(self, *args)
+
+    monkeypatch.setattr(crestron_mcp.ResolutionIndex, "build", counted_build)
+    processor.builds = builds
+    return processor
+
+
+async def refetch_devices(system, listing):
+    system.data["/devices"] = {"devices": listing}
+    crestron_mcp._inventory.invalidate_state("devices")
+    return await crestron_mcp._inventory.get("devices")
+
+
+async def test_state_change_does_not_rebuild(system):
+    index = await crestron_mcp._resolution.get()
+    assert index.match("lampadario cucina")[0]["device"]["id"] == 10
+    inventory = await refetch_devices(system, devices(d10={"level": 65535}))
+    await crestron_mcp._resolution.refresh()
+    assert len(system.builds) == 1
+    # Entries follow the current device dicts rather than the superseded ones
+    assert index.match("lampadario cucina")[0]["device"] is inventory.by_id[10]
+
+
+async def test_static_change_rebuilds(system):
+    index = await crestron_mcp._resolution.get()
+    await refetch_devices(system, devices(d10={"name": "Lampada"}))
+    await crestron_mcp._resolution.refresh()
+    assert len(system.builds) == 2
+    assert index.match("lampada cucina")[0]["device"]["name"] == "Lampada"
+
+
+async def test_unchanged_inventory_is_not_rebuilt(system):
+    await crestron_mcp._resolution.get()
+    await crestron_mcp._resolution.refresh()
+    await crestron_mcp._resolution.refresh()
+    assert len(system.builds) == 1
+    assert system.gets("/devices") == 1
@@ -0,0 +1,141 @@
+"""Test session renewal and the retry-once-on-401 path with a stubbed login."""
+
+import asyncio
+import time
+
+import httpx
+import pytest
+import crestron_mcp
+from crestron_mcp import CrestronSession
+
+pytestmark = pytest.mark.unit
+
+
+def stub_login(session, delay=0.01, fail=False):
+    """Replace session.login: each call issues the next AuthKey (key-1, key-2, ...)."""
+    calls = []
+
+    async def login(host, auth_token):
+        calls.append((host, auth_token))
+        await asyncio.sleep(delay)
+        if fail:
+            raise httpx.ConnectError("controller unreachable")
+        session.host, session.auth_token = host, auth_token
+        session.auth_key = f"key-{len(calls)}"
+        session.session_start = time.monotonic()
+        return {"authkey": session.auth_key}
+
+    session.login = login
+    return calls
+
+
+def logged_in(session, key="key-0"):
+    session.host, session.auth_token = "cp4r.local", "token"
+    session.auth_key = key
+    session.session_start = time.monotonic()
+
+
+class TestRenew:
+
+    async def test_concurrent_renewals_share_one_login(self):
+        session = CrestronSession()
+        logged_in(session)
+        calls = stub_login(session)
+        await asyncio.gather(*(session.renew() for _ in range(10)))
+        assert calls == [("cp4r.local", "token")]
+        assert session.renewals == 1
+        assert session.auth_key == "key-1"
+
+    async def test_stale_key_skips_login_once_session_moved_on(self):
+        session = CrestronSession()
+        logged_in(session, key="key-new")
+        calls = stub_login(session)
+        await session.renew(stale_key="key-old")
+        assert calls == []
+        await session.renew(stale_key="key-new")
+        assert len(calls) == 1
+
+    async def test_failed_login_reaches_every_waiter_and_is_retried(self):
+        session = CrestronSession()
+        logged_in(session)
+        calls = stub_login(session, fail=True)
+        results = await asyncio.gather(*(session.renew() for _ in range(3)), return_exceptions=True)
+        assert all(isinstance(r, httpx.ConnectError) for r in results)
+        assert len(calls) == 1
+        with pytest.raises(httpx.ConnectError):
+            await session.renew()
+        assert len(calls) == 2
+
+    async def test_renewal_loop_logs_in_before_expiry(self, monkeypatch):
+        monkeypatch.setattr(crestron_mcp, "SESSION_RENEW_AFTER", 0.02)
+        session = CrestronSession()
+        logged_in(session)
+        calls = stub_login(session, delay=0)
+        session.start_renewal()
+        await asyncio.sleep(0.05)
+        await session.stop_renewal()
+        assert 1 <= len(calls) <= 3
+        assert session.auth_key == f"key-{len(calls)}"
+
+
+class TestRetryOn401:
+
+    @pytest.fixture
+    async def controller(self):
+        """A processor that only accepts the current AuthKey."""
+        state = {"valid_key": "key-1", "requests": []}
+
+        def handler(request):
+            key = request.headers.get("Crestron-RestAPI-AuthKey")
+            state["requests"].append(key)
+            if key != state["valid_key"]:
+                return httpx.Response(401)
+            return httpx.Response(200, json={"rooms": [{"id": 1}]})
+
+        crestron_mcp._session.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        yield state
+        await crestron_mcp._session.client.aclose()
+
+    async def test_401_renews_and_retries(self, controller):
+        session = crestron_mcp._session
+        logged_in(session, key="key-0")
+        calls = stub_login(session)
+        data = await crestron_mcp.api_request("/rooms")
+        assert data == {"rooms": [{"id": 1}]}
+        assert controller["requests"] == ["key-0", "key-1"]
+        assert len(calls) == 1
+
+    async def test_concurrent_401s_trigger_one_login(self, controller):
+        session = crestron_mcp._session
+        logged_in(session, key="key-0")
+        calls = stub_login(session)
+        results = await asyncio.gather(
+            crestron_mcp.api_request("/rooms"),
+            crestron_mcp.api_request("/rooms", method="POST", body={}),
+            crestron_mcp.api_request("/rooms", method="POST", body={}),
+        )
+        assert all(r == {"rooms": [{"id": 1}]} for r in results)
+        assert len(calls) == 1
+
+    async def test_second_401_is_raised(self, controller):
+        session = crestron_mcp._session
+        logged_in(session, key="key-0")
+        controller["valid_key"] = "never"
+        calls = stub_login(session)
+        with pytest.raises(httpx.HTTPStatusError):
+            await crestron_mcp.api_request("/rooms")
+        assert len(calls) == 1
+        assert len(controller["requests"]) == 2
+
+    async def test_expired_session_renews_before_request(self, controller):
+        session = crestron_mcp._session
+        logged_in(session, key="key-0")
+        session.session_start -= crestron_mcp.SESSION_TIMEOUT + 1
+        calls = stub_login(session)
+        await crestron_mcp.api_request("/rooms")
+        assert controller["requests"] == ["key-1"]
+        assert len(calls) == 1
+
+    async def test_without_login_asks_to_authenticate(self, controller):
+        with pytest.raises(ValueError, match="authenticate first"):
+            await crestron_mcp.api_request("/rooms")
@@ -0,0 +1,119 @@
+"""Concurrent zone assembly: group and level a zone's speakers in parallel.
+
+Speakers already in the coordinator's group (per the current topology) are
+not re-joined. Each remaining speaker gets its volume set before it joins, so
+nobody plays at a stale level, and speakers are handled concurrently with a
+bounded number in flight.
+"""
+
+import asyncio
+import time
+from typing import Any, Dict, Iterable, List, Optional
+from pydantic import BaseModel
+from .config import ZONE_ASSEMBLY_CONCURRENCY
+from .helpers import run_soco
+
+
+class SpeakerOutcome(BaseModel):
+    """What happened to one speaker during zone assembly."""
+    name: str
+    action: str  # coordinator, joined, already grouped, offline, failed
+    volume_set: bool = False
+    error: Optional[str] = None
+    latency_ms: float = 0.0
+
+    @property
+    def grouped(self) -> bool:
+        return self.action in ("coordinator", "joined", "already grouped")
+
+
+async def _set_volume(device, volume: Optional[int], mirror=None) -> bool:
+    """Set volume unless it is unset or the event mirror shows it already there."""
+    if volume is None:
+        return False
+    live = mirror.rendering(device.ip_address) if mirror else None
+    if live and live["volume"] == volume:
+        return False
+    await run_soco(setattr, device, "volume", volume)
+    return True
+
+
+def _elapsed_ms(start: float) -> float:
+    return round((time.perf_counter() - start) * 1000, 1)
+
+
+async def prepare_coordinator(name: str, device, topology=None,
+                              volume: Optional[int] = None, mirror=None) -> SpeakerOutcome:
+    """Make sure the coordinator leads its own group and is at the target volume."""
+    start = time.perf_counter()
+    try:
+        membership = topology.get(device.ip_address) if topology else None
+        if membership is not None and not membership.is_coordinator:
+            await run_soco(device.unjoin)
+        volume_set = await _set_volume(device, volume, mirror)
+        return SpeakerOutcome(name=name, action="coordinator", volume_set=volume_set,
+                              latency_ms=_elapsed_ms(start))
+    except Exception as e:
+        return SpeakerOutcome(name=name, action="failed", error=str(e),
+                              latency_ms=_elapsed_ms(start))
+
+
+async def _join_one(name: str, device, coordinator, grouped_ips: set,
+                    volume: Optional[int], mirror, semaphore: asyncio.Semaphore) -> SpeakerOutcome:
+    if device is None:
+        return SpeakerOutcome(name=name, action="offline")
+    async with semaphore:
+        start = time.perf_counter()
+        try:
+            volume_set = await _set_volume(device, volume, mirror)
+            if device.ip_address in grouped_ips:
+                action = "already grouped"
+            else:
+                await run_soco(device.join, coordinator)
+                action = "joined"
+            return SpeakerOutcome(name=name, action=action, volume_set=volume_set,
+                                  latency_ms=_elapsed_ms(start))
+        except Exception as e:
+            return SpeakerOutcome(name=name, action="failed", error=str(e),
+                                  latency_ms=_elapsed_ms(start))
+
+
+async def join_members(
+    coordinator,
+    members: Dict[str, Any],
+    grouped_ips: Iterable[str] = (),
+    volume: Optional[int] = None,
+    mirror=None,
+    concurrency: int = ZONE_ASSEMBLY_CONCURRENCY,
+) -> List[SpeakerOutcome]:
+    """Level and join every member concurrently, skipping those already grouped.
+
+    Args:
+        coordinator: SoCo device the members should follow
+        members: Speaker name → SoCo device (None if offline)
+        grouped_ips: IPs already in the coordinator's group
+        volume: Optional (already clamped) volume for every member
+        mirror: Optional event mirror used to skip redundant volume writes
+        concurrency: Maximum speakers in flight
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    grouped = set(grouped_ips)
+    return list(await asyncio.gather(*(
+        _join_one(name, device, coordinator, grouped, volume, mirror, semaphore)
+        for name, device in members.items()
+    )))
+
+
+def format_assembly_report(outcomes: List[SpeakerOutcome]) -> str:
+    """One line per speaker for the play_in_zone response."""
+    lines = []
+    for o in outcomes:
+        detail = o.action
+        if o.error:
+            detail += f": {o.error}"
+        if o.volume_set:
+            detail += ", volume set"
+        if o.latency_ms:
+            detail += f" ({o.latency_ms:.0f} ms)"
+        lines.append(f"- {o.name}: {detail}")
+    return "\n".join(lines)
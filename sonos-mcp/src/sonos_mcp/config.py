@@ -1,5 +1,6 @@
 """Speaker registry, zone definitions, and constants for Villa Romanza."""
 
+import os
 from pydantic import BaseModel
 from typing import List, Dict
 
@@ -11,7 +12,34 @@ CHARACTER_LIMIT = 25000
 # Timeouts
 SOCO_TIMEOUT = 10.0
 HA_TIMEOUT = 10.0
-DISCOVERY_CACHE_TTL = 300  # 5 minutes
+DISCOVERY_CACHE_TTL = 300  # 5 minutes; stale entries are served while a refresh runs
+DISCOVERY_RETRY_BACKOFF = 30  # seconds before retrying a failed background discovery
+DISCOVERY_PROBE_TIMEOUT = 2.0  # seconds per direct-IP probe of a speaker SSDP missed
+DISCOVERY_PROBE_CONCURRENCY = 16
+# Last-known discovery result, loaded at boot so tools work before SSDP finishes
+REGISTRY_CACHE_PATH = os.path.expanduser("~/.cache/sonos-mcp/registry.json")
+TOPOLOGY_CACHE_TTL = 10  # seconds; event-driven when ZoneGroupTopology is subscribed
+
+# SoCo executor (blocking SOAP calls run here, not on the loop's default pool)
+SOCO_EXECUTOR_WORKERS = 32
+SOCO_PER_SPEAKER_CONCURRENCY = 4  # max in-flight SOAP calls to any one speaker
+SOCO_STATS_SAMPLES = 256  # recent execution times kept per (speaker, method)
+
+# Fan-out snapshots (whole-house status reads)
+SNAPSHOT_CONCURRENCY = 12  # max speakers queried at once
+SNAPSHOT_DEADLINE = 4.0  # per-speaker seconds before reporting a timeout
+ZONE_ASSEMBLY_CONCURRENCY = 8  # speakers joined / levelled at once
+
+# Speaker resolver
+RESOLVER_CACHE_SIZE = 512  # recent utterances remembered
+RESOLVER_SHORTLIST = 16  # fuzzy candidates scored per utterance
+
+# Event mirror (UPnP subscriptions feeding an in-memory state model)
+MIRROR_SERVICES = ["AVTransport", "RenderingControl", "ZoneGroupTopology"]
+MIRROR_SUBSCRIPTION_TIMEOUT = 600  # requested seconds per subscription
+MIRROR_RENEW_MARGIN = 90  # renew when this close to expiry
+MIRROR_CHECK_INTERVAL = 15  # resubscribe loop period
+MIRROR_RETRY_BACKOFF = 60  # wait before retrying a failed subscription
 
 
 class SpeakerInfo(BaseModel):
@@ -2,64 +2,258 @@
 
 import asyncio
 import time
+import requests
 import soco
-from typing import Dict, Optional, List
-from .config import SPEAKERS, SpeakerInfo, DISCOVERY_CACHE_TTL
+from functools import partial
+from typing import Callable, Dict, Optional, List
+from pydantic import BaseModel
+from .config import (
+    SPEAKERS, SpeakerInfo, DISCOVERY_CACHE_TTL, DISCOVERY_RETRY_BACKOFF,
+    DISCOVERY_PROBE_TIMEOUT, DISCOVERY_PROBE_CONCURRENCY,
+)
+from .helpers import format_speaker_state, run_soco
+from .mirror import StateMirror
+from .snapshot import SpeakerSnapshot, snapshot_speakers
+from .registry_cache import CachedSpeaker, RegistryCache, load_registry_cache, save_registry_cache
+from .state import DeviceRecord, device_record, remember_record
+from .topology import TopologyCache, ZoneTopology
+
+
+class DiscoveryChanges(BaseModel):
+    """What the last discovery changed in the device map."""
+    added: List[str] = []
+    removed: List[str] = []
+    moved: List[str] = []  # same name, new IP
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.added or self.removed or self.moved)
+
+
+def _probe(device: soco.SoCo, timeout: float) -> dict:
+    """Fetch a speaker's device description, with a short failure reason on error."""
+    try:
+        return device_record(device, refresh=True, timeout=timeout).model_dump()
+    except requests.exceptions.ConnectTimeout:
+        raise ConnectionError(f"no answer within {timeout:g}s") from None
+    except requests.exceptions.ReadTimeout:
+        raise ConnectionError(f"connected but no reply within {timeout:g}s") from None
+    except requests.exceptions.ConnectionError:
+        raise ConnectionError("connection refused or host unreachable") from None
 
 
 class SpeakerCache:
     """Manages SoCo device instances mapped to the speaker registry."""
 
-    def __init__(self):
+    def __init__(self, cache_path: Optional[str] = None):
         self._devices: Dict[str, soco.SoCo] = {}
         self._by_ip: Dict[str, soco.SoCo] = {}
         self._last_discovery: float = 0
         self._offline: List[str] = []
+        self._refresh_task: Optional[asyncio.Task] = None
+        self.cache_path = cache_path
+        self.household_id: Optional[str] = None
+        self.restored_age_s: Optional[float] = None
+        self.probe_timeout = DISCOVERY_PROBE_TIMEOUT
+        self.last_probes: List[SpeakerSnapshot] = []  # direct-IP fallback results
+        self.last_changes: Optional[DiscoveryChanges] = None
+        self.mirror = StateMirror()
+        self.topology = TopologyCache(self.mirror)
 
     @property
     def is_stale(self) -> bool:
         return (time.time() - self._last_discovery) > DISCOVERY_CACHE_TTL
 
     async def discover(self, registry: Optional[Dict[str, SpeakerInfo]] = None) -> None:
-        """Populate cache using network discovery + direct IP fallback."""
+        """Populate cache using network discovery + direct IP fallback.
+
+        The new device map is built aside and merged in at the end, so tools
+        keep using the previous (or restored) map while discovery runs.
+        """
         reg = registry or SPEAKERS
-        loop = asyncio.get_event_loop()
+        devices: Dict[str, soco.SoCo] = {}
+        by_ip: Dict[str, soco.SoCo] = {}
 
         # SoCo discover (SSDP/UPnP)
-        discovered = await loop.run_in_executor(None, lambda: soco.discover(timeout=5))
-        if discovered:
-            for device in discovered:
-                self._by_ip[device.ip_address] = device
-                for name, info in reg.items():
-                    if info.ip == device.ip_address:
-                        self._devices[name] = device
-                        break
-                else:
-                    # Speaker found but not in registry — add by Sonos name
-                    try:
-                        pname = await loop.run_in_executor(None, lambda d=device: d.player_name)
-                        self._devices[pname] = device
-                    except Exception:
-                        pass
-
-        # Direct IP fallback for registered speakers not found
-        self._offline = []
-        for name, info in reg.items():
-            if name not in self._devices:
-                try:
-                    device = soco.SoCo(info.ip)
-                    pname = await loop.run_in_executor(None, lambda d=device: d.player_name)
-                    self._devices[name] = device
-                    self._by_ip[info.ip] = device
-                except Exception:
-                    self._offline.append(name)
+        discovered = await run_soco(soco.discover, timeout=5)
+        unregistered: Dict[str, soco.SoCo] = {}
+        for device in discovered or ():
+            by_ip[device.ip_address] = device
+            for name, info in reg.items():
+                if info.ip == device.ip_address:
+                    devices[name] = device
+                    break
+            else:
+                unregistered[device.ip_address] = device
+
+        # Direct IP fallback for registered speakers not found, probed
+        # concurrently (with unregistered SSDP finds, which need a name)
+        missing = {name: soco.SoCo(info.ip) for name, info in reg.items() if name not in devices}
+        snap = await snapshot_speakers(
+            {**missing, **unregistered},
+            partial(_probe, timeout=self.probe_timeout),
+            concurrency=DISCOVERY_PROBE_CONCURRENCY,
+            deadline=self.probe_timeout * 2,  # description fetch, then the uid lookup
+        )
+        offline = []
+        for result in snap.speakers:
+            if result.name in unregistered:
+                # Speaker found but not in registry — add by Sonos name
+                if result.ok and result.data.get("player_name"):
+                    devices[result.data["player_name"]] = unregistered[result.name]
+            elif result.ok:
+                devices[result.name] = missing[result.name]
+                by_ip[missing[result.name].ip_address] = missing[result.name]
+            else:
+                offline.append(result.name)
+        self.last_probes = [s for s in snap.speakers if s.name in missing]
+
+        self._apply(devices, by_ip, offline)
+        self._last_discovery = time.time()
+        await self._persist()
+
+    def _apply(self, devices: Dict[str, soco.SoCo], by_ip: Dict[str, soco.SoCo],
+               offline: List[str]) -> DiscoveryChanges:
+        """Merge a discovery result in place, touching only entries that changed."""
+        changes = DiscoveryChanges(
+            added=[n for n in devices if n not in self._devices],
+            removed=[n for n in self._devices if n not in devices],
+            moved=[n for n, d in devices.items()
+                   if n in self._devices and self._devices[n].ip_address != d.ip_address],
+        )
+        for name in changes.removed:
+            del self._devices[name]
+        for name in changes.added + changes.moved:
+            self._devices[name] = devices[name]
+        for ip in [ip for ip in self._by_ip if ip not in by_ip]:
+            del self._by_ip[ip]
+        for ip, device in by_ip.items():
+            if self._by_ip.get(ip) is not device:
+                self._by_ip[ip] = device
+        self._offline = offline
+        if changes.changed:
+            self.topology.invalidate()
+        self.last_changes = changes
+        return changes
+
+    def restore(self) -> bool:
+        """Load the last-known discovery result from disk, without network I/O.
 
+        Returns True if speakers were restored; the cache then counts as fresh
+        and the caller should start refresh_in_background().
+        """
+        cache = load_registry_cache(self.cache_path) if self.cache_path else None
+        if cache is None or not cache.speakers:
+            return False
+        devices: Dict[str, soco.SoCo] = {}
+        for entry in cache.speakers:
+            try:
+                device = soco.SoCo(entry.ip)
+            except ValueError:
+                continue
+            if cache.household_id and device._household_id is None:
+                device._household_id = cache.household_id
+            devices[entry.name] = device
+            if entry.uid or entry.model_name:
+                remember_record(DeviceRecord(
+                    ip=entry.ip, uid=entry.uid,
+                    player_name=entry.player_name, model_name=entry.model_name,
+                ))
+        self._devices = devices
+        self._by_ip = {d.ip_address: d for d in devices.values()}
+        self._offline = [n for n in cache.offline if n not in devices]
+        self.household_id = cache.household_id
+        self.restored_age_s = cache.age_s
         self._last_discovery = time.time()
+        return True
+
+    def refresh_in_background(self, registry: Optional[Dict[str, SpeakerInfo]] = None) -> asyncio.Task:
+        """Start a discovery without blocking the caller (single-flight).
+
+        Returns the in-flight refresh task, joining one already running.
+        """
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.get_event_loop().create_task(self._refresh(registry))
+        return self._refresh_task
+
+    async def _refresh(self, registry: Optional[Dict[str, SpeakerInfo]]) -> None:
+        try:
+            await self.discover(registry)
+        except Exception:
+            # Keep serving the current map; retry after a short backoff
+            self._last_discovery = time.time() - DISCOVERY_CACHE_TTL + DISCOVERY_RETRY_BACKOFF
+
+    async def refresh(self, registry: Optional[Dict[str, SpeakerInfo]] = None) -> None:
+        """Rediscover now and wait for it, joining any refresh already in flight."""
+        await asyncio.shield(self.refresh_in_background(registry))
+
+    async def stop_refresh(self) -> None:
+        if self._refresh_task and not self._refresh_task.done():
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+        self._refresh_task = None
+
+    async def _persist(self) -> None:
+        """Write the current discovery result to the registry cache (best effort)."""
+        if not self.cache_path or not self._devices:
+            return
+        devices = dict(self._devices)
+        records = await asyncio.gather(
+            *(run_soco(device_record, d) for d in devices.values()), return_exceptions=True,
+        )
+        if self.household_id is None:
+            try:
+                self.household_id = await run_soco(lambda d=next(iter(devices.values())): d.household_id)
+            except Exception:
+                pass
+        speakers = []
+        for (name, device), record in zip(devices.items(), records):
+            if isinstance(record, BaseException):
+                speakers.append(CachedSpeaker(name=name, ip=device.ip_address))
+            else:
+                speakers.append(CachedSpeaker(
+                    name=name, ip=device.ip_address, uid=record.uid,
+                    player_name=record.player_name, model_name=record.model_name,
+                ))
+        cache = RegistryCache(
+            saved_at=time.time(), household_id=self.household_id,
+            speakers=speakers, offline=list(self._offline),
+        )
+        try:
+            await asyncio.to_thread(save_registry_cache, self.cache_path, cache)
+        except OSError:
+            pass
 
     async def ensure_fresh(self) -> None:
-        """Re-discover if cache is stale."""
-        if self.is_stale:
-            await self.discover()
+        """Serve the current cache; if it is stale, revalidate in the background.
+
+        Only a cold cache (nothing discovered or restored yet) makes the caller
+        wait, and then on the same single-flight refresh as everyone else.
+        """
+        if not self.is_stale:
+            return
+        task = self.refresh_in_background()
+        if self._last_discovery == 0:
+            await asyncio.shield(task)
+
+    def start_mirror(self) -> None:
+        """Begin mirroring speaker state from UPnP events in the background."""
+        self.mirror.start(lambda: self._devices)
+
+    async def stop_mirror(self) -> None:
+        await self.mirror.stop()
+
+    async def get_topology(self) -> Optional[ZoneTopology]:
+        """Current zone-group topology (event-driven or short-TTL cached)."""
+        return await self.topology.get(lambda: self._devices)
+
+    async def state_collector(self) -> Callable[[soco.SoCo], dict]:
+        """format_speaker_state bound to one shared topology and the event mirror."""
+        topology = await self.get_topology()
+        return partial(format_speaker_state, topology=topology, mirror=self.mirror)
 
     def get(self, name: str) -> Optional[soco.SoCo]:
         """Get SoCo device by canonical speaker name."""
@@ -0,0 +1,244 @@
+"""Dedicated SoCo executor with per-speaker limits and call instrumentation.
+
+Blocking SoCo calls run on their own thread pool instead of the event loop's
+default executor, so a fan-out burst cannot starve everything else. Each
+speaker gets at most SOCO_PER_SPEAKER_CONCURRENCY in-flight calls; the slot
+is held until the thread actually finishes, even if the awaiting coroutine
+was cancelled by a deadline. Every call records queue wait, execution time
+and errors, labelled by speaker IP and method.
+"""
+
+import asyncio
+import threading
+import time
+import weakref
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+from .config import SOCO_EXECUTOR_WORKERS, SOCO_PER_SPEAKER_CONCURRENCY, SOCO_STATS_SAMPLES
+
+
+def describe_call(func: Callable, args: tuple) -> Tuple[Optional[str], str]:
+    """Best-effort (speaker_ip, method) label for a SoCo call.
+
+    The speaker comes from a bound method's instance, the first positional
+    argument with an ip_address, or a lambda's closure. Lambdas are named after
+    the attributes they touch (``lambda: d.group.coordinator`` → ``group.coordinator``).
+    """
+    target = getattr(func, "__self__", None)
+    if target is None or not hasattr(target, "ip_address"):
+        target = next((a for a in args if hasattr(a, "ip_address")), None)
+    code = getattr(func, "__code__", None)
+    if target is None and getattr(func, "__closure__", None):
+        for cell in func.__closure__:
+            try:
+                value = cell.cell_contents
+            except ValueError:
+                continue
+            if hasattr(value, "ip_address"):
+                target = value
+                break
+
+    method = getattr(func, "__name__", type(func).__name__)
+    if method == "<lambda>" and code is not None:
+        attrs = [n for n in code.co_names if not n.startswith("_")]
+        method = ".".join(attrs) or method
+    elif method == "setattr" and len(args) >= 2:
+        method = f"set {args[1]}"
+
+    ip = getattr(target, "ip_address", None) if target is not None else None
+    return (ip if isinstance(ip, str) else None), method
+
+
+class _CallStat:
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.cancelled = 0
+        self.queue_total = 0.0
+        self.queue_max = 0.0
+        self.exec_total = 0.0
+        self.exec_max = 0.0
+        self.exec_recent: deque = deque(maxlen=SOCO_STATS_SAMPLES)
+        self.last_error: Optional[str] = None
+
+
+class SoCoCallStats:
+    """Thread-safe per-(speaker, method) timing counters."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._by_key: Dict[Tuple[str, str], _CallStat] = {}
+        self.queued = 0
+        self.in_flight = 0
+
+    def queue(self) -> None:
+        with self._lock:
+            self.queued += 1
+
+    def start(self) -> None:
+        with self._lock:
+            self.queued -= 1
+            self.in_flight += 1
+
+    def finish(self, speaker: Optional[str], method: str, queue_s: float,
+               exec_s: Optional[float], error: Optional[str], cancelled: bool = False) -> None:
+        with self._lock:
+            if exec_s is None:
+                self.queued -= 1
+            else:
+                self.in_flight -= 1
+            stat = self._by_key.setdefault((speaker or "-", method), _CallStat())
+            stat.calls += 1
+            stat.queue_total += queue_s
+            stat.queue_max = max(stat.queue_max, queue_s)
+            if cancelled:
+                stat.cancelled += 1
+            if exec_s is not None:
+                stat.exec_total += exec_s
+                stat.exec_max = max(stat.exec_max, exec_s)
+                stat.exec_recent.append(exec_s)
+            if error:
+                stat.errors += 1
+                stat.last_error = error
+
+    def reset(self) -> None:
+        with self._lock:
+            self._by_key.clear()
+
+    def report(self, top: Optional[int] = None) -> dict:
+        """Rows sorted by total execution time, plus totals."""
+        with self._lock:
+            items = [(k, s, sorted(s.exec_recent)) for k, s in self._by_key.items()]
+            queued, in_flight = self.queued, self.in_flight
+        rows = []
+        for (speaker, method), s, recent in sorted(items, key=lambda i: i[1].exec_total, reverse=True):
+            executed = s.calls - s.cancelled
+            p95 = recent[min(len(recent) - 1, int(len(recent) * 0.95))] if recent else 0.0
+            rows.append({
+                "speaker": speaker,
+                "method": method,
+                "calls": s.calls,
+                "errors": s.errors,
+                "cancelled": s.cancelled,
+                "queue_ms_avg": round(s.queue_total / s.calls * 1000, 1),
+                "queue_ms_max": round(s.queue_max * 1000, 1),
+                "exec_ms_avg": round(s.exec_total / executed * 1000, 1) if executed else 0.0,
+                "exec_ms_p95": round(p95 * 1000, 1),
+                "exec_ms_max": round(s.exec_max * 1000, 1),
+                "last_error": s.last_error,
+            })
+        return {
+            "calls": sum(r["calls"] for r in rows),
+            "errors": sum(r["errors"] for r in rows),
+            "queued": queued,
+            "in_flight": in_flight,
+            "by_call": rows[:top] if top else rows,
+        }
+
+
+class SoCoExecutor:
+    """Bounded thread pool for blocking SoCo calls."""
+
+    def __init__(self, workers: int = SOCO_EXECUTOR_WORKERS,
+                 per_speaker: int = SOCO_PER_SPEAKER_CONCURRENCY):
+        self.workers = workers
+        self.per_speaker = per_speaker
+        self.stats = SoCoCallStats()
+        self._pool: Optional[ThreadPoolExecutor] = None
+        # Semaphores are per event loop (tests and restarts create new loops)
+        self._limits: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def configure(self, workers: Optional[int] = None, per_speaker: Optional[int] = None) -> None:
+        """Resize the pool and per-speaker limit (takes effect for new calls)."""
+        if workers is not None and workers != self.workers:
+            self.workers = workers
+            if self._pool is not None:
+                self._pool.shutdown(wait=False)
+                self._pool = None
+        if per_speaker is not None and per_speaker != self.per_speaker:
+            self.per_speaker = per_speaker
+            self._limits = weakref.WeakKeyDictionary()
+
+    @property
+    def pool(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=max(1, self.workers),
+                                            thread_name_prefix="soco")
+        return self._pool
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+            self._pool = None
+
+    def _limit(self, loop: asyncio.AbstractEventLoop, speaker: str) -> asyncio.Semaphore:
+        per_loop = self._limits.setdefault(loop, {})
+        if speaker not in per_loop:
+            per_loop[speaker] = asyncio.Semaphore(max(1, self.per_speaker))
+        return per_loop[speaker]
+
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        loop = asyncio.get_running_loop()
+        speaker, method = describe_call(func, args)
+        stats = self.stats
+        queued_at = time.perf_counter()
+        stats.queue()
+
+        semaphore = self._limit(loop, speaker) if speaker else None
+        if semaphore is not None:
+            try:
+                await semaphore.acquire()
+            except BaseException:
+                stats.finish(speaker, method, time.perf_counter() - queued_at, None,
+                             None, cancelled=True)
+                raise
+
+        timing: Dict[str, float] = {}
+
+        def call():
+            timing["start"] = time.perf_counter()
+            stats.start()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                timing["end"] = time.perf_counter()
+
+        def done(fut):
+            if semaphore is not None:
+                try:
+                    loop.call_soon_threadsafe(semaphore.release)
+                except RuntimeError:
+                    pass  # Loop already closed
+            start = timing.get("start")
+            if start is None:
+                stats.finish(speaker, method, time.perf_counter() - queued_at, None,
+                             None, cancelled=True)
+                return
+            error = None
+            if not fut.cancelled() and fut.exception() is not None:
+                exc = fut.exception()
+                error = f"{type(exc).__name__}: {exc}"
+            stats.finish(speaker, method, start - queued_at, timing["end"] - start, error)
+
+        try:
+            future = self.pool.submit(call)
+        except BaseException:
+            if semaphore is not None:
+                semaphore.release()
+            stats.finish(speaker, method, time.perf_counter() - queued_at, None, None,
+                         cancelled=True)
+            raise
+        future.add_done_callback(done)
+        return await asyncio.wrap_future(future)
+
+
+soco_executor = SoCoExecutor()
+
+
+async def run_soco(func: Callable, *args, **kwargs) -> Any:
+    """Run a synchronous SoCo function on the dedicated SoCo executor."""
+    return await soco_executor.run(func, *args, **kwargs)
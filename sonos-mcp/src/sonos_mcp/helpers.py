@@ -1,15 +1,10 @@
 """Shared helpers: async SoCo wrapper, volume guard, agent gate, formatting."""
 
-import asyncio
 import json
-from typing import Any, Callable, Optional
+from typing import Optional
 from .config import VOLUME_HARD_MAX, CHARACTER_LIMIT
-
-
-async def run_soco(func: Callable, *args, **kwargs) -> Any:
-    """Run a synchronous SoCo function in the thread pool executor."""
-    loop = asyncio.get_event_loop()
-    return await loop.run_in_executor(None, lambda: func(*args, **kwargs))
+from .state import device_record
+from .executor import run_soco  # noqa: F401  (re-exported for tool modules)
 
 
 def clamp_volume(volume: int) -> tuple[int, bool]:
@@ -29,35 +24,64 @@ def truncate_response(text: str, limit: int = CHARACTER_LIMIT) -> str:
 
 
 def format_track_info(info: dict) -> dict:
-    """Format SoCo track info dict into a clean response."""
-    return {
+    """Format SoCo track info dict into a clean response.
+
+    "position" is only included when the source knows it: polled track info
+    has it, tracks from the event mirror do not.
+    """
+    track = {
         "title": info.get("title", ""),
         "artist": info.get("artist", ""),
         "album": info.get("album", ""),
         "uri": info.get("uri", ""),
         "duration": info.get("duration", "0:00:00"),
-        "position": info.get("position", "0:00:00"),
         "album_art": info.get("album_art_uri", ""),
     }
+    if "position" in info:
+        track["position"] = info["position"]
+    return track
 
 
-def format_speaker_state(device) -> dict:
-    """Build a state dict from a SoCo device instance."""
+def format_speaker_state(device, topology=None, mirror=None) -> dict:
+    """Build a state dict from a SoCo device instance.
+
+    Name and model come from the cached device record and group membership from
+    `topology` (read once per call by the caller and shared across speakers).
+    When an event `mirror` holds live transport or volume state for the device
+    those reads are answered from memory; anything else is polled.
+    """
     try:
-        transport = device.get_current_transport_info()
-        track = device.get_current_track_info()
-        group = device.group
+        record = device_record(device)
+        if topology is None:
+            from .topology import read_topology
+            topology = read_topology(device)
+        membership = topology.get(device.ip_address)
+
+        live_transport = mirror.transport(device.ip_address) if mirror else None
+        if live_transport:
+            state, track = live_transport["state"], live_transport["track"]
+        else:
+            transport = device.get_current_transport_info()
+            state = transport.get("current_transport_state", "UNKNOWN")
+            track = device.get_current_track_info()
+
+        live_rendering = mirror.rendering(device.ip_address) if mirror else None
+        if live_rendering:
+            volume, muted = live_rendering["volume"], live_rendering["muted"]
+        else:
+            volume, muted = device.volume, device.mute
+
         return {
-            "name": device.player_name,
+            "name": record.player_name,
             "ip": device.ip_address,
-            "volume": device.volume,
-            "muted": device.mute,
-            "state": transport.get("current_transport_state", "UNKNOWN"),
+            "volume": volume,
+            "muted": muted,
+            "state": state,
             "track": format_track_info(track),
-            "is_coordinator": device.is_coordinator,
-            "group_coordinator": group.coordinator.player_name if group else None,
-            "group_members": [m.player_name for m in group.members] if group else [],
-            "model": getattr(device, "model_name", ""),
+            "is_coordinator": membership.is_coordinator if membership else True,
+            "group_coordinator": membership.coordinator if membership else None,
+            "group_members": membership.members if membership else [],
+            "model": record.model_name,
         }
     except Exception as e:
         return {
@@ -0,0 +1,300 @@
+"""UPnP event mirror: in-memory speaker state fed by SoCo subscriptions.
+
+Every speaker's AVTransport, RenderingControl and ZoneGroupTopology services
+are subscribed once. Events update an in-memory model that read tools consult
+before going to the network. A service only counts as live while its
+subscription is unexpired and has delivered at least one event; otherwise
+reads return None and callers fall back to polling the speaker directly.
+"""
+
+import asyncio
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from pydantic import BaseModel
+from .config import (
+    MIRROR_SERVICES, MIRROR_SUBSCRIPTION_TIMEOUT, MIRROR_RENEW_MARGIN,
+    MIRROR_CHECK_INTERVAL, MIRROR_RETRY_BACKOFF, SNAPSHOT_CONCURRENCY,
+)
+from .helpers import run_soco
+from .topology import ZoneTopology, read_topology
+
+
+class EventSink:
+    """Queue-like object SoCo puts events on; forwards each to a handler.
+
+    Passing this as SoCo's event_queue avoids the race where the initial event
+    lands on a plain queue before a callback can be attached.
+    """
+
+    def __init__(self, handler: Callable[[dict], None]):
+        self._handler = handler
+
+    def put(self, event, *args, **kwargs) -> None:
+        self._handler(getattr(event, "variables", {}) or {})
+
+
+def soco_subscribe(device, service: str, timeout: int, sink: EventSink):
+    """Default subscriber: SoCo's threaded event listener, renewed by the mirror."""
+    svc = {
+        "AVTransport": device.avTransport,
+        "RenderingControl": device.renderingControl,
+        "ZoneGroupTopology": device.zoneGroupTopology,
+    }[service]
+    return svc.subscribe(requested_timeout=timeout, auto_renew=False, event_queue=sink)
+
+
+class MirroredSpeaker(BaseModel):
+    """Last evented state of one speaker."""
+    ip: str
+    transport_state: Optional[str] = None
+    track: Optional[dict] = None
+    volume: Optional[int] = None
+    muted: Optional[bool] = None
+    updated_at: float = 0.0
+
+
+class _Subscription:
+    """Book-keeping for one (speaker, service) subscription."""
+
+    def __init__(self, device, service: str):
+        self.device = device
+        self.service = service
+        self.sub: Any = None
+        self.expires_at = 0.0
+        self.has_event = False
+        self.failed_at = 0.0
+        self.error: Optional[str] = None
+
+    @property
+    def live(self) -> bool:
+        return self.sub is not None and self.has_event and time.monotonic() < self.expires_at
+
+
+def _track_from_event(ip: str, variables: dict) -> dict:
+    # AVTransport events carry no RelTime, so there is no "position" here
+    meta = variables.get("current_track_meta_data")
+    art = getattr(meta, "album_art_uri", "") or ""
+    if art.startswith("/"):
+        art = f"http://{ip}:1400{art}"
+    return {
+        "title": getattr(meta, "title", "") or "",
+        "artist": getattr(meta, "creator", "") or "",
+        "album": getattr(meta, "album", "") or "",
+        "uri": variables.get("current_track_uri", ""),
+        "duration": variables.get("current_track_duration", "0:00:00"),
+        "album_art_uri": art,
+    }
+
+
+def _master_channel(value) -> Optional[str]:
+    if isinstance(value, dict):
+        return value.get("Master")
+    return value
+
+
+class StateMirror:
+    """Subscribes to speaker events and answers state reads from memory."""
+
+    def __init__(
+        self,
+        subscribe: Callable = soco_subscribe,
+        services: Optional[List[str]] = None,
+        timeout: int = MIRROR_SUBSCRIPTION_TIMEOUT,
+        renew_margin: float = MIRROR_RENEW_MARGIN,
+        retry_backoff: float = MIRROR_RETRY_BACKOFF,
+    ):
+        self._subscribe = subscribe
+        self._services = services or list(MIRROR_SERVICES)
+        self._timeout = timeout
+        self._renew_margin = renew_margin
+        self._retry_backoff = retry_backoff
+        self._lock = threading.Lock()
+        self._speakers: Dict[str, MirroredSpeaker] = {}
+        self._subs: Dict[Tuple[str, str], _Subscription] = {}
+        self._topology: Optional[ZoneTopology] = None
+        self._task: Optional[asyncio.Task] = None
+        self.events_received = 0
+
+    # --- Reads (safe from the event loop or executor threads) ---
+
+    def is_live(self, ip: str, service: str) -> bool:
+        entry = self._subs.get((ip, service))
+        return entry is not None and entry.live
+
+    def transport(self, ip: str) -> Optional[dict]:
+        """Transport state and track, or None if AVTransport is not live."""
+        if not self.is_live(ip, "AVTransport"):
+            return None
+        with self._lock:
+            s = self._speakers.get(ip)
+            if s is None or s.transport_state is None:
+                return None
+            return {
+                "state": s.transport_state,
+                "track": dict(s.track or {}),
+                "age_s": round(time.time() - s.updated_at, 1),
+            }
+
+    def rendering(self, ip: str) -> Optional[dict]:
+        """Volume and mute, or None if RenderingControl is not live."""
+        if not self.is_live(ip, "RenderingControl"):
+            return None
+        with self._lock:
+            s = self._speakers.get(ip)
+            if s is None or s.volume is None or s.muted is None:
+                return None
+            return {"volume": s.volume, "muted": s.muted}
+
+    @property
+    def topology(self) -> Optional[ZoneTopology]:
+        """Household grouping, or None if no ZoneGroupTopology subscription is live."""
+        if not any(e.live for e in self._subs.values() if e.service == "ZoneGroupTopology"):
+            return None
+        with self._lock:
+            return self._topology
+
+    def stats(self) -> dict:
+        by_service: Dict[str, Dict[str, int]] = {}
+        for entry in list(self._subs.values()):
+            counts = by_service.setdefault(entry.service, {"live": 0, "lapsed": 0})
+            counts["live" if entry.live else "lapsed"] += 1
+        failures = sorted(
+            f"{ip}/{service}: {e.error}" for (ip, service), e in list(self._subs.items())
+            if e.sub is None and e.error
+        )
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "events_received": self.events_received,
+            "services": by_service,
+            "failures": failures,
+        }
+
+    # --- Event handling (called from SoCo's listener thread) ---
+
+    def handle_event(self, device, service: str, variables: dict) -> None:
+        """Apply one event's variables to the in-memory model."""
+        ip = device.ip_address
+        topology = None
+        if service == "ZoneGroupTopology":
+            # SoCo has already parsed the payload into its zone group cache,
+            # so this read does not touch the network.
+            try:
+                topology = read_topology(device)
+            except Exception:
+                topology = None
+
+        with self._lock:
+            self.events_received += 1
+            entry = self._subs.get((ip, service))
+            if entry is not None:
+                entry.has_event = True
+            s = self._speakers.setdefault(ip, MirroredSpeaker(ip=ip))
+            s.updated_at = time.time()
+            if service == "AVTransport":
+                if "transport_state" in variables:
+                    s.transport_state = variables["transport_state"]
+                if "current_track_meta_data" in variables or "current_track_uri" in variables:
+                    s.track = _track_from_event(ip, variables)
+            elif service == "RenderingControl":
+                volume = _master_channel(variables.get("volume"))
+                if volume is not None:
+                    s.volume = int(volume)
+                mute = _master_channel(variables.get("mute"))
+                if mute is not None:
+                    s.muted = str(mute) == "1"
+            elif service == "ZoneGroupTopology" and topology is not None:
+                self._topology = topology
+
+    # --- Subscription management ---
+
+    def _subscribe_blocking(self, entry: _Subscription) -> None:
+        sink = EventSink(lambda v, e=entry: self.handle_event(e.device, e.service, v))
+        try:
+            entry.has_event = False
+            entry.sub = self._subscribe(entry.device, entry.service, self._timeout, sink)
+            entry.expires_at = time.monotonic() + (getattr(entry.sub, "timeout", None) or self._timeout)
+            entry.failed_at, entry.error = 0.0, None
+        except Exception as e:
+            entry.sub = None
+            entry.failed_at, entry.error = time.monotonic(), str(e)
+
+    def _renew_blocking(self, entry: _Subscription) -> None:
+        try:
+            entry.sub.renew(requested_timeout=self._timeout)
+            entry.expires_at = time.monotonic() + (getattr(entry.sub, "timeout", None) or self._timeout)
+        except Exception:
+            # Renewal refused (speaker rebooted, SID expired): start over
+            self._unsubscribe_blocking(entry)
+            self._subscribe_blocking(entry)
+
+    @staticmethod
+    def _unsubscribe_blocking(entry: _Subscription) -> None:
+        sub, entry.sub, entry.has_event = entry.sub, None, False
+        if sub is not None:
+            try:
+                sub.unsubscribe()
+            except Exception:
+                pass
+
+    def _due(self, entry: _Subscription, now: float) -> Optional[Callable]:
+        if entry.sub is None:
+            if entry.failed_at and now - entry.failed_at < self._retry_backoff:
+                return None
+            return self._subscribe_blocking
+        if entry.expires_at - now < self._renew_margin:
+            return self._renew_blocking
+        return None
+
+    async def sync(self, devices: Dict[str, Any]) -> None:
+        """Subscribe new speakers, renew expiring subscriptions, drop removed ones."""
+        wanted = {d.ip_address: d for d in devices.values()}
+        for key in [k for k in self._subs if k[0] not in wanted]:
+            entry = self._subs.pop(key)
+            await run_soco(self._unsubscribe_blocking, entry)
+            with self._lock:
+                self._speakers.pop(key[0], None)
+        for ip, device in wanted.items():
+            for service in self._services:
+                entry = self._subs.get((ip, service))
+                if entry is None or entry.device is not device:
+                    self._subs[(ip, service)] = _Subscription(device, service)
+
+        now = time.monotonic()
+        work = [(fn, e) for e in self._subs.values() if (fn := self._due(e, now))]
+        semaphore = asyncio.Semaphore(SNAPSHOT_CONCURRENCY)
+
+        async def _run(fn, entry):
+            async with semaphore:
+                await run_soco(fn, entry)
+
+        await asyncio.gather(*(_run(fn, e) for fn, e in work))
+
+    async def _loop(self, get_devices: Callable[[], Dict[str, Any]], interval: float) -> None:
+        while True:
+            try:
+                await self.sync(get_devices())
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                pass  # Next pass retries; reads fall back to polling meanwhile
+            await asyncio.sleep(interval)
+
+    def start(self, get_devices: Callable[[], Dict[str, Any]],
+              interval: float = MIRROR_CHECK_INTERVAL) -> None:
+        """Start the background subscribe/renew loop (idempotent)."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_event_loop().create_task(self._loop(get_devices, interval))
+
+    async def stop(self) -> None:
+        """Stop the loop and cancel every subscription."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._task = None
+        entries = list(self._subs.values())
+        self._subs.clear()
+        await asyncio.gather(*(run_soco(self._unsubscribe_blocking, e) for e in entries))
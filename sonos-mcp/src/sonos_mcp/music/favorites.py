@@ -1,8 +1,8 @@
 """Sonos Favorites music service — browse and play saved favorites."""
 
-import asyncio
 from difflib import SequenceMatcher
 from typing import Optional, List
+from ..executor import run_soco
 from .base import MusicService, MusicItem, SearchResult, BrowseResult
 
 
@@ -32,8 +32,7 @@ class SonosFavoritesService(MusicService):
         device = self._get_device()
         if not device:
             return []
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, lambda: list(device.get_sonos_favorites()))
+        return await run_soco(lambda: list(device.get_sonos_favorites()))
 
     async def search(self, query: str, category: Optional[str] = None,
                      limit: int = 20) -> SearchResult:
@@ -1,7 +1,7 @@
 """TuneIn radio service via SoCo — search and play radio stations."""
 
-import asyncio
 from typing import Optional
+from ..executor import run_soco
 from .base import MusicService, MusicItem, SearchResult, BrowseResult
 
 
@@ -22,9 +22,8 @@ class TuneInService(MusicService):
 
     async def _ensure_service(self):
         if self._soco_service is None:
-            loop = asyncio.get_event_loop()
             from soco.music_services import MusicService as SocoMS
-            self._soco_service = await loop.run_in_executor(None, lambda: SocoMS("TuneIn"))
+            self._soco_service = await run_soco(SocoMS, "TuneIn")
 
     async def is_available(self) -> bool:
         try:
@@ -36,11 +35,8 @@ class TuneInService(MusicService):
     async def search(self, query: str, category: Optional[str] = None,
                      limit: int = 20) -> SearchResult:
         await self._ensure_service()
-        loop = asyncio.get_event_loop()
         try:
-            result = await loop.run_in_executor(
-                None, lambda: self._soco_service.search("stations", query, count=limit)
-            )
+            result = await run_soco(lambda: self._soco_service.search("stations", query, count=limit))
             items = []
             for item in result:
                 items.append(MusicItem(
@@ -63,11 +59,8 @@ class TuneInService(MusicService):
     async def browse(self, path: Optional[str] = None,
                      limit: int = 50) -> BrowseResult:
         await self._ensure_service()
-        loop = asyncio.get_event_loop()
         try:
-            result = await loop.run_in_executor(
-                None, lambda: self._soco_service.get_metadata(item=path, count=limit)
-            )
+            result = await run_soco(lambda: self._soco_service.get_metadata(item=path, count=limit))
             items = [MusicItem(
                 item_id=getattr(item, "item_id", ""),
                 title=getattr(item, "title", "Unknown"),
@@ -80,11 +73,8 @@ class TuneInService(MusicService):
 
     async def get_playable_uri(self, item_id: str) -> Optional[str]:
         await self._ensure_service()
-        loop = asyncio.get_event_loop()
         try:
-            uri = await loop.run_in_executor(
-                None, lambda: self._soco_service.sonos_uri_from_id(item_id)
-            )
+            uri = await run_soco(lambda: self._soco_service.sonos_uri_from_id(item_id))
             return uri
         except Exception:
             return None
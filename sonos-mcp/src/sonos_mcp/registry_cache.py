@@ -0,0 +1,67 @@
+"""Persisted last-known discovery result.
+
+Discovery costs a 5 s SSDP sweep plus a probe per missing speaker. The result
+(IPs, UIDs, names, models, household) is written to a small JSON file after
+each successful discovery and loaded at boot, so tools can answer at once
+while a fresh discovery runs in the background.
+"""
+
+import json
+import os
+import tempfile
+import time
+from typing import List, Optional
+from pydantic import BaseModel, ValidationError
+
+REGISTRY_CACHE_VERSION = 1
+
+
+class CachedSpeaker(BaseModel):
+    """One speaker as last seen by discovery."""
+    name: str
+    ip: str
+    uid: str = ""
+    player_name: str = ""
+    model_name: str = ""
+
+
+class RegistryCache(BaseModel):
+    """Everything needed to rebuild SpeakerCache without touching the network."""
+    version: int = REGISTRY_CACHE_VERSION
+    saved_at: float = 0.0
+    household_id: Optional[str] = None
+    speakers: List[CachedSpeaker] = []
+    offline: List[str] = []
+
+    @property
+    def age_s(self) -> float:
+        return max(0.0, time.time() - self.saved_at)
+
+
+def load_registry_cache(path: str) -> Optional[RegistryCache]:
+    """Read the cache file; None if missing, unreadable or from another version."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            cache = RegistryCache.model_validate(json.load(f))
+    except (OSError, ValueError, ValidationError):
+        return None
+    if cache.version != REGISTRY_CACHE_VERSION:
+        return None
+    return cache
+
+
+def save_registry_cache(path: str, cache: RegistryCache) -> None:
+    """Write the cache atomically (temp file + rename) so a crash never truncates it."""
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".registry-", suffix=".json")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(cache.model_dump(), f, indent=2)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
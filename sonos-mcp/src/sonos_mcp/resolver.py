@@ -1,9 +1,19 @@
-"""Fuzzy speaker and zone name resolution for natural language input."""
+"""Fuzzy speaker and zone name resolution for natural language input.
 
+The registry is compiled once into an exact-match table and an n-gram index.
+A lookup hashes the utterance, and on a miss scores only the shortlist of
+names that share the most n-grams with it, so cost stays flat as the registry
+grows. Recent utterances are answered from an LRU cache.
+"""
+
+import heapq
+from collections import Counter, OrderedDict
 from difflib import SequenceMatcher
-from typing import Optional, List, Union
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
 from pydantic import BaseModel
-from .config import SPEAKERS, ZONES, SpeakerInfo, ZoneDefinition
+from .config import (
+    SPEAKERS, ZONES, SpeakerInfo, ZoneDefinition, RESOLVER_CACHE_SIZE, RESOLVER_SHORTLIST,
+)
 
 
 class ResolveResult(BaseModel):
@@ -20,12 +30,113 @@ class ResolveResult(BaseModel):
 PARTY_TOKENS = {"everywhere", "all", "all speakers", "whole house", "party", "party mode"}
 
 
+class _Entry(NamedTuple):
+    """One matchable string: a speaker name, alias or room, or a zone id or name."""
+    text: str
+    kind: str  # "speaker" or "zone"
+    key: str  # speaker name or zone id
+    order: int  # registry order, for stable tie-breaks
+    partial_bonus: bool  # utterance-inside-candidate bonus (speakers only)
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def _ngrams(text: str) -> Set[str]:
+    """Character bigrams and trigrams of a space-padded string."""
+    padded = f" {text} "
+    return {padded[i:i + n] for n in (2, 3) for i in range(len(padded) - n + 1)}
+
+
 class SpeakerResolver:
     """Resolves natural language to speakers or zones."""
 
-    def resolve(self, utterance: str) -> ResolveResult:
-        utterance_lower = utterance.strip().lower()
+    def __init__(
+        self,
+        speakers: Optional[Dict[str, SpeakerInfo]] = None,
+        zones: Optional[Dict[str, ZoneDefinition]] = None,
+        cache_size: int = RESOLVER_CACHE_SIZE,
+        shortlist: int = RESOLVER_SHORTLIST,
+    ):
+        self.speakers = SPEAKERS if speakers is None else speakers
+        self.zones = ZONES if zones is None else zones
+        self.cache_size = cache_size
+        self.shortlist = shortlist
+        self._cache: "OrderedDict[str, ResolveResult]" = OrderedDict()
+        self.rebuild()
+
+    def rebuild(self) -> None:
+        """Recompile the index (call after changing the speaker or zone registry)."""
+        self._exact: Dict[str, Tuple[str, str]] = {}
+        self._entries: List[_Entry] = []
+        self._index: Dict[str, List[int]] = {}
+        self._gram_counts: List[int] = []
+        # Per target, the strings _get_candidates scores (names + aliases, zone names)
+        self._candidate_texts: Dict[Tuple[str, str], List[str]] = {}
+        self._cache.clear()
+
+        # Exact tiers, in priority order: speaker names, zone ids / names,
+        # then aliases and rooms (which previously won via a 1.0 fuzzy score)
+        for name in self.speakers:
+            self._exact.setdefault(_normalize(name), ("speaker", name))
+        for zid, zone in self.zones.items():
+            self._exact.setdefault(_normalize(zid), ("zone", zid))
+            self._exact.setdefault(_normalize(zone.display_name), ("zone", zid))
+        for name, info in self.speakers.items():
+            for text in [*info.aliases, info.room]:
+                self._exact.setdefault(_normalize(text), ("speaker", name))
+
+        for name, info in self.speakers.items():
+            for text in [name, *info.aliases, info.room]:
+                self._add_entry(text, "speaker", name, partial_bonus=True)
+            self._candidate_texts[("speaker", name)] = [name.lower()] + [a.lower() for a in info.aliases]
+        for zid, zone in self.zones.items():
+            for text in (zid, zone.display_name):
+                self._add_entry(text, "zone", zid, partial_bonus=False)
+            self._candidate_texts[("zone", zid)] = [zone.display_name.lower()]
+
+    def _add_entry(self, text: str, kind: str, key: str, partial_bonus: bool) -> None:
+        position = len(self._entries)
+        entry = _Entry(text.lower(), kind, key, position, partial_bonus)
+        grams = _ngrams(entry.text)
+        self._entries.append(entry)
+        self._gram_counts.append(len(grams))
+        for gram in grams:
+            self._index.setdefault(gram, []).append(position)
+
+    def _shortlist(self, utterance: str) -> List[int]:
+        """Entries sharing the most n-grams with the utterance (overlap coefficient)."""
+        grams = _ngrams(utterance)
+        # Trigrams first, bigrams only when no trigram is shared (short typos)
+        postings = [self._index[g] for g in grams if len(g) == 3 and g in self._index]
+        postings = postings or [self._index[g] for g in grams if g in self._index]
+        if not postings:
+            return []
+        # Skip n-grams shared by a large slice of the registry ("roo", " b");
+        # they cost the most to count and say the least
+        common = max(32, len(self._entries) // 8)
+        postings = [p for p in postings if len(p) <= common] or postings
+        shared = Counter(i for posting in postings for i in posting)
+        ranked = heapq.nlargest(
+            self.shortlist, shared.items(),
+            key=lambda item: (item[1] / min(len(grams), self._gram_counts[item[0]]), item[1]),
+        )
+        return sorted(i for i, _ in ranked)
 
+    def resolve(self, utterance: str) -> ResolveResult:
+        key = _normalize(utterance)
+        cached = self._cache.get(key)
+        if cached is None:
+            cached = self._resolve(key)
+            self._cache[key] = cached
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        else:
+            self._cache.move_to_end(key)
+        return cached.model_copy(deep=True)
+
+    def _resolve(self, utterance_lower: str) -> ResolveResult:
         # Special tokens
         if utterance_lower in PARTY_TOKENS:
             return ResolveResult(
@@ -33,51 +144,35 @@ class SpeakerResolver:
                 zone_id="whole_house", confidence=1.0,
             )
 
-        # 1. Exact match on speaker canonical names
-        for name in SPEAKERS:
-            if utterance_lower == name.lower():
-                return ResolveResult(
-                    resolved=True, match_type="speaker",
-                    speaker_name=name, confidence=1.0,
-                )
-
-        # 2. Exact match on zone display names / zone_ids
-        for zid, zone in ZONES.items():
-            if utterance_lower in (zid.lower(), zone.display_name.lower()):
-                return ResolveResult(
-                    resolved=True, match_type="zone",
-                    zone_id=zid, confidence=1.0,
-                )
-
-        # 3. Fuzzy match against speaker names + aliases
-        best_speaker = None
-        best_speaker_score = 0.0
-        for name, info in SPEAKERS.items():
-            candidates_for_name = [name.lower()] + [a.lower() for a in info.aliases]
-            candidates_for_name.append(info.room.lower())
-            for candidate in candidates_for_name:
-                score = SequenceMatcher(None, utterance_lower, candidate).ratio()
-                # Bonus if candidate is contained in utterance
-                if candidate in utterance_lower:
-                    score = max(score, 0.85)
-                if utterance_lower in candidate:
-                    score = max(score, 0.80)
-                if score > best_speaker_score:
-                    best_speaker_score = score
-                    best_speaker = name
-
-        # 4. Fuzzy match against zone names
-        best_zone = None
-        best_zone_score = 0.0
-        for zid, zone in ZONES.items():
-            candidates_for_zone = [zid.lower(), zone.display_name.lower()]
-            for candidate in candidates_for_zone:
-                score = SequenceMatcher(None, utterance_lower, candidate).ratio()
-                if candidate in utterance_lower:
-                    score = max(score, 0.85)
-                if score > best_zone_score:
-                    best_zone_score = score
-                    best_zone = zid
+        # 1. Exact match on names, zone ids, aliases and rooms
+        exact = self._exact.get(utterance_lower)
+        if exact:
+            kind, key = exact
+            if kind == "speaker":
+                return ResolveResult(resolved=True, match_type="speaker",
+                                     speaker_name=key, confidence=1.0)
+            return ResolveResult(resolved=True, match_type="zone",
+                                 zone_id=key, confidence=1.0)
+
+        # 2. Fuzzy match, scoring only the n-gram shortlist (very short
+        # utterances are substrings of too much to shortlist; score them all)
+        shortlist = None
+        if len(utterance_lower) > 3:
+            shortlist = self._shortlist(utterance_lower)
+        shortlist = shortlist or range(len(self._entries))
+        best = {"speaker": (0.0, None), "zone": (0.0, None)}
+        for i in shortlist:
+            entry = self._entries[i]
+            score = SequenceMatcher(None, utterance_lower, entry.text).ratio()
+            # Bonus if candidate is contained in utterance (or vice versa for speakers)
+            if entry.text in utterance_lower:
+                score = max(score, 0.85)
+            if entry.partial_bonus and utterance_lower in entry.text:
+                score = max(score, 0.80)
+            if score > best[entry.kind][0]:
+                best[entry.kind] = (score, entry.key)
+        best_speaker_score, best_speaker = best["speaker"]
+        best_zone_score, best_zone = best["zone"]
 
         # Pick the best overall match
         if best_speaker_score >= best_zone_score and best_speaker_score >= 0.6:
@@ -86,7 +181,7 @@ class SpeakerResolver:
                 match_type="speaker",
                 speaker_name=best_speaker,
                 confidence=best_speaker_score,
-                candidates=self._get_candidates(utterance_lower) if best_speaker_score < 0.7 else [],
+                candidates=self._get_candidates(utterance_lower, shortlist) if best_speaker_score < 0.7 else [],
             )
         elif best_zone_score >= 0.6:
             return ResolveResult(
@@ -94,28 +189,31 @@ class SpeakerResolver:
                 match_type="zone",
                 zone_id=best_zone,
                 confidence=best_zone_score,
-                candidates=self._get_candidates(utterance_lower) if best_zone_score < 0.7 else [],
+                candidates=self._get_candidates(utterance_lower, shortlist) if best_zone_score < 0.7 else [],
             )
 
         # No good match
         return ResolveResult(
             resolved=False,
             confidence=max(best_speaker_score, best_zone_score),
-            candidates=self._get_candidates(utterance_lower),
+            candidates=self._get_candidates(utterance_lower, shortlist),
         )
 
-    def _get_candidates(self, utterance: str, top_n: int = 5) -> List[dict]:
-        """Return top-N candidates sorted by score."""
+    def _get_candidates(self, utterance: str, shortlist: Optional[Iterable[int]] = None,
+                        top_n: int = 5) -> List[dict]:
+        """Return top-N candidates sorted by score (shortlisted targets only)."""
+        entries = self._entries if shortlist is None else [self._entries[i] for i in shortlist]
+        targets = list(dict.fromkeys((e.kind, e.key) for e in entries))
         results = []
-        for name, info in SPEAKERS.items():
+        for kind, key in targets:
             score = max(
-                SequenceMatcher(None, utterance, name.lower()).ratio(),
-                *(SequenceMatcher(None, utterance, a.lower()).ratio() for a in info.aliases)
-                if info.aliases else [0.0],
+                (SequenceMatcher(None, utterance, text).ratio() for text in self._candidate_texts[(kind, key)]),
+                default=0.0,
             )
-            results.append({"type": "speaker", "name": name, "score": round(score, 2)})
-        for zid, zone in ZONES.items():
-            score = SequenceMatcher(None, utterance, zone.display_name.lower()).ratio()
-            results.append({"type": "zone", "name": zone.display_name, "id": zid, "score": round(score, 2)})
+            if kind == "speaker":
+                results.append({"type": "speaker", "name": key, "score": round(score, 2)})
+            else:
+                zone = self.zones[key]
+                results.append({"type": "zone", "name": zone.display_name, "id": key, "score": round(score, 2)})
         results.sort(key=lambda x: x["score"], reverse=True)
         return results[:top_n]
@@ -8,7 +8,8 @@ from .discovery import SpeakerCache
 from .resolver import SpeakerResolver
 from .integrations.home_assistant import HomeAssistantClient
 from .integrations.crestron import CrestronAwareness
-from .config import SPEAKERS
+from .executor import soco_executor
+from .config import SPEAKERS, REGISTRY_CACHE_PATH
 
 # Module-level singletons (accessed by tool modules)
 speaker_cache = SpeakerCache()
@@ -27,6 +28,14 @@ async def app_lifespan(app):
     crestron_host = os.environ.get("CRESTRON_HOST", "192.168.1.2")
     crestron_token = os.environ.get("CRESTRON_AUTH_TOKEN", "")
 
+    # SoCo executor sizing (optional overrides)
+    soco_workers = os.environ.get("SONOS_SOCO_WORKERS")
+    soco_per_speaker = os.environ.get("SONOS_SOCO_PER_SPEAKER")
+    soco_executor.configure(
+        workers=int(soco_workers) if soco_workers else None,
+        per_speaker=int(soco_per_speaker) if soco_per_speaker else None,
+    )
+
     # HA client (optional — server works without it for standalone testing)
     if ha_url and ha_token:
         ha_client = HomeAssistantClient(ha_url, ha_token)
@@ -35,17 +44,32 @@ async def app_lifespan(app):
     # Crestron awareness (Phase 2 stub)
     crestron = CrestronAwareness(crestron_host, crestron_token)
 
-    # Initial speaker discovery
-    try:
-        await speaker_cache.discover(SPEAKERS)
-    except Exception:
-        pass  # Discovery may fail if no speakers reachable; tools will retry
+    # Speaker discovery: serve the last-known result at once and refresh behind
+    # it (set SONOS_REGISTRY_CACHE= to disable the on-disk cache)
+    speaker_cache.cache_path = os.environ.get("SONOS_REGISTRY_CACHE", REGISTRY_CACHE_PATH) or None
+    probe_timeout = os.environ.get("SONOS_PROBE_TIMEOUT")
+    if probe_timeout:
+        speaker_cache.probe_timeout = float(probe_timeout)
+    if speaker_cache.restore():
+        speaker_cache.refresh_in_background(SPEAKERS)
+    else:
+        try:
+            await speaker_cache.discover(SPEAKERS)
+        except Exception:
+            pass  # Discovery may fail if no speakers reachable; tools will retry
+
+    # Event mirror (set SONOS_EVENT_MIRROR=0 to poll only)
+    if os.environ.get("SONOS_EVENT_MIRROR", "1") != "0":
+        speaker_cache.start_mirror()
 
     yield
 
     # Cleanup
+    await speaker_cache.stop_refresh()
+    await speaker_cache.stop_mirror()
     if ha_client:
         await ha_client.close()
+    soco_executor.shutdown()
 
 
 mcp = FastMCP("Villa Media Engine", lifespan=app_lifespan)
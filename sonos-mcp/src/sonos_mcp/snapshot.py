@@ -0,0 +1,97 @@
+"""Parallel state snapshots across many speakers with bounded concurrency."""
+
+import asyncio
+import time
+from typing import Any, Callable, Dict, List, Optional
+from pydantic import BaseModel
+from .config import SNAPSHOT_CONCURRENCY, SNAPSHOT_DEADLINE
+from .helpers import run_soco
+
+
+class SpeakerSnapshot(BaseModel):
+    """Outcome of collecting state from one speaker."""
+    name: str
+    ok: bool
+    data: dict = {}
+    error: Optional[str] = None
+    latency_ms: float = 0.0
+
+
+class Snapshot(BaseModel):
+    """Whole-house snapshot: per-speaker results in registry order."""
+    speakers: List[SpeakerSnapshot]
+    elapsed_ms: float
+
+    @property
+    def failed(self) -> List[str]:
+        return [s.name for s in self.speakers if not s.ok]
+
+    @property
+    def slowest(self) -> Optional[SpeakerSnapshot]:
+        if not self.speakers:
+            return None
+        return max(self.speakers, key=lambda s: s.latency_ms)
+
+
+async def _collect_one(name: str, device, collect: Callable[[Any], dict],
+                       semaphore: asyncio.Semaphore, deadline: float) -> SpeakerSnapshot:
+    async with semaphore:
+        start = time.perf_counter()
+        try:
+            data = await asyncio.wait_for(run_soco(collect, device), timeout=deadline)
+            ok, error = True, None
+            if isinstance(data, dict) and "error" in data:
+                # Collectors like format_speaker_state report their own failures
+                data, ok, error = {}, False, str(data["error"])
+        except asyncio.TimeoutError:
+            data, ok, error = {}, False, f"timed out after {deadline:g}s"
+        except Exception as e:
+            data, ok, error = {}, False, str(e) or type(e).__name__
+        latency_ms = (time.perf_counter() - start) * 1000
+    return SpeakerSnapshot(
+        name=name, ok=ok, data=data or {}, error=error,
+        latency_ms=round(latency_ms, 1),
+    )
+
+
+async def snapshot_speakers(
+    devices: Dict[str, Any],
+    collect: Callable[[Any], dict],
+    concurrency: int = SNAPSHOT_CONCURRENCY,
+    deadline: float = SNAPSHOT_DEADLINE,
+) -> Snapshot:
+    """Run a blocking collector against every device at once.
+
+    At most `concurrency` speakers are queried simultaneously and each one gets
+    `deadline` seconds. A speaker that misses its deadline is reported as failed
+    rather than holding up the rest, so total cost tracks the slowest responsive
+    speaker instead of the sum of all of them.
+
+    Args:
+        devices: Mapping of speaker name to SoCo device (e.g. speaker_cache.online)
+        collect: Synchronous function taking a device and returning a state dict
+            (one carrying an "error" key counts as a failed speaker)
+        concurrency: Maximum in-flight speakers
+        deadline: Per-speaker timeout in seconds
+    """
+    start = time.perf_counter()
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    results = await asyncio.gather(*(
+        _collect_one(name, device, collect, semaphore, deadline)
+        for name, device in devices.items()
+    ))
+    return Snapshot(
+        speakers=list(results),
+        elapsed_ms=round((time.perf_counter() - start) * 1000, 1),
+    )
+
+
+def snapshot_summary(snap: Snapshot) -> str:
+    """One-line latency summary for appending to markdown output."""
+    line = f"Snapshot: {len(snap.speakers)} speakers in {snap.elapsed_ms:.0f} ms"
+    slowest = snap.slowest
+    if slowest:
+        line += f" (slowest: {slowest.name} {slowest.latency_ms:.0f} ms)"
+    if snap.failed:
+        line += f"; no response from {', '.join(snap.failed)}"
+    return line
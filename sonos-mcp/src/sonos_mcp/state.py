@@ -0,0 +1,55 @@
+"""Cached static speaker facts from the device description.
+
+A naive state read costs one UPnP round-trip per attribute. Static facts
+(name, model, uid) never change between discoveries, so they come from the
+device description once and are cached by IP. Group membership lives in
+topology.py and is read once per call for the whole house.
+"""
+
+from typing import Dict, Optional
+from pydantic import BaseModel
+
+
+class DeviceRecord(BaseModel):
+    """Static speaker facts from device_description.xml."""
+    ip: str
+    uid: str = ""
+    player_name: str = ""
+    model_name: str = ""
+
+
+_records: Dict[str, DeviceRecord] = {}
+
+
+def device_record(device, refresh: bool = False, timeout: Optional[float] = None) -> DeviceRecord:
+    """Return the cached static record for a device, fetching it on first use.
+
+    `timeout` bounds the device-description HTTP fetch (None: SoCo default).
+    """
+    ip = device.ip_address
+    if not refresh and ip in _records:
+        return _records[ip]
+    info = device.get_speaker_info(refresh=refresh, timeout=timeout) or {}
+    record = DeviceRecord(
+        ip=ip,
+        uid=info.get("uid") or "",
+        player_name=info.get("zone_name") or "",
+        model_name=info.get("model_name") or "",
+    )
+    _records[ip] = record
+    return record
+
+
+def cached_record(ip: str) -> Optional[DeviceRecord]:
+    """Return the device record for an IP only if it is already cached."""
+    return _records.get(ip)
+
+
+def remember_record(record: DeviceRecord) -> None:
+    """Seed the cache with a known record (e.g. restored from the registry cache)."""
+    _records[record.ip] = record
+
+
+def forget_device_records() -> None:
+    """Drop all cached device records (e.g. after a speaker is renamed)."""
+    _records.clear()
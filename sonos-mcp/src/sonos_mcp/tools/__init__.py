@@ -12,3 +12,4 @@ def register_all_tools(mcp):
     from . import zones
     from . import villa
     from . import resolve
+    from . import diagnostics
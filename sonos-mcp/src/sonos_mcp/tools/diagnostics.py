@@ -0,0 +1,36 @@
+"""Diagnostics tools: SoCo call latency and executor load."""
+
+from ..server import mcp, speaker_cache
+from ..executor import soco_executor
+
+
+@mcp.tool()
+async def sonos_soco_stats(reset: bool = False, top: int = 25) -> dict:
+    """Show SoCo call statistics: queue wait and execution time per speaker and call.
+
+    Use this to find slow speakers or calls that hold up fan-out tools.
+
+    Args:
+        reset: Clear the counters after reading them
+        top: Number of (speaker, call) rows to return, slowest total time first
+    """
+    names = {d.ip_address: name for name, d in speaker_cache.online.items()}
+    report = soco_executor.stats.report(top=max(1, top))
+    for row in report["by_call"]:
+        row["speaker"] = names.get(row["speaker"], row["speaker"])
+    if reset:
+        soco_executor.stats.reset()
+
+    return {
+        "executor": {
+            "workers": soco_executor.workers,
+            "per_speaker_limit": soco_executor.per_speaker,
+            "in_flight": report["in_flight"],
+            "queued": report["queued"],
+        },
+        "calls": report["calls"],
+        "errors": report["errors"],
+        "by_call": report["by_call"],
+        "topology_reads": speaker_cache.topology.reads,
+        "event_mirror": speaker_cache.mirror.stats(),
+    }
@@ -1,7 +1,9 @@
 """Discovery tools: find and inspect Sonos speakers."""
 
 from ..server import mcp, speaker_cache
-from ..helpers import run_soco, format_speaker_state, format_markdown_speakers
+from ..helpers import run_soco, format_markdown_speakers
+from ..snapshot import snapshot_speakers, snapshot_summary
+from ..state import device_record
 
 
 @mcp.tool()
@@ -9,26 +11,35 @@ async def sonos_discover(force_refresh: bool = False) -> dict:
     """Discover all Sonos speakers on the network.
 
     Returns online speakers with IPs and offline speakers from the registry.
-    Use force_refresh=True to bypass the 5-minute cache.
+    Use force_refresh=True to bypass the 5-minute cache and wait for a fresh scan.
     """
-    if force_refresh or speaker_cache.is_stale:
-        await speaker_cache.discover()
+    if force_refresh:
+        await speaker_cache.refresh()
+    else:
+        await speaker_cache.ensure_fresh()
 
+    devices = speaker_cache.online
+    snap = await snapshot_speakers(devices, lambda d: device_record(d, refresh=force_refresh).model_dump())
     online = {}
-    for name, device in speaker_cache.online.items():
-        try:
-            online[name] = {
-                "ip": device.ip_address,
-                "model": await run_soco(lambda d=device: d.model_name),
-            }
-        except Exception:
-            online[name] = {"ip": getattr(device, "ip_address", "unknown"), "model": "unknown"}
+    for entry in snap.speakers:
+        model = entry.data.get("model_name") if entry.ok else None
+        online[entry.name] = {
+            "ip": devices[entry.name].ip_address,
+            "model": model or "unknown",
+        }
 
     return {
         "online_count": len(online),
         "offline_count": len(speaker_cache.offline_names),
         "online": online,
         "offline": speaker_cache.offline_names,
+        # Direct-IP probes of registry speakers SSDP did not find
+        "fallback_probes": {
+            p.name: {"ok": p.ok, "latency_ms": p.latency_ms, "error": p.error}
+            for p in speaker_cache.last_probes
+        },
+        "last_changes": speaker_cache.last_changes.model_dump() if speaker_cache.last_changes else None,
+        "event_mirror": speaker_cache.mirror.stats(),
     }
 
 
@@ -55,7 +66,8 @@ async def sonos_get_speaker(speaker: str) -> dict:
     if not device:
         return {"error": f"Speaker '{speaker}' not found. Online: {list(speaker_cache.online.keys())}"}
 
-    state = await run_soco(format_speaker_state, device)
+    collect = await speaker_cache.state_collector()
+    state = await run_soco(collect, device)
     return state
 
 
@@ -64,12 +76,13 @@ async def sonos_system_status() -> str:
     """Get a markdown summary of all Sonos speakers: name, state, volume, track, group."""
     await speaker_cache.ensure_fresh()
 
-    states = []
-    for name, device in speaker_cache.online.items():
-        state = await run_soco(format_speaker_state, device)
-        states.append(state)
+    devices = speaker_cache.online
+    collect = await speaker_cache.state_collector()
+    snap = await snapshot_speakers(devices, collect)
+    states = [s.data if s.ok else {"name": s.name, "error": s.error} for s in snap.speakers]
 
     md = format_markdown_speakers(states)
+    md += f"\n\n_{snapshot_summary(snap)}_"
     if speaker_cache.offline_names:
         md += f"\n\n**Offline:** {', '.join(speaker_cache.offline_names)}"
     return md
@@ -7,30 +7,32 @@ from ..integrations.home_assistant import check_agent_media_gate
 from .playback import _resolve_device
 
 
+async def _in_party_mode(coord_device) -> bool:
+    """True if every online speaker is already grouped under coord_device."""
+    topology = await speaker_cache.get_topology()
+    if topology is None:
+        return False
+    ips = [d.ip_address for d in speaker_cache.online.values()]
+    return topology.all_grouped_under(coord_device.ip_address, ips)
+
+
 @mcp.tool()
 async def sonos_list_groups() -> list:
     """List all current Sonos speaker groups with coordinators and members."""
     await speaker_cache.ensure_fresh()
 
-    seen_groups = set()
-    groups = []
-    for name, device in speaker_cache.online.items():
-        try:
-            group = await run_soco(lambda d=device: d.group)
-            coord_name = await run_soco(lambda g=group: g.coordinator.player_name)
-            if coord_name in seen_groups:
-                continue
-            seen_groups.add(coord_name)
-            members = await run_soco(lambda g=group: [m.player_name for m in g.members])
-            groups.append({
-                "coordinator": coord_name,
-                "members": members,
-                "size": len(members),
-            })
-        except Exception:
-            continue
-
-    return groups
+    topology = await speaker_cache.get_topology()
+    if topology is None:
+        return []
+    return [
+        {
+            "coordinator": g.coordinator,
+            "members": g.members,
+            "size": len(g.members),
+            "group_id": g.group_id,
+        }
+        for g in topology.groups
+    ]
 
 
 @mcp.tool()
@@ -45,6 +47,7 @@ async def sonos_join(speaker: str, coordinator: str) -> str:
     device = await _resolve_device(speaker)
     coord_device = await _resolve_device(coordinator)
     await run_soco(device.join, coord_device)
+    speaker_cache.topology.invalidate()
     s_name = await run_soco(lambda: device.player_name)
     c_name = await run_soco(lambda: coord_device.player_name)
     return f"{s_name} joined group led by {c_name}"
@@ -60,6 +63,7 @@ async def sonos_unjoin(speaker: str) -> str:
     await check_agent_media_gate(ha_client)
     device = await _resolve_device(speaker)
     await run_soco(device.unjoin)
+    speaker_cache.topology.invalidate()
     name = await run_soco(lambda: device.player_name)
     return f"{name} removed from group (now solo)"
 
@@ -83,6 +87,7 @@ async def sonos_create_group(coordinator: str, members: List[str]) -> str:
             joined.append(member_name)
         except Exception as e:
             errors.append(f"{member_name}: {e}")
+    speaker_cache.topology.invalidate()
 
     c_name = await run_soco(lambda: coord_device.player_name)
     msg = f"Group created: {c_name} (coordinator) + {', '.join(joined)}"
@@ -100,6 +105,9 @@ async def sonos_party_mode(coordinator: str = "Lounge") -> str:
     """
     await check_agent_media_gate(ha_client)
     coord_device = await _resolve_device(coordinator)
-    await run_soco(coord_device.partymode)
     c_name = await run_soco(lambda: coord_device.player_name)
+    if await _in_party_mode(coord_device):
+        return f"Party mode already active under {c_name}"
+    await run_soco(coord_device.partymode)
+    speaker_cache.topology.invalidate()
     return f"Party mode activated! All speakers grouped under {c_name}"
@@ -3,6 +3,39 @@
 from typing import Optional
 from ..server import mcp, speaker_cache, ha_client
 from ..helpers import run_soco, format_track_info
+from ..snapshot import snapshot_speakers
+from ..state import cached_record, device_record
+
+
+def _live_now_playing(ip: str) -> Optional[dict]:
+    live = speaker_cache.mirror.transport(ip)
+    if not live:
+        return None
+    return {"state": live["state"], **format_track_info(live["track"])}
+
+
+def _now_playing(device) -> dict:
+    """Transport state + track, from the event mirror when live, else polled."""
+    live = _live_now_playing(device.ip_address)
+    if live:
+        return live
+    track = device.get_current_track_info()
+    transport = device.get_current_transport_info()
+    return {
+        "state": transport.get("current_transport_state", "UNKNOWN"),
+        **format_track_info(track),
+    }
+
+
+def _collect_villa_summary(device) -> dict:
+    playing = _now_playing(device)
+    live = speaker_cache.mirror.rendering(device.ip_address)
+    return {
+        "state": playing["state"],
+        "volume": live["volume"] if live else device.volume,
+        "track": playing["title"],
+        "artist": playing["artist"],
+    }
 
 
 @mcp.tool()
@@ -28,19 +61,11 @@ async def sonos_villa_context() -> dict:
             pass
 
     await speaker_cache.ensure_fresh()
-    for name, device in speaker_cache.online.items():
-        try:
-            transport = await run_soco(lambda d=device: d.get_current_transport_info())
-            track = await run_soco(lambda d=device: d.get_current_track_info())
-            vol = await run_soco(lambda d=device: d.volume)
-            context["speakers"][name] = {
-                "state": transport.get("current_transport_state", "UNKNOWN"),
-                "volume": vol,
-                "track": track.get("title", ""),
-                "artist": track.get("artist", ""),
-            }
-        except Exception:
-            context["speakers"][name] = {"state": "ERROR"}
+    snap = await snapshot_speakers(speaker_cache.online, _collect_villa_summary)
+    for s in snap.speakers:
+        entry = s.data if s.ok else {"state": "ERROR", "error": s.error}
+        context["speakers"][s.name] = {**entry, "latency_ms": s.latency_ms}
+    context["snapshot_ms"] = snap.elapsed_ms
 
     return context
 
@@ -57,24 +82,14 @@ async def sonos_now_playing(speaker: Optional[str] = None) -> dict:
     if speaker:
         from .playback import _resolve_device
         device = await _resolve_device(speaker)
-        track = await run_soco(lambda: device.get_current_track_info())
-        transport = await run_soco(lambda: device.get_current_transport_info())
-        return {
-            "speaker": await run_soco(lambda: device.player_name),
-            "state": transport.get("current_transport_state", "UNKNOWN"),
-            **format_track_info(track),
-        }
+        playing = _live_now_playing(device.ip_address) or await run_soco(_now_playing, device)
+        record = cached_record(device.ip_address) or await run_soco(device_record, device)
+        return {"speaker": record.player_name, **playing}
 
     # All speakers
+    snap = await snapshot_speakers(speaker_cache.online, _now_playing)
     result = {}
-    for name, device in speaker_cache.online.items():
-        try:
-            track = await run_soco(lambda d=device: d.get_current_track_info())
-            transport = await run_soco(lambda d=device: d.get_current_transport_info())
-            result[name] = {
-                "state": transport.get("current_transport_state", "UNKNOWN"),
-                **format_track_info(track),
-            }
-        except Exception:
-            result[name] = {"state": "ERROR"}
+    for s in snap.speakers:
+        entry = s.data if s.ok else {"state": "ERROR", "error": s.error}
+        result[s.name] = {**entry, "latency_ms": s.latency_ms}
     return result
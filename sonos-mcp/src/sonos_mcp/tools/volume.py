@@ -2,6 +2,7 @@
 
 from ..server import mcp, speaker_cache, ha_client, resolver
 from ..helpers import run_soco, clamp_volume
+from ..state import cached_record, device_record
 from ..integrations.home_assistant import check_agent_media_gate
 from .playback import _resolve_device
 
@@ -14,10 +15,14 @@ async def sonos_get_volume(speaker: str) -> dict:
         speaker: Speaker name
     """
     device = await _resolve_device(speaker)
-    volume = await run_soco(lambda: device.volume)
-    muted = await run_soco(lambda: device.mute)
-    name = await run_soco(lambda: device.player_name)
-    return {"speaker": name, "volume": volume, "muted": muted, "max_allowed": 70}
+    live = speaker_cache.mirror.rendering(device.ip_address)
+    if live:
+        volume, muted = live["volume"], live["muted"]
+    else:
+        volume = await run_soco(lambda: device.volume)
+        muted = await run_soco(lambda: device.mute)
+    record = cached_record(device.ip_address) or await run_soco(device_record, device)
+    return {"speaker": record.player_name, "volume": volume, "muted": muted, "max_allowed": 70}
 
 
 @mcp.tool()
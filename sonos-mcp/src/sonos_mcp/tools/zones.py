@@ -1,9 +1,13 @@
 """Zone management tools: predefined speaker zones for the villa."""
 
-from typing import Optional
+import asyncio
+import time
+from typing import Optional, Tuple
 from ..server import mcp, speaker_cache, ha_client, resolver
 from ..config import ZONES
-from ..helpers import run_soco, format_speaker_state, clamp_volume
+from ..helpers import run_soco, clamp_volume
+from ..snapshot import snapshot_speakers
+from ..assembly import join_members, prepare_coordinator, format_assembly_report
 from ..integrations.home_assistant import check_agent_media_gate
 from .playback import _resolve_device
 
@@ -34,9 +38,12 @@ async def sonos_play_in_zone(
     """Group all speakers in a zone and optionally play content at a set volume.
 
     This is the high-level "play music in a room" tool. It:
-    1. Groups all zone speakers under the default coordinator
-    2. Sets volume on all speakers (clamped to 70%)
-    3. Plays the specified favorite or URI
+    1. Groups all zone speakers under the default coordinator, skipping any
+       already in the group and joining the rest concurrently
+    2. Sets volume on all speakers (clamped to 70%) before they join
+    3. Plays the specified favorite or URI as soon as the coordinator is ready
+
+    Reports time to first audio and a per-speaker outcome.
 
     Args:
         zone: Zone ID (e.g. "great_room", "pool", "outdoor", "whole_house")
@@ -56,37 +63,84 @@ async def sonos_play_in_zone(
     if not zone_def:
         return f"Zone '{zone}' not found. Available: {list(ZONES.keys())}"
 
-    # Handle whole_house special case
+    start = time.perf_counter()
+    coord_name = zone_def.default_coordinator
+    coord_device = await _resolve_device(coord_name)
+    topology = await speaker_cache.get_topology()
+    clamped = clamp_volume(volume)[0] if volume is not None else None
+    mirror = speaker_cache.mirror
+
+    # Members by registry name, straight from the cache (no per-name resolve)
     if zone_def.speakers == ["ALL"]:
-        coord_device = await _resolve_device(zone_def.default_coordinator)
-        await run_soco(coord_device.partymode)
-        speakers_grouped = list(speaker_cache.online.keys())
+        members = {n: d for n, d in speaker_cache.online.items()
+                   if d.ip_address != coord_device.ip_address}
     else:
-        coord_device = await _resolve_device(zone_def.default_coordinator)
-        speakers_grouped = [zone_def.default_coordinator]
-        for spk_name in zone_def.speakers:
-            if spk_name == zone_def.default_coordinator:
-                continue
-            try:
-                spk_device = await _resolve_device(spk_name)
-                await run_soco(spk_device.join, coord_device)
-                speakers_grouped.append(spk_name)
-            except Exception:
-                pass  # Speaker offline, skip
-
-    # Set volume on all zone speakers
-    if volume is not None:
-        clamped, _ = clamp_volume(volume)
-        for spk_name in speakers_grouped:
-            try:
-                spk_device = speaker_cache.get(spk_name) or await _resolve_device(spk_name)
-                await run_soco(lambda d=spk_device, v=clamped: setattr(d, 'volume', v))
-            except Exception:
-                pass
+        members = {n: speaker_cache.get(n) for n in zone_def.speakers
+                   if n != coord_name}
+        members = {n: d for n, d in members.items()
+                   if d is None or d.ip_address != coord_device.ip_address}
+
+    # Skip speakers the topology already shows under this coordinator
+    grouped_ips = set()
+    coord_group = topology.group_of(coord_device.ip_address) if topology else None
+    if coord_group and coord_group.coordinator_ip == coord_device.ip_address:
+        grouped_ips = set(coord_group.member_ips)
+    party_started = False
+    if zone_def.speakers == ["ALL"]:
+        online_ips = [d.ip_address for d in members.values()]
+        if not grouped_ips.issuperset(online_ips):
+            await run_soco(coord_device.partymode)
+            party_started = True
+        grouped_ips = set(online_ips)
+    # partymode() makes the coordinator lead; otherwise prepare_coordinator
+    # unjoins it if topology shows it as a member of someone else's group
+    coord_topology = None if party_started else topology
+
+    # Content lookup runs alongside assembly. Members only join once the
+    # coordinator has left any other group, or its unjoin would undo theirs
+    content_task = asyncio.ensure_future(_resolve_content(favorite, uri))
+    coord_outcome = await prepare_coordinator(coord_name, coord_device, coord_topology, clamped, mirror)
+    members_task = asyncio.ensure_future(
+        join_members(coord_device, members, grouped_ips, clamped, mirror)
+    )
+    # Known to lead only if topology was read and the unjoin (if any) worked
+    coord_leads = coord_outcome.action != "failed" and (
+        party_started or (topology is not None and topology.get(coord_device.ip_address) is not None)
+    )
 
     # Play content
-    coordinator = await run_soco(lambda: coord_device.group.coordinator)
     content_msg = ""
+    first_audio_ms = None
+    try:
+        content = await content_task
+        if content:
+            play_uri, title = content
+            coordinator = coord_device
+            if not coord_leads:
+                coordinator = await run_soco(lambda: coord_device.group.coordinator)
+            await run_soco(coordinator.play_uri, play_uri, title=title)
+            first_audio_ms = (time.perf_counter() - start) * 1000
+            content_msg = f", playing '{title}'" if title else ", playing URI"
+    except Exception as e:
+        content_msg = f", playback failed: {e}"
+
+    outcomes = [coord_outcome] + await members_task
+    speaker_cache.topology.invalidate()
+    assembly_ms = (time.perf_counter() - start) * 1000
+    speakers_grouped = [o.name for o in outcomes if o.grouped]
+
+    vol_msg = f" at {clamped}%" if volume else ""
+    timing = f"Assembled in {assembly_ms:.0f} ms"
+    if first_audio_ms is not None:
+        timing += f", first audio after {first_audio_ms:.0f} ms"
+    return (
+        f"Zone '{zone_def.display_name}' active: {len(speakers_grouped)} speakers grouped"
+        f"{vol_msg}{content_msg}\n{timing}\n{format_assembly_report(outcomes)}"
+    )
+
+
+async def _resolve_content(favorite: Optional[str], uri: Optional[str]) -> Optional[Tuple[str, str]]:
+    """Look up what to play: (uri, title) for a favorite or raw URI, else None."""
     if favorite:
         from ..music.favorites import SonosFavoritesService
         from .favorites import _get_any_device
@@ -95,17 +149,11 @@ async def sonos_play_in_zone(
         if result.items:
             fav_uri = await svc.get_playable_uri(result.items[0].item_id)
             if fav_uri:
-                await run_soco(coordinator.play_uri, fav_uri, title=result.items[0].title)
-                content_msg = f", playing '{result.items[0].title}'"
-    elif uri:
-        await run_soco(coordinator.play_uri, uri)
-        content_msg = f", playing URI"
-
-    vol_msg = f" at {volume}%" if volume else ""
-    return (
-        f"Zone '{zone_def.display_name}' active: {len(speakers_grouped)} speakers grouped"
-        f"{vol_msg}{content_msg}"
-    )
+                return fav_uri, result.items[0].title
+        return None
+    if uri:
+        return uri, ""
+    return None
 
 
 @mcp.tool()
@@ -129,17 +177,32 @@ async def sonos_zone_status(zone: str) -> dict:
     if speaker_names == ["ALL"]:
         speaker_names = list(speaker_cache.online.keys())
 
+    devices = {name: speaker_cache.get(name) for name in speaker_names if speaker_cache.get(name)}
+    topology = await speaker_cache.get_topology()
+    collect = await speaker_cache.state_collector()
+    snap = await snapshot_speakers(devices, collect)
+    by_name = {s.name: s for s in snap.speakers}
+
     states = []
     for name in speaker_names:
-        device = speaker_cache.get(name)
-        if device:
-            state = await run_soco(format_speaker_state, device)
-            states.append(state)
-        else:
+        s = by_name.get(name)
+        if s is None:
             states.append({"name": name, "error": "offline"})
+        elif s.ok:
+            states.append(s.data)
+        else:
+            states.append({"name": name, "error": s.error})
+
+    coord_device = speaker_cache.get(zone_def.default_coordinator)
+    grouped = None
+    if topology and coord_device:
+        grouped = topology.all_grouped_under(
+            coord_device.ip_address, [d.ip_address for d in devices.values()],
+        )
 
     return {
         "zone": zone_def.display_name,
         "zone_id": zone_def.zone_id,
+        "grouped": grouped,
         "speakers": states,
     }
@@ -0,0 +1,143 @@
+"""Zone-group topology: one ZoneGroupTopology read, indexed for every lookup.
+
+A single GetZoneGroupState document describes every group in the household.
+It is parsed once into a ZoneTopology (coordinator → members, speaker → group,
+group UUID) and shared by grouping, zone status and party-mode checks.
+TopologyCache serves it from the event mirror when a ZoneGroupTopology
+subscription is live, and otherwise from a short-TTL cache that write tools
+invalidate after changing groups.
+"""
+
+import asyncio
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from pydantic import BaseModel
+from .config import TOPOLOGY_CACHE_TTL, SNAPSHOT_DEADLINE
+from .helpers import run_soco
+
+
+class GroupMembership(BaseModel):
+    """One speaker's view of the group it belongs to."""
+    coordinator: str
+    members: List[str]
+    is_coordinator: bool
+
+
+class ZoneGroupInfo(BaseModel):
+    """One Sonos group."""
+    group_id: str
+    coordinator: str
+    coordinator_ip: str
+    members: List[str]
+    member_ips: List[str]
+
+
+class ZoneTopology(BaseModel):
+    """Every group in the household with lookup indices."""
+    groups: List[ZoneGroupInfo]
+    read_at: float = 0.0
+
+    def model_post_init(self, __context: Any) -> None:
+        self._by_id = {g.group_id: g for g in self.groups}
+        self._by_ip = {ip: g for g in self.groups for ip in g.member_ips}
+        self._by_name = {n: g for g in self.groups for n in g.members}
+        self._by_coordinator = {g.coordinator: g for g in self.groups}
+
+    def group_of(self, ip: str) -> Optional[ZoneGroupInfo]:
+        return self._by_ip.get(ip)
+
+    def group_named(self, speaker_name: str) -> Optional[ZoneGroupInfo]:
+        return self._by_name.get(speaker_name)
+
+    def group_by_id(self, group_id: str) -> Optional[ZoneGroupInfo]:
+        return self._by_id.get(group_id)
+
+    def members_of(self, coordinator_name: str) -> List[str]:
+        group = self._by_coordinator.get(coordinator_name)
+        return list(group.members) if group else []
+
+    def get(self, ip: str) -> Optional[GroupMembership]:
+        """Membership for the speaker at `ip` (the shape format_speaker_state uses)."""
+        group = self._by_ip.get(ip)
+        if group is None:
+            return None
+        return GroupMembership(
+            coordinator=group.coordinator,
+            members=group.members,
+            is_coordinator=ip == group.coordinator_ip,
+        )
+
+    def all_grouped_under(self, coordinator_ip: str, ips: Iterable[str]) -> bool:
+        """True if every speaker in `ips` is already in the coordinator's group."""
+        group = self._by_ip.get(coordinator_ip)
+        if group is None or group.coordinator_ip != coordinator_ip:
+            return False
+        return set(ips) <= set(group.member_ips)
+
+
+def read_topology(device) -> ZoneTopology:
+    """Read the household's group layout with one ZoneGroupTopology request."""
+    groups = []
+    for group in device.all_groups:
+        coordinator = group.coordinator
+        members = sorted(group.members, key=lambda m: m.player_name)
+        groups.append(ZoneGroupInfo(
+            group_id=getattr(group, "uid", None) or coordinator.ip_address,
+            coordinator=coordinator.player_name,
+            coordinator_ip=coordinator.ip_address,
+            members=[m.player_name for m in members],
+            member_ips=[m.ip_address for m in members],
+        ))
+    groups.sort(key=lambda g: g.coordinator)
+    return ZoneTopology(groups=groups, read_at=time.time())
+
+
+def shared_topology(devices: Iterable) -> Optional[ZoneTopology]:
+    """Read topology from the first device that answers. None if none do."""
+    for device in devices:
+        try:
+            return read_topology(device)
+        except Exception:
+            continue
+    return None
+
+
+class TopologyCache:
+    """Serves the current ZoneTopology with as few network reads as possible."""
+
+    def __init__(self, mirror=None, ttl: float = TOPOLOGY_CACHE_TTL):
+        self._mirror = mirror
+        self._ttl = ttl
+        self._topology: Optional[ZoneTopology] = None
+        self._expires_at = 0.0
+        self._lock = asyncio.Lock()
+        self.reads = 0
+
+    def invalidate(self) -> None:
+        """Forget the cached read (call after join/unjoin/party mode)."""
+        self._expires_at = 0.0
+
+    async def get(self, get_devices: Callable[[], Dict[str, Any]],
+                  deadline: float = SNAPSHOT_DEADLINE) -> Optional[ZoneTopology]:
+        """Current topology: event mirror if live, else cached, else one shared read."""
+        if self._mirror is not None:
+            evented = self._mirror.topology
+            if evented is not None:
+                return evented
+        if self._topology is not None and time.monotonic() < self._expires_at:
+            return self._topology
+        async with self._lock:
+            # Another caller may have refreshed while we waited
+            if self._topology is not None and time.monotonic() < self._expires_at:
+                return self._topology
+            try:
+                topology = await asyncio.wait_for(
+                    run_soco(shared_topology, list(get_devices().values())), timeout=deadline,
+                )
+            except Exception:
+                topology = None
+            self.reads += 1
+            if topology is not None:
+                self._topology = topology
+                self._expires_at = time.monotonic() + self._ttl
+            return topology
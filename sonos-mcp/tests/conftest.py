@@ -9,6 +9,15 @@ from unittest.mock import MagicMock, AsyncMock
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
 
 
+@pytest.fixture(autouse=True)
+def _clear_device_records():
+    """Device records are cached per IP at module level; isolate each test."""
+    from sonos_mcp.state import forget_device_records
+    forget_device_records()
+    yield
+    forget_device_records()
+
+
 @pytest.fixture
 def mock_soco():
     """Mock SoCo device."""
@@ -31,9 +40,16 @@ def mock_soco():
         "position": "0:01:23",
         "album_art_uri": "",
     }
+    device.get_speaker_info.return_value = {
+        "zone_name": "Test Speaker",
+        "model_name": "Sonos One",
+        "uid": "RINCON_TEST01400",
+    }
     device.group = MagicMock()
+    device.group.uid = "RINCON_TEST01400:1"
     device.group.coordinator = device
     device.group.members = [device]
+    device.all_groups = {device.group}
     return device
 
 
@@ -0,0 +1,219 @@
+"""Test concurrent zone assembly: skip grouped speakers, join the rest in parallel."""
+
+import threading
+import time
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+from sonos_mcp.assembly import join_members, prepare_coordinator, format_assembly_report
+from sonos_mcp.topology import ZoneGroupInfo, ZoneTopology
+from sonos_mcp.tools import zones
+
+pytestmark = pytest.mark.unit
+
+
+class Speaker:
+
+    def __init__(self, name, ip, delay=0.0, fail=False, tracker=None, events=None):
+        self.name = name
+        self.ip_address = ip
+        self.delay = delay
+        self.fail = fail
+        self.tracker = tracker
+        self.events = events if events is not None else []
+        self.joined_to = None
+        self.unjoined = False
+        self.volume_writes = []
+
+    def __setattr__(self, key, value):
+        if key == "volume":
+            self.volume_writes.append(value)
+        object.__setattr__(self, key, value)
+
+    def join(self, coordinator):
+        if self.tracker:
+            self.tracker.enter()
+        try:
+            time.sleep(self.delay)
+            if self.fail:
+                raise RuntimeError("UPnP Error 800")
+            self.joined_to = coordinator
+            self.events.append(("join", self.name))
+        finally:
+            if self.tracker:
+                self.tracker.leave()
+
+    def unjoin(self):
+        time.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("UPnP Error 701")
+        self.unjoined = True
+        self.events.append(("unjoin", self.name))
+
+    def play_uri(self, uri, title=""):
+        self.events.append(("play", self.name))
+
+
+class BrokenPlayer(Speaker):
+
+    def play_uri(self, uri, title=""):
+        raise RuntimeError("UPnP Error 714")
+
+
+class Tracker:
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.active = 0
+        self.peak = 0
+
+    def enter(self):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+
+    def leave(self):
+        with self.lock:
+            self.active -= 1
+
+
+@pytest.fixture
+def lounge():
+    return Speaker("Lounge", "192.168.0.101")
+
+
+@pytest.mark.asyncio
+async def test_skips_already_grouped(lounge):
+    kitchen = Speaker("Kitchen", "192.168.0.102")
+    dining = Speaker("Dining", "192.168.0.103")
+    outcomes = await join_members(
+        lounge, {"Kitchen": kitchen, "Dining": dining}, grouped_ips={"192.168.0.102"},
+    )
+    assert [o.action for o in outcomes] == ["already grouped", "joined"]
+    assert kitchen.joined_to is None
+    assert dining.joined_to is lounge
+
+
+@pytest.mark.asyncio
+async def test_joins_concurrently_with_bound(lounge):
+    tracker = Tracker()
+    members = {f"S{i}": Speaker(f"S{i}", f"192.168.0.{110 + i}", delay=0.1, tracker=tracker)
+               for i in range(6)}
+    start = time.perf_counter()
+    outcomes = await join_members(lounge, members, concurrency=3)
+    elapsed = time.perf_counter() - start
+    assert all(o.action == "joined" for o in outcomes)
+    assert tracker.peak <= 3
+    assert elapsed < 0.5  # two waves of 0.1 s, not six
+
+
+@pytest.mark.asyncio
+async def test_volume_set_before_join(lounge):
+    kitchen = Speaker("Kitchen", "192.168.0.102")
+    outcomes = await join_members(lounge, {"Kitchen": kitchen}, volume=30)
+    assert kitchen.volume_writes == [30]
+    assert outcomes[0].volume_set is True
+
+
+@pytest.mark.asyncio
+async def test_volume_skipped_when_mirror_matches(lounge):
+    kitchen = Speaker("Kitchen", "192.168.0.102")
+    mirror = SimpleNamespace(rendering=lambda ip: {"volume": 30, "muted": False})
+    outcomes = await join_members(lounge, {"Kitchen": kitchen}, volume=30, mirror=mirror)
+    assert kitchen.volume_writes == []
+    assert outcomes[0].volume_set is False
+
+
+@pytest.mark.asyncio
+async def test_offline_and_failed_reported(lounge):
+    bad = Speaker("Wine", "192.168.0.114", fail=True)
+    outcomes = await join_members(lounge, {"Bar": None, "Wine": bad})
+    assert outcomes[0].action == "offline"
+    assert outcomes[1].action == "failed"
+    assert "800" in outcomes[1].error
+    report = format_assembly_report(outcomes)
+    assert "Bar: offline" in report
+    assert "Wine: failed" in report
+
+
+@pytest.mark.asyncio
+async def test_coordinator_unjoined_when_member_elsewhere(lounge):
+    topology = SimpleNamespace(get=lambda ip: SimpleNamespace(is_coordinator=False))
+    outcome = await prepare_coordinator("Lounge", lounge, topology, volume=25)
+    assert lounge.unjoined is True
+    assert lounge.volume_writes == [25]
+    assert outcome.action == "coordinator"
+
+
+@pytest.mark.asyncio
+async def test_coordinator_left_alone_when_leading(lounge):
+    topology = SimpleNamespace(get=lambda ip: SimpleNamespace(is_coordinator=True))
+    outcome = await prepare_coordinator("Lounge", lounge, topology)
+    assert lounge.unjoined is False
+    assert outcome.volume_set is False
+
+
+def great_room(monkeypatch, lounge, events):
+    """Point sonos_play_in_zone at fakes, with Lounge a member of the Bar's group."""
+    members = {n: Speaker(n, ip, events=events) for n, ip in [
+        ("Kitchen", "192.168.0.102"), ("Dining", "192.168.0.103"), ("Library", "192.168.0.100"),
+    ]}
+    topology = ZoneTopology(groups=[ZoneGroupInfo(
+        group_id="RINCON_BAR:1", coordinator="Bar", coordinator_ip="192.168.0.122",
+        members=["Bar", "Lounge"], member_ips=["192.168.0.122", "192.168.0.101"],
+    )])
+    cache = SimpleNamespace(
+        ensure_fresh=AsyncMock(),
+        get_topology=AsyncMock(return_value=topology),
+        get=members.get,
+        mirror=None,
+        topology=SimpleNamespace(invalidate=lambda: None),
+    )
+    monkeypatch.setattr(zones, "speaker_cache", cache)
+    monkeypatch.setattr(zones, "check_agent_media_gate", AsyncMock())
+    monkeypatch.setattr(zones, "_resolve_device", AsyncMock(return_value=lounge))
+    return members
+
+
+@pytest.mark.asyncio
+async def test_play_in_zone_members_join_after_coordinator_leaves_other_group(monkeypatch):
+    events = []
+    lounge = Speaker("Lounge", "192.168.0.101", delay=0.1, events=events)
+    members = great_room(monkeypatch, lounge, events)
+
+    result = await zones.sonos_play_in_zone("great_room")
+
+    assert events[0] == ("unjoin", "Lounge")
+    assert sorted(events[1:]) == [("join", "Dining"), ("join", "Kitchen"), ("join", "Library")]
+    assert all(m.joined_to is lounge for m in members.values())
+    assert "4 speakers grouped" in result
+
+
+@pytest.mark.asyncio
+async def test_play_in_zone_failed_unjoin_plays_through_group_coordinator(monkeypatch):
+    events = []
+    lounge = Speaker("Lounge", "192.168.0.101", fail=True, events=events)
+    bar = Speaker("Bar", "192.168.0.122", events=events)
+    lounge.group = SimpleNamespace(coordinator=bar)
+    great_room(monkeypatch, lounge, events)
+
+    result = await zones.sonos_play_in_zone("great_room", uri="http://radio/stream")
+
+    assert ("play", "Bar") in events
+    assert ("play", "Lounge") not in events
+    assert "playing URI" in result
+    assert "- Lounge: failed: UPnP Error 701" in result
+    assert sum(1 for e in events if e[0] == "join") == 3
+
+
+@pytest.mark.asyncio
+async def test_play_in_zone_playback_error_still_reports_members(monkeypatch):
+    events = []
+    lounge = BrokenPlayer("Lounge", "192.168.0.101", events=events)
+    great_room(monkeypatch, lounge, events)
+
+    result = await zones.sonos_play_in_zone("great_room", uri="http://radio/stream")
+
+    assert "playback failed: UPnP Error 714" in result
+    assert "4 speakers grouped" in result
+    assert sum(1 for e in events if e[0] == "join") == 3
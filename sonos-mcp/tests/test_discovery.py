@@ -0,0 +1,136 @@
+"""Test SpeakerCache discovery: concurrent fallback probes, stale-while-revalidate."""
+
+import asyncio
+import time
+import pytest
+import requests
+from sonos_mcp.config import SpeakerInfo
+from sonos_mcp.discovery import SpeakerCache
+
+pytestmark = pytest.mark.unit
+
+
+class FakeSpeaker:
+
+    behaviour = {}  # ip -> (delay, exception or None)
+
+    def __init__(self, ip, name=""):
+        self.ip_address = ip
+        self.name = name
+
+    def get_speaker_info(self, refresh=False, timeout=None):
+        delay, error = self.behaviour.get(self.ip_address, (0.0, None))
+        time.sleep(delay)
+        if error:
+            raise error
+        return {"zone_name": self.name or f"Speaker {self.ip_address}",
+                "model_name": "Sonos One", "uid": f"RINCON_{self.ip_address}"}
+
+
+def _registry(count):
+    return {
+        f"S{i}": SpeakerInfo(name=f"S{i}", ip=f"192.168.0.{100 + i}", ha_entity=f"media_player.s{i}",
+                             network_name=f"SNS-S{i}", room=f"S{i}")
+        for i in range(count)
+    }
+
+
+@pytest.fixture
+def network(monkeypatch):
+    found = []
+    monkeypatch.setattr("sonos_mcp.discovery.soco.discover", lambda timeout: set(found))
+    monkeypatch.setattr("sonos_mcp.discovery.soco.SoCo", FakeSpeaker)
+    FakeSpeaker.behaviour = {}
+    return found
+
+
+@pytest.mark.asyncio
+async def test_probes_run_concurrently(network):
+    FakeSpeaker.behaviour = {f"192.168.0.{100 + i}": (0.1, None) for i in range(10)}
+    cache = SpeakerCache()
+    start = time.perf_counter()
+    await cache.discover(_registry(10))
+    elapsed = time.perf_counter() - start
+    assert len(cache.online) == 10
+    assert elapsed < 0.5  # ten 0.1 s probes, not one after another
+    assert all(p.ok and p.latency_ms >= 90 for p in cache.last_probes)
+
+
+@pytest.mark.asyncio
+async def test_dead_speaker_reported_with_reason(network):
+    FakeSpeaker.behaviour = {
+        "192.168.0.101": (0.0, requests.exceptions.ConnectTimeout("pool timeout")),
+        "192.168.0.102": (0.0, requests.exceptions.ConnectionError("refused")),
+    }
+    cache = SpeakerCache()
+    cache.probe_timeout = 0.5
+    await cache.discover(_registry(3))
+    assert set(cache.online) == {"S0"}
+    assert cache.offline_names == ["S1", "S2"]
+    reasons = {p.name: p.error for p in cache.last_probes}
+    assert reasons["S1"] == "no answer within 0.5s"
+    assert reasons["S2"] == "connection refused or host unreachable"
+
+
+@pytest.mark.asyncio
+async def test_hung_speaker_does_not_stall_the_rest(network):
+    FakeSpeaker.behaviour = {"192.168.0.100": (0.5, None)}
+    cache = SpeakerCache()
+    cache.probe_timeout = 0.1
+    start = time.perf_counter()
+    await cache.discover(_registry(4))
+    assert time.perf_counter() - start < 0.45
+    assert cache.offline_names == ["S0"]
+    assert "timed out" in cache.last_probes[0].error
+
+
+@pytest.mark.asyncio
+async def test_unregistered_ssdp_speaker_added_by_name(network):
+    network.append(FakeSpeaker("192.168.0.200", name="Studio"))
+    cache = SpeakerCache()
+    await cache.discover(_registry(1))
+    assert set(cache.online) == {"S0", "Studio"}
+    assert [p.name for p in cache.last_probes] == ["S0"]
+
+
+class TestStaleWhileRevalidate:
+
+    @pytest.mark.asyncio
+    async def test_stale_cache_served_without_waiting(self, network, monkeypatch):
+        cache = SpeakerCache()
+        await cache.discover(_registry(2))
+        cache._last_discovery -= 3600
+        scans = []
+
+        def slow_discover(timeout):
+            scans.append(1)
+            time.sleep(0.3)
+            return set()
+
+        monkeypatch.setattr("sonos_mcp.discovery.soco.discover", slow_discover)
+        start = time.perf_counter()
+        await asyncio.gather(*(cache.ensure_fresh() for _ in range(5)))
+        assert time.perf_counter() - start < 0.1
+        assert set(cache.online) == {"S0", "S1"}
+        await cache.refresh()  # joins the in-flight scan
+        assert len(scans) == 1
+        assert not cache.is_stale
+
+    @pytest.mark.asyncio
+    async def test_cold_cache_waits_once(self, network):
+        cache = SpeakerCache()
+        cache.refresh_in_background(_registry(2))
+        await asyncio.gather(*(cache.ensure_fresh() for _ in range(3)))
+        assert set(cache.online) == {"S0", "S1"}
+
+    @pytest.mark.asyncio
+    async def test_only_changed_entries_replaced(self, network):
+        cache = SpeakerCache()
+        await cache.discover(_registry(3))
+        kept = cache.get("S0")
+        FakeSpeaker.behaviour = {"192.168.0.102": (0.0, requests.exceptions.ConnectionError())}
+        await cache.discover(_registry(3))
+        assert cache.get("S0") is kept
+        assert cache.last_changes.removed == ["S2"]
+        assert cache.last_changes.added == []
+        assert cache.get_by_ip("192.168.0.102") is None
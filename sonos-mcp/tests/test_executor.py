@@ -0,0 +1,104 @@
+"""Test the dedicated SoCo executor: per-speaker limits, call stats, labels."""
+
+import asyncio
+import threading
+import time
+import pytest
+from sonos_mcp.executor import SoCoExecutor, describe_call
+
+pytestmark = pytest.mark.unit
+
+
+class Speaker:
+
+    def __init__(self, ip, delay=0.0):
+        self.ip_address = ip
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.active = 0
+        self.peak = 0
+
+    def play(self):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(self.delay)
+        with self.lock:
+            self.active -= 1
+        return "ok"
+
+    def stop(self):
+        raise RuntimeError("UPnP Error 701")
+
+
+@pytest.fixture
+def executor():
+    ex = SoCoExecutor(workers=8, per_speaker=2)
+    yield ex
+    ex.shutdown()
+
+
+class TestDescribeCall:
+
+    def test_bound_method(self):
+        speaker = Speaker("192.168.0.101")
+        assert describe_call(speaker.play, ()) == ("192.168.0.101", "play")
+
+    def test_setattr(self):
+        speaker = Speaker("192.168.0.101")
+        assert describe_call(setattr, (speaker, "volume", 30)) == ("192.168.0.101", "set volume")
+
+    def test_lambda_closure(self):
+        speaker = Speaker("192.168.0.102")
+        assert describe_call(lambda: speaker.group.coordinator, ()) == (
+            "192.168.0.102", "group.coordinator",
+        )
+
+    def test_no_speaker(self):
+        assert describe_call(len, ([1],)) == (None, "len")
+
+
+class TestSoCoExecutor:
+
+    @pytest.mark.asyncio
+    async def test_per_speaker_limit(self, executor):
+        speaker = Speaker("192.168.0.101", delay=0.05)
+        other = Speaker("192.168.0.102", delay=0.05)
+        await asyncio.gather(*(executor.run(speaker.play) for _ in range(6)),
+                             *(executor.run(other.play) for _ in range(2)))
+        assert speaker.peak == 2
+        assert other.peak == 2
+
+    @pytest.mark.asyncio
+    async def test_stats_recorded(self, executor):
+        speaker = Speaker("192.168.0.101")
+        assert await executor.run(speaker.play) == "ok"
+        with pytest.raises(RuntimeError):
+            await executor.run(speaker.stop)
+        report = executor.stats.report()
+        rows = {r["method"]: r for r in report["by_call"]}
+        assert rows["play"]["calls"] == 1
+        assert rows["stop"]["errors"] == 1
+        assert "701" in rows["stop"]["last_error"]
+        assert report["in_flight"] == 0
+        assert report["queued"] == 0
+
+    @pytest.mark.asyncio
+    async def test_timed_out_call_holds_slot_until_thread_finishes(self, executor):
+        speaker = Speaker("192.168.0.101", delay=0.2)
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.gather(*(
+                asyncio.wait_for(executor.run(speaker.play), timeout=0.05) for _ in range(2)
+            ))
+        # Both threads are still running, so a third call waits for a slot
+        await executor.run(speaker.play)
+        assert speaker.peak == 2
+        report = executor.stats.report()
+        assert report["by_call"][0]["calls"] == 3
+        assert report["in_flight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_reset(self, executor):
+        await executor.run(Speaker("192.168.0.101").play)
+        executor.stats.reset()
+        assert executor.stats.report()["calls"] == 0
@@ -78,6 +78,10 @@ class TestFormatTrackInfo:
         assert result["title"] == ""
         assert result["artist"] == ""
 
+    def test_position_only_when_known(self):
+        assert format_track_info({"position": "0:01:00"})["position"] == "0:01:00"
+        assert "position" not in format_track_info({"title": "Song"})
+
 
 class TestFormatSpeakerState:
 
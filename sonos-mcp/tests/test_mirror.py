@@ -0,0 +1,254 @@
+"""Test the UPnP event mirror against a local fake event emitter."""
+
+import asyncio
+import time
+import pytest
+from types import SimpleNamespace
+from sonos_mcp.helpers import format_speaker_state
+from sonos_mcp.mirror import StateMirror
+
+pytestmark = pytest.mark.unit
+
+
+class FakeSubscription:
+
+    def __init__(self, emitter, device, service, timeout, sink):
+        self.emitter = emitter
+        self.device = device
+        self.service = service
+        self.timeout = timeout
+        self.sink = sink
+        self.renewals = 0
+        self.active = True
+
+    def renew(self, requested_timeout=None):
+        if self.emitter.refuse_renewals:
+            raise RuntimeError("412 Precondition Failed")
+        self.renewals += 1
+
+    def unsubscribe(self):
+        self.active = False
+
+
+class FakeEmitter:
+    """Stands in for SoCo's event listener: records subscriptions, emits events.
+
+    Like SoCo, the initial event is delivered through the sink before the
+    subscription object is returned to the caller.
+    """
+
+    def __init__(self, timeout=600, initial=True):
+        self.timeout = timeout
+        self.initial = initial
+        self.subs = []
+        self.fail_ips = set()
+        self.refuse_renewals = False
+
+    def __call__(self, device, service, timeout, sink):
+        if device.ip_address in self.fail_ips:
+            raise OSError("connection refused")
+        sub = FakeSubscription(self, device, service, self.timeout, sink)
+        self.subs.append(sub)
+        if self.initial:
+            sink.put(SimpleNamespace(variables=self.initial_vars(service)))
+        return sub
+
+    @staticmethod
+    def initial_vars(service):
+        if service == "AVTransport":
+            return {
+                "transport_state": "PLAYING",
+                "current_track_uri": "x-sonos-spotify:track",
+                "current_track_duration": "0:03:00",
+                "current_track_meta_data": SimpleNamespace(
+                    title="Song", creator="Band", album="Album", album_art_uri="/getaa?x"),
+            }
+        if service == "RenderingControl":
+            return {"volume": {"Master": "25"}, "mute": {"Master": "0"}}
+        return {"zone_group_state": "<ZoneGroupState/>"}
+
+    def emit(self, ip, service, variables):
+        for sub in self.subs:
+            if sub.active and sub.device.ip_address == ip and sub.service == service:
+                sub.sink.put(SimpleNamespace(variables=variables))
+
+
+class Device:
+
+    def __init__(self, name, ip):
+        self.player_name = name
+        self.ip_address = ip
+        self.polled = 0
+
+    @property
+    def all_groups(self):
+        return [SimpleNamespace(coordinator=self, members=[self])]
+
+    def get_speaker_info(self, refresh=False, timeout=None):
+        return {"zone_name": self.player_name, "model_name": "Sonos One", "uid": "RINCON_X"}
+
+    def get_current_transport_info(self):
+        self.polled += 1
+        return {"current_transport_state": "STOPPED"}
+
+    def get_current_track_info(self):
+        self.polled += 1
+        return {"title": "Polled"}
+
+    @property
+    def volume(self):
+        self.polled += 1
+        return 10
+
+    @property
+    def mute(self):
+        self.polled += 1
+        return True
+
+
+@pytest.fixture
+def lounge():
+    return Device("Lounge", "192.168.0.101")
+
+
+@pytest.mark.asyncio
+async def test_subscribes_every_service(lounge):
+    emitter = FakeEmitter(initial=False)
+    mirror = StateMirror(subscribe=emitter)
+    await mirror.sync({"Lounge": lounge})
+    services = sorted(s.service for s in emitter.subs)
+    assert services == ["AVTransport", "RenderingControl", "ZoneGroupTopology"]
+
+
+@pytest.mark.asyncio
+async def test_initial_events_populate_model(lounge):
+    emitter = FakeEmitter(initial=True)
+    mirror = StateMirror(subscribe=emitter)
+    await mirror.sync({"Lounge": lounge})
+    assert mirror.rendering(lounge.ip_address) == {"volume": 25, "muted": False}
+    transport = mirror.transport(lounge.ip_address)
+    assert transport["state"] == "PLAYING"
+    assert transport["track"]["title"] == "Song"
+    assert transport["track"]["album_art_uri"].startswith("http://192.168.0.101:1400/")
+    assert mirror.topology.get(lounge.ip_address).coordinator == "Lounge"
+
+
+@pytest.mark.asyncio
+async def test_event_updates_state(lounge):
+    emitter = FakeEmitter(initial=True)
+    mirror = StateMirror(subscribe=emitter)
+    await mirror.sync({"Lounge": lounge})
+    emitter.emit(lounge.ip_address, "RenderingControl", {"volume": {"Master": "40"}})
+    assert mirror.rendering(lounge.ip_address)["volume"] == 40
+    emitter.emit(lounge.ip_address, "AVTransport", {"transport_state": "PAUSED_PLAYBACK"})
+    assert mirror.transport(lounge.ip_address)["state"] == "PAUSED_PLAYBACK"
+    assert mirror.transport(lounge.ip_address)["track"]["title"] == "Song"
+
+
+@pytest.mark.asyncio
+async def test_no_event_means_not_live(lounge):
+    emitter = FakeEmitter(initial=False)
+    mirror = StateMirror(subscribe=emitter)
+    await mirror.sync({"Lounge": lounge})
+    assert mirror.rendering(lounge.ip_address) is None
+    assert mirror.transport(lounge.ip_address) is None
+    assert mirror.topology is None
+
+
+@pytest.mark.asyncio
+async def test_expired_subscription_falls_back(lounge):
+    emitter = FakeEmitter(initial=True, timeout=0.05)
+    mirror = StateMirror(subscribe=emitter, renew_margin=0)
+    await mirror.sync({"Lounge": lounge})
+    assert mirror.rendering(lounge.ip_address) is not None
+    time.sleep(0.08)
+    assert mirror.rendering(lounge.ip_address) is None
+
+    state = format_speaker_state(lounge, mirror=mirror)
+    assert state["volume"] == 10
+    assert state["state"] == "STOPPED"
+    assert lounge.polled == 4
+
+
+@pytest.mark.asyncio
+async def test_live_mirror_avoids_polling(lounge):
+    emitter = FakeEmitter(initial=True)
+    mirror = StateMirror(subscribe=emitter)
+    await mirror.sync({"Lounge": lounge})
+    state = format_speaker_state(lounge, topology=mirror.topology, mirror=mirror)
+    assert lounge.polled == 0
+    assert state["volume"] == 25
+    assert state["track"]["title"] == "Song"
+    assert "position" not in state["track"]
+
+
+@pytest.mark.asyncio
+async def test_live_now_playing_has_no_fabricated_position(lounge, monkeypatch):
+    from sonos_mcp.tools import villa
+    emitter = FakeEmitter(initial=True)
+    mirror = StateMirror(subscribe=emitter)
+    await mirror.sync({"Lounge": lounge})
+    monkeypatch.setattr(villa, "speaker_cache", SimpleNamespace(mirror=mirror))
+    playing = villa._now_playing(lounge)
+    assert lounge.polled == 0
+    assert playing["state"] == "PLAYING"
+    assert playing["title"] == "Song"
+    assert "position" not in playing
+
+
+@pytest.mark.asyncio
+async def test_renews_before_expiry(lounge):
+    emitter = FakeEmitter(initial=True, timeout=60)
+    mirror = StateMirror(subscribe=emitter, renew_margin=120)
+    await mirror.sync({"Lounge": lounge})
+    await mirror.sync({"Lounge": lounge})
+    assert all(s.renewals == 1 for s in emitter.subs)
+
+
+@pytest.mark.asyncio
+async def test_refused_renewal_resubscribes(lounge):
+    emitter = FakeEmitter(initial=True, timeout=60)
+    mirror = StateMirror(subscribe=emitter, renew_margin=120)
+    await mirror.sync({"Lounge": lounge})
+    emitter.refuse_renewals = True
+    await mirror.sync({"Lounge": lounge})
+    assert len(emitter.subs) == 6
+    assert sum(1 for s in emitter.subs if s.active) == 3
+    assert mirror.rendering(lounge.ip_address) is not None
+
+
+@pytest.mark.asyncio
+async def test_failed_subscribe_backs_off(lounge):
+    emitter = FakeEmitter(initial=True)
+    emitter.fail_ips.add(lounge.ip_address)
+    mirror = StateMirror(subscribe=emitter, retry_backoff=60)
+    await mirror.sync({"Lounge": lounge})
+    emitter.fail_ips.clear()
+    await mirror.sync({"Lounge": lounge})
+    assert emitter.subs == []
+    assert mirror.stats()["failures"]
+
+
+@pytest.mark.asyncio
+async def test_removed_speaker_unsubscribed(lounge):
+    emitter = FakeEmitter(initial=True)
+    mirror = StateMirror(subscribe=emitter)
+    await mirror.sync({"Lounge": lounge})
+    await mirror.sync({})
+    assert not any(s.active for s in emitter.subs)
+    assert mirror.rendering(lounge.ip_address) is None
+
+
+@pytest.mark.asyncio
+async def test_stop_unsubscribes_all(lounge):
+    emitter = FakeEmitter(initial=True)
+    mirror = StateMirror(subscribe=emitter)
+    mirror.start(lambda: {"Lounge": lounge}, interval=0.01)
+    for _ in range(50):
+        if len(emitter.subs) == 3:
+            break
+        await asyncio.sleep(0.01)
+    assert mirror.stats()["running"] is True
+    await mirror.stop()
+    assert not any(s.active for s in emitter.subs)
+    assert mirror.stats()["running"] is False
@@ -0,0 +1,98 @@
+"""Test the persisted discovery result and SpeakerCache restore."""
+
+import json
+import pytest
+from unittest.mock import MagicMock
+from sonos_mcp.config import SpeakerInfo
+from sonos_mcp.discovery import SpeakerCache
+from sonos_mcp.registry_cache import (
+    CachedSpeaker, RegistryCache, load_registry_cache, save_registry_cache,
+)
+from sonos_mcp.state import cached_record
+
+pytestmark = pytest.mark.unit
+
+
+def _cache():
+    return RegistryCache(
+        saved_at=1000.0,
+        household_id="Sonos_HH1",
+        speakers=[
+            CachedSpeaker(name="Lounge", ip="192.168.0.101", uid="RINCON_A",
+                          player_name="Lounge", model_name="Sonos Arc"),
+            CachedSpeaker(name="Kitchen", ip="192.168.0.102"),
+        ],
+        offline=["Garage"],
+    )
+
+
+def _device(ip, name, model="Sonos One"):
+    device = MagicMock()
+    device.ip_address = ip
+    device.household_id = "Sonos_HH1"
+    device.get_speaker_info.return_value = {
+        "zone_name": name, "model_name": model, "uid": f"RINCON_{name.upper()}",
+    }
+    return device
+
+
+class TestRegistryCacheFile:
+
+    def test_round_trip(self, tmp_path):
+        path = str(tmp_path / "nested" / "registry.json")
+        save_registry_cache(path, _cache())
+        loaded = load_registry_cache(path)
+        assert loaded == _cache()
+
+    def test_missing_or_corrupt(self, tmp_path):
+        path = tmp_path / "registry.json"
+        assert load_registry_cache(str(path)) is None
+        path.write_text("{not json")
+        assert load_registry_cache(str(path)) is None
+
+    def test_other_version_ignored(self, tmp_path):
+        path = tmp_path / "registry.json"
+        path.write_text(json.dumps({**_cache().model_dump(), "version": 99}))
+        assert load_registry_cache(str(path)) is None
+
+
+class TestSpeakerCacheRestore:
+
+    def test_restore_without_network(self, tmp_path):
+        path = str(tmp_path / "registry.json")
+        save_registry_cache(path, _cache())
+        cache = SpeakerCache(cache_path=path)
+        assert cache.restore() is True
+        assert set(cache.online) == {"Lounge", "Kitchen"}
+        assert cache.get_by_ip("192.168.0.101") is cache.get("Lounge")
+        assert cache.offline_names == ["Garage"]
+        assert cache.household_id == "Sonos_HH1"
+        assert cached_record("192.168.0.101").model_name == "Sonos Arc"
+        assert cached_record("192.168.0.102") is None  # nothing known, fetched on use
+        assert not cache.is_stale
+
+    def test_restore_nothing(self, tmp_path):
+        cache = SpeakerCache(cache_path=str(tmp_path / "registry.json"))
+        assert cache.restore() is False
+        assert SpeakerCache().restore() is False
+
+    @pytest.mark.asyncio
+    async def test_discover_persists(self, tmp_path, monkeypatch):
+        path = str(tmp_path / "registry.json")
+        found = [_device("192.168.0.101", "Lounge", "Sonos Arc"), _device("192.168.0.102", "Kitchen")]
+        monkeypatch.setattr("sonos_mcp.discovery.soco.discover", lambda timeout: set(found))
+        registry = {
+            "Lounge": SpeakerInfo(name="Lounge", ip="192.168.0.101", ha_entity="media_player.lounge",
+                              network_name="Lounge", room="Lounge"),
+            "Kitchen": SpeakerInfo(name="Kitchen", ip="192.168.0.102", ha_entity="media_player.kitchen",
+                               network_name="Kitchen", room="Kitchen"),
+        }
+        cache = SpeakerCache(cache_path=path)
+        await cache.discover(registry)
+
+        saved = load_registry_cache(path)
+        by_name = {s.name: s for s in saved.speakers}
+        assert by_name["Lounge"].model_name == "Sonos Arc"
+        assert by_name["Kitchen"].uid == "RINCON_KITCHEN"
+        assert saved.household_id == "Sonos_HH1"
+        assert saved.offline == []
@@ -1,6 +1,8 @@
 """Test fuzzy speaker and zone name resolution."""
 
+import time
 import pytest
+from sonos_mcp.config import SpeakerInfo
 from sonos_mcp.resolver import SpeakerResolver
 
 pytestmark = pytest.mark.unit
@@ -107,3 +109,32 @@ class TestEdgeCases:
     def test_very_long_input(self, resolver):
         r = resolver.resolve("a" * 500)
         assert isinstance(r.resolved, bool)
+
+
+class TestIndex:
+
+    def test_cached_result_is_a_copy(self, resolver):
+        first = resolver.resolve("cucina")
+        first.speaker_name = "Mutated"
+        assert resolver.resolve("  Cucina ").speaker_name == "Kitchen"
+
+    def test_lru_evicts_oldest(self):
+        resolver = SpeakerResolver(cache_size=2)
+        for utterance in ("lounge", "kitchen", "libary"):
+            resolver.resolve(utterance)
+        assert list(resolver._cache) == ["kitchen", "libary"]
+
+    def test_large_registry(self):
+        speakers = {
+            f"Room {i}": SpeakerInfo(name=f"Room {i}", ip=f"10.0.{i // 250}.{i % 250}",
+                                     ha_entity=f"media_player.room_{i}", network_name=f"SNS-R{i}",
+                                     room=f"Suite {i}", aliases=[f"camera {i}"])
+            for i in range(500)
+        }
+        resolver = SpeakerResolver(speakers=speakers, zones={}, cache_size=0)
+        assert resolver.resolve("camera 321").speaker_name == "Room 321"
+        assert resolver.resolve("sutie 42").speaker_name == "Room 42"
+        start = time.perf_counter()
+        for i in range(200):
+            resolver.resolve(f"rom {i}")
+        assert (time.perf_counter() - start) / 200 < 0.005
@@ -0,0 +1,121 @@
+"""Test parallel speaker snapshots: concurrency bound, deadlines, partial results."""
+
+import threading
+import time
+import pytest
+from sonos_mcp.snapshot import snapshot_speakers, snapshot_summary
+
+pytestmark = pytest.mark.unit
+
+
+class FakeDevice:
+
+    def __init__(self, name, delay=0.0, fail=False):
+        self.name = name
+        self.delay = delay
+        self.fail = fail
+
+
+class Tracker:
+    """Collector that records peak concurrency."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.active = 0
+        self.peak = 0
+
+    def __call__(self, device):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            time.sleep(device.delay)
+            if device.fail:
+                raise RuntimeError("UPnP error 701")
+            return {"name": device.name, "state": "PLAYING"}
+        finally:
+            with self.lock:
+                self.active -= 1
+
+
+@pytest.mark.asyncio
+async def test_runs_speakers_concurrently():
+    devices = {f"S{i}": FakeDevice(f"S{i}", delay=0.1) for i in range(8)}
+    start = time.perf_counter()
+    snap = await snapshot_speakers(devices, Tracker(), concurrency=8, deadline=2.0)
+    assert time.perf_counter() - start < 0.5
+    assert all(s.ok for s in snap.speakers)
+
+
+@pytest.mark.asyncio
+async def test_concurrency_is_bounded():
+    tracker = Tracker()
+    devices = {f"S{i}": FakeDevice(f"S{i}", delay=0.05) for i in range(10)}
+    await snapshot_speakers(devices, tracker, concurrency=3, deadline=2.0)
+    assert tracker.peak <= 3
+
+
+@pytest.mark.asyncio
+async def test_preserves_order():
+    devices = {n: FakeDevice(n, delay=d) for n, d in [("A", 0.08), ("B", 0.0), ("C", 0.04)]}
+    snap = await snapshot_speakers(devices, Tracker(), deadline=2.0)
+    assert [s.name for s in snap.speakers] == ["A", "B", "C"]
+
+
+@pytest.mark.asyncio
+async def test_slow_speaker_times_out_without_blocking_others():
+    devices = {
+        "Fast": FakeDevice("Fast"),
+        "Slow": FakeDevice("Slow", delay=1.0),
+    }
+    start = time.perf_counter()
+    snap = await snapshot_speakers(devices, Tracker(), deadline=0.2)
+    assert time.perf_counter() - start < 0.8
+    fast, slow = snap.speakers
+    assert fast.ok and fast.data["state"] == "PLAYING"
+    assert not slow.ok
+    assert "timed out" in slow.error
+    assert snap.failed == ["Slow"]
+
+
+@pytest.mark.asyncio
+async def test_collector_error_is_partial_result():
+    devices = {"Good": FakeDevice("Good"), "Bad": FakeDevice("Bad", fail=True)}
+    snap = await snapshot_speakers(devices, Tracker(), deadline=1.0)
+    good, bad = snap.speakers
+    assert good.ok
+    assert not bad.ok
+    assert "701" in bad.error
+
+
+@pytest.mark.asyncio
+async def test_collector_reported_error_is_a_failure():
+    def collect(device):
+        if device.fail:
+            return {"name": device.name, "error": "UPnP error 701"}
+        return {"name": device.name, "state": "PLAYING"}
+
+    devices = {"Good": FakeDevice("Good"), "Bad": FakeDevice("Bad", fail=True)}
+    snap = await snapshot_speakers(devices, collect, deadline=1.0)
+    good, bad = snap.speakers
+    assert good.ok
+    assert not bad.ok
+    assert bad.error == "UPnP error 701"
+    assert snap.failed == ["Bad"]
+    assert "no response from Bad" in snapshot_summary(snap)
+
+
+@pytest.mark.asyncio
+async def test_latency_reported():
+    devices = {"A": FakeDevice("A", delay=0.05)}
+    snap = await snapshot_speakers(devices, Tracker(), deadline=1.0)
+    assert snap.speakers[0].latency_ms >= 40
+    assert snap.slowest.name == "A"
+    assert "A" in snapshot_summary(snap)
+
+
+@pytest.mark.asyncio
+async def test_empty_devices():
+    snap = await snapshot_speakers({}, Tracker())
+    assert snap.speakers == []
+    assert snap.slowest is None
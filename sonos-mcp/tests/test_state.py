@@ -0,0 +1,111 @@
+"""Test batched state collection: cached device records and shared topology."""
+
+import pytest
+from sonos_mcp.helpers import format_speaker_state
+from sonos_mcp.state import device_record
+from sonos_mcp.topology import read_topology
+
+pytestmark = pytest.mark.unit
+
+
+class CountingDevice:
+    """Minimal SoCo stand-in that counts network-backed calls."""
+
+    def __init__(self, name, ip, household):
+        self.player_name = name
+        self.ip_address = ip
+        self._household = household
+        self.calls = {}
+
+    def _hit(self, key):
+        self.calls[key] = self.calls.get(key, 0) + 1
+
+    def get_speaker_info(self, refresh=False, timeout=None):
+        self._hit("speaker_info")
+        return {"zone_name": self.player_name, "model_name": "Sonos Five", "uid": f"RINCON_{self.ip_address}"}
+
+    @property
+    def all_groups(self):
+        self._hit("topology")
+        return self._household.groups
+
+    @property
+    def volume(self):
+        self._hit("volume")
+        return 20
+
+    @property
+    def mute(self):
+        self._hit("mute")
+        return False
+
+    def get_current_transport_info(self):
+        self._hit("transport")
+        return {"current_transport_state": "PLAYING"}
+
+    def get_current_track_info(self):
+        self._hit("track")
+        return {"title": "Song", "artist": "Band"}
+
+
+class Group:
+
+    def __init__(self, coordinator, members):
+        self.coordinator = coordinator
+        self.members = members
+
+
+class Household:
+
+    def __init__(self):
+        self.groups = set()
+
+
+@pytest.fixture
+def house():
+    h = Household()
+    lounge = CountingDevice("Lounge", "192.168.0.101", h)
+    kitchen = CountingDevice("Kitchen", "192.168.0.102", h)
+    garage = CountingDevice("Garage", "192.168.0.113", h)
+    h.groups = {Group(lounge, [lounge, kitchen]), Group(garage, [garage])}
+    return lounge, kitchen, garage
+
+
+class TestDeviceRecord:
+
+    def test_fetched_once(self, house):
+        lounge, _, _ = house
+        first = device_record(lounge)
+        second = device_record(lounge)
+        assert first is second
+        assert first.player_name == "Lounge"
+        assert first.model_name == "Sonos Five"
+        assert lounge.calls["speaker_info"] == 1
+
+    def test_refresh_refetches(self, house):
+        lounge, _, _ = house
+        device_record(lounge)
+        device_record(lounge, refresh=True)
+        assert lounge.calls["speaker_info"] == 2
+
+
+class TestBatchedState:
+
+    def test_shared_topology_read_once(self, house):
+        lounge, kitchen, garage = house
+        topo = read_topology(lounge)
+        states = [format_speaker_state(d, topology=topo) for d in house]
+        assert sum(d.calls.get("topology", 0) for d in house) == 1
+        assert states[1]["group_coordinator"] == "Lounge"
+        assert states[1]["is_coordinator"] is False
+        assert states[2]["group_members"] == ["Garage"]
+
+    def test_per_speaker_round_trips(self, house):
+        lounge, _, _ = house
+        topo = read_topology(lounge)
+        device_record(lounge)
+        lounge.calls.clear()
+        state = format_speaker_state(lounge, topology=topo)
+        assert state["name"] == "Lounge"
+        assert state["model"] == "Sonos Five"
+        assert sum(lounge.calls.values()) == 4  # transport, track, volume, mute
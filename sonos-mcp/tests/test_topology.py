@@ -0,0 +1,130 @@
+"""Test the zone-topology index and its cache."""
+
+import asyncio
+import pytest
+from types import SimpleNamespace
+from sonos_mcp.topology import TopologyCache, read_topology, shared_topology
+
+pytestmark = pytest.mark.unit
+
+
+class Speaker:
+
+    def __init__(self, name, ip):
+        self.player_name = name
+        self.ip_address = ip
+
+
+class Household:
+    """Fake ZoneGroupTopology source that counts reads."""
+
+    def __init__(self):
+        self.lounge = Speaker("Lounge", "192.168.0.101")
+        self.kitchen = Speaker("Kitchen", "192.168.0.102")
+        self.garage = Speaker("Garage", "192.168.0.113")
+        self.reads = 0
+        self.groups = [
+            SimpleNamespace(uid="RINCON_A:12", coordinator=self.lounge,
+                            members=[self.lounge, self.kitchen]),
+            SimpleNamespace(uid="RINCON_B:3", coordinator=self.garage, members=[self.garage]),
+        ]
+
+    def device(self, speaker):
+        household = self
+
+        class Device:
+            ip_address = speaker.ip_address
+            player_name = speaker.player_name
+
+            @property
+            def all_groups(self):
+                household.reads += 1
+                return household.groups
+
+        return Device()
+
+
+@pytest.fixture
+def house():
+    return Household()
+
+
+class TestZoneTopology:
+
+    def test_groups_indexed(self, house):
+        topo = read_topology(house.device(house.lounge))
+        assert [g.coordinator for g in topo.groups] == ["Garage", "Lounge"]
+        assert topo.members_of("Lounge") == ["Kitchen", "Lounge"]
+        assert topo.group_named("Kitchen").group_id == "RINCON_A:12"
+        assert topo.group_by_id("RINCON_B:3").coordinator == "Garage"
+        assert topo.group_of("192.168.0.102").coordinator_ip == "192.168.0.101"
+
+    def test_membership(self, house):
+        topo = read_topology(house.device(house.lounge))
+        kitchen = topo.get("192.168.0.102")
+        assert kitchen.coordinator == "Lounge"
+        assert kitchen.is_coordinator is False
+        assert topo.get("192.168.0.101").is_coordinator is True
+        assert topo.get("10.0.0.1") is None
+
+    def test_all_grouped_under(self, house):
+        topo = read_topology(house.device(house.lounge))
+        assert topo.all_grouped_under("192.168.0.101", ["192.168.0.101", "192.168.0.102"])
+        assert not topo.all_grouped_under("192.168.0.101", ["192.168.0.113"])
+        # Kitchen is a member, not the coordinator
+        assert not topo.all_grouped_under("192.168.0.102", ["192.168.0.102"])
+
+    def test_shared_topology_skips_failing_device(self, house):
+
+        class Dead:
+            @property
+            def all_groups(self):
+                raise OSError("unreachable")
+
+        topo = shared_topology([Dead(), house.device(house.lounge)])
+        assert len(topo.groups) == 2
+
+    def test_shared_topology_none_when_all_fail(self):
+        assert shared_topology([]) is None
+
+
+class TestTopologyCache:
+
+    @pytest.mark.asyncio
+    async def test_reads_once_within_ttl(self, house):
+        devices = {"Lounge": house.device(house.lounge)}
+        cache = TopologyCache(ttl=60)
+        await cache.get(lambda: devices)
+        await cache.get(lambda: devices)
+        assert house.reads == 1
+
+    @pytest.mark.asyncio
+    async def test_concurrent_callers_share_one_read(self, house):
+        devices = {"Lounge": house.device(house.lounge)}
+        cache = TopologyCache(ttl=60)
+        results = await asyncio.gather(*(cache.get(lambda: devices) for _ in range(5)))
+        assert house.reads == 1
+        assert all(r is results[0] for r in results)
+
+    @pytest.mark.asyncio
+    async def test_invalidate_forces_reread(self, house):
+        devices = {"Lounge": house.device(house.lounge)}
+        cache = TopologyCache(ttl=60)
+        await cache.get(lambda: devices)
+        cache.invalidate()
+        await cache.get(lambda: devices)
+        assert house.reads == 2
+
+    @pytest.mark.asyncio
+    async def test_prefers_live_event_mirror(self, house):
+        evented = read_topology(house.device(house.lounge))
+        reads_before = house.reads
+        cache = TopologyCache(mirror=SimpleNamespace(topology=evented), ttl=60)
+        result = await cache.get(lambda: {"Lounge": house.device(house.lounge)})
+        assert result is evented
+        assert house.reads == reads_before
+
+    @pytest.mark.asyncio
+    async def test_unreachable_household_returns_none(self):
+        cache = TopologyCache(ttl=60)
+        assert await cache.get(lambda: {}) is None
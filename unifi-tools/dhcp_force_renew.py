@@ -9,7 +9,10 @@ Enterprise Fortress Gateway via REST API.
 Features:
   - 2FA email authentication
   - CSRF token handling (auto-refreshed)
-  - Create/update fixed IP reservations
+  - Keep-alive connection pool shared by all API calls, with reuse and
+    latency stats printed at the end of a run
+  - Create/update fixed IP reservations (diffed first, applied in parallel
+    with adaptive backoff on 429/5xx)
   - PoE power-cycle for PoE-powered devices (touch panels, etc.)
   - Gateway force-provision to clear DHCP lease table
   - Verification with ping checks
@@ -27,6 +30,9 @@ Usage:
   # Set reservations without forcing renewal
   python3 dhcp_force_renew.py --reserve-only
 
+  # Show which reservations would be created/updated, change nothing
+  python3 dhcp_force_renew.py --plan
+
   # Force-provision gateway + PoE cycle (no reservation changes)
   python3 dhcp_force_renew.py --renew-only
 
@@ -44,6 +50,8 @@ Requirements:
 import os
 import urllib.request
 import urllib.error
+import urllib.parse
+import http.client
 import http.cookiejar
 import json
 import ssl
@@ -51,6 +59,9 @@ import sys
 import time
 import subprocess
 import argparse
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 
 # ============================================================
@@ -80,6 +91,18 @@ TEMP_LEASE_TIME = 120
 # Original lease time to restore (seconds)
 NORMAL_LEASE_TIME = 86400
 
+# Keep-alive connections to the gateway, shared by all API calls
+HTTP_POOL_SIZE = 8  # idle connections kept (at least RESERVATION_WORKERS)
+HTTP_IDLE_TIMEOUT = 30  # seconds before an idle connection is dropped
+HTTP_TIMEOUT = 30
+HTTP_LATENCY_SAMPLES = 1024  # recent call latencies kept for the stats report
+
+# Reservation sync: parallel writes, paced adaptively (backs off on 429/5xx)
+RESERVATION_WORKERS = 4
+RESERVATION_MAX_ATTEMPTS = 5
+RESERVATION_BACKOFF_MIN = 0.25  # seconds between writes after the first throttle
+RESERVATION_BACKOFF_MAX = 8.0
+
 # SSH credentials for UniFi switches (from Site settings > Device SSH)
 SW_SSH_USER = os.environ.get("UNIFI_SSH_USER", "")
 SW_SSH_PASS = os.environ.get("UNIFI_SSH_PASS", "")
@@ -264,6 +287,149 @@ EXPECTED = {mac.lower(): (name, ip) for name, mac, ip in ALL_RESERVATIONS}
 # UniFi API Client
 # ============================================================
 
+class ConnectionPool:
+    """
+    Thread-safe pool of keep-alive connections to one host (stdlib only).
+
+    Each call borrows an idle connection (or opens one), sends the request,
+    reads the whole response and hands the connection back unless the
+    server asked to close it. A reused connection that turns out to have
+    been closed by the gateway is replaced and the request resent once, but
+    only if it failed while sending or the method is idempotent: a POST
+    whose response was lost may already have been applied, so that error is
+    raised for the caller to check.
+    """
+
+    # Errors meaning a kept-alive connection went away before answering
+    STALE_ERRORS = (http.client.RemoteDisconnected, http.client.BadStatusLine,
+                    ConnectionResetError, BrokenPipeError)
+    # Methods safe to send again after the request may have reached the server
+    IDEMPOTENT = ("GET", "HEAD", "PUT", "DELETE", "OPTIONS")
+
+    def __init__(self, base_url, ctx=None, size=HTTP_POOL_SIZE,
+                 idle_timeout=HTTP_IDLE_TIMEOUT, timeout=HTTP_TIMEOUT):
+        parts = urllib.parse.urlsplit(base_url)
+        self.scheme = parts.scheme
+        self.host = parts.hostname
+        self.port = parts.port
+        self.ctx = ctx
+        self.size = size
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self._idle = []  # (connection, returned_at), most recent last
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.opened = 0
+        self.reused = 0
+        self.stale = 0
+        self.latencies = deque(maxlen=HTTP_LATENCY_SAMPLES)  # (method, ms)
+
+    def _connect(self):
+        if self.scheme == "https":
+            conn = http.client.HTTPSConnection(self.host, self.port, timeout=self.timeout, context=self.ctx)
+        else:
+            conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        with self._lock:
+            self.opened += 1
+        return conn
+
+    def _acquire(self):
+        """An idle connection (reused=True) or a new one."""
+        now = time.monotonic()
+        expired = []
+        conn = None
+        with self._lock:
+            while self._idle:
+                candidate, returned_at = self._idle.pop()
+                if now - returned_at < self.idle_timeout:
+                    conn = candidate
+                    self.reused += 1
+                    break
+                expired.append(candidate)
+        for old in expired:
+            old.close()
+        if conn:
+            return conn, True
+        return self._connect(), False
+
+    def _release(self, conn):
+        with self._lock:
+            if len(self._idle) < self.size:
+                self._idle.append((conn, time.monotonic()))
+                return
+        conn.close()
+
+    def request(self, method, path, body=None, headers=None):
+        """Send one request; returns (status, response headers, body bytes)."""
+        start = time.perf_counter()
+        with self._lock:
+            self.requests += 1
+        conn, reused = self._acquire()
+        sent = False
+        try:
+            try:
+                conn.request(method, path, body=body, headers=headers or {})
+                sent = True
+                resp = conn.getresponse()
+            except self.STALE_ERRORS:
+                if not reused or (sent and method not in self.IDEMPOTENT):
+                    raise
+                # The gateway closed it while idle: once more on a fresh one
+                conn.close()
+                with self._lock:
+                    self.stale += 1
+                conn = self._connect()
+                conn.request(method, path, body=body, headers=headers or {})
+                resp = conn.getresponse()
+            data = resp.read()
+        except Exception:
+            conn.close()
+            raise
+        if resp.will_close:
+            conn.close()
+        else:
+            self._release(conn)
+        with self._lock:
+            self.latencies.append((method, (time.perf_counter() - start) * 1000))
+        return resp.status, resp.headers, data
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn, _ in idle:
+            conn.close()
+
+    def stats(self):
+        """Request, connection and latency counters since the pool was made."""
+        with self._lock:
+            samples = list(self.latencies)
+            report = {
+                "requests": self.requests,
+                "connections_opened": self.opened,
+                "connections_reused": self.reused,
+                "stale_reconnects": self.stale,
+                "idle": len(self._idle),
+            }
+        by_method = {}
+        for method, ms in samples:
+            by_method.setdefault(method, []).append(ms)
+        report["latency_ms"] = {
+            method: {
+                "count": len(values),
+                "p50": round(_percentile(values, 50), 1),
+                "p95": round(_percentile(values, 95), 1),
+                "max": round(max(values), 1),
+            }
+            for method, values in sorted(by_method.items())
+        }
+        return report
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
 class UniFiAPI:
     """Handles UniFi OS authentication and API calls."""
 
@@ -274,6 +440,7 @@ class UniFiAPI:
         self.token: Optional[str] = None
         self.csrf: Optional[str] = None
         self.base = f"{BASE_URL}/proxy/network/api/s/{SITE}"
+        self.pool = ConnectionPool(BASE_URL, self.ctx)
 
     def _request(self, method, url, data=None):
         headers = {
@@ -286,20 +453,29 @@ class UniFiAPI:
             headers["X-Csrf-Token"] = self.csrf
 
         body = json.dumps(data).encode() if data else None
-        req = urllib.request.Request(url, data=body, method=method, headers=headers)
-
+        parts = urllib.parse.urlsplit(url)
+        path = parts.path + (f"?{parts.query}" if parts.query else "")
+
+        status, resp_headers, raw = self.pool.request(method, path, body, headers)
+        new_csrf = resp_headers.get("X-Csrf-Token")
+        if new_csrf:
+            self.csrf = new_csrf
+        text = raw.decode()
         try:
-            resp = urllib.request.urlopen(req, context=self.ctx)
-            new_csrf = resp.headers.get("X-Csrf-Token")
-            if new_csrf:
-                self.csrf = new_csrf
-            return resp.status, json.loads(resp.read().decode())
-        except urllib.error.HTTPError as e:
-            raw = e.read().decode()
-            try:
-                return e.code, json.loads(raw)
-            except json.JSONDecodeError:
-                return e.code, {"raw": raw[:500]}
+            return status, json.loads(text)
+        except json.JSONDecodeError:
+            return status, {"raw": text[:500]}
+
+    def print_stats(self):
+        """One-paragraph summary of connection reuse and call latency."""
+        stats = self.pool.stats()
+        if not stats["requests"]:
+            return
+        print(f"\n  HTTP: {stats['requests']} requests over {stats['connections_opened']} connections "
+              f"({stats['connections_reused']} reuses, {stats['stale_reconnects']} stale reconnects)")
+        for method, lat in stats["latency_ms"].items():
+            print(f"    {method:6s} {lat['count']:4d} calls  p50 {lat['p50']:.1f} ms  "
+                  f"p95 {lat['p95']:.1f} ms  max {lat['max']:.1f} ms")
 
     def login(self):
         """Authenticate with 2FA email flow."""
@@ -380,69 +556,214 @@ class UniFiAPI:
 # Operations
 # ============================================================
 
-def set_reservations(api: UniFiAPI):
-    """Create or update all fixed IP reservations."""
-    print("\n" + "=" * 60)
-    print("SETTING FIXED IP RESERVATIONS")
-    print("=" * 60)
+def plan_reservations(users, reservations=None):
+    """
+    Diff the wanted reservations against the controller's known clients.
 
-    # Fetch all known clients
-    status, resp = api.get("/rest/user")
-    if status != 200:
-        print(f"  ERROR: could not fetch clients ({status})")
-        return
-    users = resp.get("data", [])
+    Returns one step per reservation, in list order:
+      {"action": "create" | "update" | "noop", "name", "mac", "ip",
+       "client_id", "current_ip", "payload"}
+    """
+    if reservations is None:
+        reservations = ALL_RESERVATIONS
     mac_map = {u.get("mac", "").lower(): u for u in users}
-    print(f"  Loaded {len(users)} known clients\n")
-
-    ok = skip = fail = 0
-    fails = []
+    plan = []
 
-    for name, mac, ip in ALL_RESERVATIONS:
+    for name, mac, ip in reservations:
         mac_lower = mac.lower()
         client = mac_map.get(mac_lower)
+        step = {"name": name, "mac": mac_lower, "ip": ip, "client_id": None,
+                "current_ip": "", "payload": None}
 
         if client:
-            cid = client["_id"]
-            cur_ip = client.get("fixed_ip", "")
-            cur_fixed = client.get("use_fixedip", False)
-            cur_name = client.get("name", "")
-
-            if cur_fixed and cur_ip == ip and cur_name == name:
-                print(f"  [SKIP] {name} ({mac_lower}) -- already {ip}")
-                skip += 1
-                continue
-
-            payload = {"noted": True, "name": name, "use_fixedip": True, "fixed_ip": ip}
-            s, r = api.put(f"/rest/user/{cid}", payload)
-            if s == 200:
-                change = f"was {cur_ip}" if cur_ip and cur_ip != ip else "new"
-                print(f"  [OK]   {name} ({mac_lower}) -> {ip} ({change})")
-                ok += 1
+            step["client_id"] = client["_id"]
+            step["current_ip"] = client.get("fixed_ip", "")
+            if (client.get("use_fixedip", False) and step["current_ip"] == ip
+                    and client.get("name", "") == name):
+                step["action"] = "noop"
             else:
-                msg = r.get("meta", {}).get("msg", "") or str(r)[:100]
-                print(f"  [FAIL] {name} ({mac_lower}) -> {ip} -- {s}: {msg}")
-                fail += 1
-                fails.append((name, mac, ip, msg))
+                step["action"] = "update"
+                step["payload"] = {"noted": True, "name": name, "use_fixedip": True, "fixed_ip": ip}
         else:
-            payload = {"mac": mac_lower, "name": name, "noted": True, "use_fixedip": True, "fixed_ip": ip}
-            s, r = api.post("/rest/user", payload)
-            if s == 200:
-                print(f"  [NEW]  {name} ({mac_lower}) -> {ip}")
-                ok += 1
+            step["action"] = "create"
+            step["payload"] = {"mac": mac_lower, "name": name, "noted": True,
+                               "use_fixedip": True, "fixed_ip": ip}
+        plan.append(step)
+
+    return plan
+
+
+def print_plan(plan):
+    """Show what apply would change."""
+    for step in plan:
+        name, mac, ip = step["name"], step["mac"], step["ip"]
+        if step["action"] == "noop":
+            print(f"  [SKIP]   {name} ({mac}) -- already {ip}")
+        elif step["action"] == "update":
+            change = f"was {step['current_ip']}" if step["current_ip"] else "no fixed IP"
+            print(f"  [UPDATE] {name} ({mac}) -> {ip} ({change})")
+        else:
+            print(f"  [CREATE] {name} ({mac}) -> {ip}")
+
+    counts = {a: sum(1 for s in plan if s["action"] == a) for a in ("create", "update", "noop")}
+    print(f"\n  Plan: {counts['create']} to create, {counts['update']} to update, "
+          f"{counts['noop']} already correct")
+
+
+class AdaptiveRateLimiter:
+    """
+    Paces writes shared by all workers.
+
+    Starts unthrottled. A 429 or 5xx doubles the gap between writes (from
+    RESERVATION_BACKOFF_MIN up to RESERVATION_BACKOFF_MAX) and holds every
+    worker for that long; each success shrinks the gap by a quarter until
+    it is gone again.
+    """
+
+    def __init__(self, min_interval=RESERVATION_BACKOFF_MIN, max_interval=RESERVATION_BACKOFF_MAX):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.interval = 0.0
+        self.throttled = 0
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        """Block until this worker may send its next write."""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+    def success(self):
+        with self._lock:
+            self.interval *= 0.75
+            if self.interval < self.min_interval / 4:
+                self.interval = 0.0
+
+    def backoff(self):
+        with self._lock:
+            self.throttled += 1
+            self.interval = min(max(self.interval * 2, self.min_interval), self.max_interval)
+            self._next_slot = max(self._next_slot, time.monotonic() + self.interval)
+
+
+def _retryable(status):
+    return status == 429 or status >= 500
+
+
+def apply_step(api, step, limiter, max_attempts=RESERVATION_MAX_ATTEMPTS):
+    """
+    Send one create/update, retrying throttled and server errors.
+
+    If the connection fails mid-request the write may or may not have
+    landed, so the step is planned again from the controller's current
+    clients before the next attempt (a create that went through becomes a
+    noop, not a duplicate).
+
+    Returns a result dict: the step's name/mac/ip/action plus
+    "ok" (bool), "status" (last HTTP code), "attempts" and "error".
+    """
+    result = {"name": step["name"], "mac": step["mac"], "ip": step["ip"],
+              "action": step["action"], "current_ip": step["current_ip"],
+              "ok": False, "status": None, "attempts": 0, "error": ""}
+
+    for attempt in range(1, max_attempts + 1):
+        limiter.wait()
+        try:
+            if step["action"] == "update":
+                s, r = api.put(f"/rest/user/{step['client_id']}", step["payload"])
             else:
-                msg = r.get("meta", {}).get("msg", "") or str(r)[:100]
-                print(f"  [FAIL] {name} ({mac_lower}) -> {ip} -- {s}: {msg}")
-                fail += 1
-                fails.append((name, mac, ip, msg))
+                s, r = api.post("/rest/user", step["payload"])
+        except (OSError, http.client.HTTPException) as e:
+            result["status"], result["attempts"] = None, attempt
+            result["error"] = f"connection error: {e}"
+            step = _replan_step(api, step)
+            if step["action"] == "noop":
+                result["ok"] = True
+                return result
+            continue
+        result["status"], result["attempts"] = s, attempt
 
-        time.sleep(0.15)
+        if s == 200:
+            limiter.success()
+            result["ok"] = True
+            return result
+        result["error"] = r.get("meta", {}).get("msg", "") or str(r)[:100]
+        if not _retryable(s):
+            return result
+        limiter.backoff()
+
+    return result
+
+
+def _replan_step(api, step):
+    """The step re-planned against the controller's clients now (unchanged if that fails)."""
+    try:
+        status, resp = api.get("/rest/user")
+    except (OSError, http.client.HTTPException):
+        return step
+    if status != 200:
+        return step
+    return plan_reservations(resp.get("data", []), [(step["name"], step["mac"], step["ip"])])[0]
+
+
+def apply_reservation_plan(api, plan, workers=RESERVATION_WORKERS, limiter=None):
+    """Apply every create/update in the plan concurrently; results keep plan order."""
+    limiter = limiter or AdaptiveRateLimiter()
+    changes = [step for step in plan if step["action"] != "noop"]
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        return list(pool.map(lambda step: apply_step(api, step, limiter), changes))
+
+
+def print_apply_report(results, elapsed, limiter):
+    for r in results:
+        name, mac, ip = r["name"], r["mac"], r["ip"]
+        retries = f" after {r['attempts']} attempts" if r["attempts"] > 1 else ""
+        if not r["ok"]:
+            print(f"  [FAIL] {name} ({mac}) -> {ip} -- {r['status']}: {r['error']}{retries}")
+        elif r["action"] == "create":
+            print(f"  [NEW]  {name} ({mac}) -> {ip}{retries}")
+        else:
+            change = f"was {r['current_ip']}" if r["current_ip"] and r["current_ip"] != ip else "new"
+            print(f"  [OK]   {name} ({mac}) -> {ip} ({change}){retries}")
 
-    print(f"\n  Results: {ok} set, {skip} skipped, {fail} failed")
-    if fails:
+    failed = [r for r in results if not r["ok"]]
+    print(f"\n  Applied {len(results) - len(failed)}/{len(results)} changes in {elapsed:.1f}s"
+          f" ({limiter.throttled} throttled responses)")
+    if failed:
         print(f"  Failed:")
-        for n, m, i, e in fails:
-            print(f"    {n} ({m}) -> {i}: {e}")
+        for r in failed:
+            print(f"    {r['name']} ({r['mac']}) -> {r['ip']}: {r['error']}")
+
+
+def set_reservations(api: UniFiAPI, plan_only: bool = False, workers: int = RESERVATION_WORKERS):
+    """Create or update all fixed IP reservations (plan first, then apply)."""
+    print("\n" + "=" * 60)
+    print("SETTING FIXED IP RESERVATIONS")
+    print("=" * 60)
+
+    # Fetch all known clients
+    status, resp = api.get("/rest/user")
+    if status != 200:
+        print(f"  ERROR: could not fetch clients ({status})")
+        return None
+    users = resp.get("data", [])
+    print(f"  Loaded {len(users)} known clients\n")
+
+    plan = plan_reservations(users)
+    print_plan(plan)
+    if plan_only or all(step["action"] == "noop" for step in plan):
+        return plan
+
+    print(f"\n  Applying with {workers} workers...\n")
+    limiter = AdaptiveRateLimiter()
+    start = time.monotonic()
+    results = apply_reservation_plan(api, plan, workers, limiter)
+    print_apply_report(results, time.monotonic() - start, limiter)
+    return results
 
 
 def force_renew(api: UniFiAPI):
@@ -679,6 +1000,10 @@ def main():
     )
     parser.add_argument("--verify", action="store_true", help="Only verify current IPs")
     parser.add_argument("--reserve-only", action="store_true", help="Set reservations without forcing renewal")
+    parser.add_argument("--plan", action="store_true",
+                        help="Show reservation creates/updates/no-ops without changing anything")
+    parser.add_argument("--workers", type=int, default=RESERVATION_WORKERS,
+                        help=f"Concurrent reservation writes (default {RESERVATION_WORKERS})")
     parser.add_argument("--renew-only", action="store_true", help="Force renewal without changing reservations")
     parser.add_argument("--poe-only", action="store_true", help="Only PoE-cycle touch panels")
     parser.add_argument("--restart-switches", action="store_true",
@@ -694,8 +1019,10 @@ def main():
 
     if args.verify:
         verify(api)
+    elif args.plan:
+        set_reservations(api, plan_only=True)
     elif args.reserve_only:
-        set_reservations(api)
+        set_reservations(api, workers=args.workers)
     elif args.renew_only:
         force_renew(api)
         verify(api, wait_secs=120)
@@ -718,10 +1045,12 @@ def main():
             verify(api, wait_secs=45)
     else:
         # Full run
-        set_reservations(api)
+        set_reservations(api, workers=args.workers)
         force_renew(api)
         verify(api, wait_secs=120)
 
+    api.print_stats()
+    api.pool.close()
     print("\nDone.")
 
 
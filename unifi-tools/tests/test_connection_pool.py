@@ -0,0 +1,153 @@
+"""Test the keep-alive connection pool behind UniFiAPI."""
+
+import http.client
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import dhcp_force_renew
+from dhcp_force_renew import ConnectionPool, UniFiAPI
+
+pytestmark = pytest.mark.unit
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    """
+    Echoes the request as JSON over HTTP/1.1. /close answers with
+    Connection: close; /drop keeps the connection advertised but closes it;
+    /hangup reads the request and closes without answering, the first time
+    each path is seen. Every request is counted in `seen`.
+    """
+    protocol_version = "HTTP/1.1"
+    seen = None  # {(method, path): count}, set per server
+
+    def _reply(self):
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length)) if length else None
+        key = (self.command, self.path)
+        self.seen[key] = self.seen.get(key, 0) + 1
+        if "/hangup" in self.path and self.seen[key] == 1:
+            self.close_connection = True
+            return
+        body = json.dumps({"method": self.command, "path": self.path, "data": payload}).encode()
+        self.send_response(404 if self.path.endswith("/missing") else 200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("X-Csrf-Token", "csrf-from-server")
+        if self.path.endswith("/close"):
+            self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(body)
+        if self.path.endswith("/drop"):
+            # Hang up silently after answering, as an idle timeout would
+            self.close_connection = True
+
+    do_GET = do_PUT = do_POST = _reply
+
+    def log_message(self, format, *args):
+        pass
+
+
+class Server(str):
+    """The server's base URL, carrying the requests it has seen."""
+
+    def __new__(cls, url, seen):
+        server = super().__new__(cls, url)
+        server.seen = seen
+        return server
+
+
+@pytest.fixture
+def server():
+    handler = type("Handler", (KeepAliveHandler,), {"seen": {}})
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    httpd.daemon_threads = True
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield Server(f"http://127.0.0.1:{httpd.server_address[1]}", handler.seen)
+    httpd.shutdown()
+    httpd.server_close()
+
+
+class TestConnectionPool:
+
+    def test_sequential_calls_reuse_one_connection(self, server):
+        pool = ConnectionPool(server)
+        for i in range(10):
+            status, _, body = pool.request("GET", f"/item/{i}")
+            assert status == 200
+            assert json.loads(body)["path"] == f"/item/{i}"
+        stats = pool.stats()
+        assert stats["requests"] == 10
+        assert stats["connections_opened"] == 1
+        assert stats["connections_reused"] == 9
+        assert stats["latency_ms"]["GET"]["count"] == 10
+        pool.close()
+
+    def test_concurrent_calls_stay_within_pool(self, server):
+        pool = ConnectionPool(server, size=4)
+        with ThreadPoolExecutor(max_workers=4) as workers:
+            statuses = list(workers.map(lambda i: pool.request("POST", "/x", b"{}")[0], range(40)))
+        assert statuses == [200] * 40
+        stats = pool.stats()
+        assert stats["connections_opened"] <= 4
+        assert stats["connections_opened"] + stats["connections_reused"] == 40
+        pool.close()
+
+    def test_connection_close_is_not_pooled(self, server):
+        pool = ConnectionPool(server)
+        pool.request("GET", "/close")
+        pool.request("GET", "/close")
+        assert pool.stats()["connections_opened"] == 2
+        assert pool.stats()["idle"] == 0
+
+    def test_stale_connection_is_replaced(self, server):
+        pool = ConnectionPool(server)
+        pool.request("GET", "/drop")
+        time.sleep(0.05)
+        status, _, _ = pool.request("GET", "/second")
+        assert status == 200
+        assert pool.stats()["stale_reconnects"] == 1
+
+    def test_lost_response_to_idempotent_request_is_resent(self, server):
+        pool = ConnectionPool(server)
+        pool.request("GET", "/a")
+        status, _, body = pool.request("PUT", "/hangup/put", b"{}")
+        assert status == 200
+        assert server.seen[("PUT", "/hangup/put")] == 2
+        assert pool.stats()["stale_reconnects"] == 1
+
+    def test_lost_response_to_post_is_not_resent(self, server):
+        pool = ConnectionPool(server)
+        pool.request("GET", "/a")
+        with pytest.raises(http.client.RemoteDisconnected):
+            pool.request("POST", "/hangup/post", b"{}")
+        assert server.seen[("POST", "/hangup/post")] == 1
+        assert pool.stats()["stale_reconnects"] == 0
+
+    def test_idle_timeout_drops_connection(self, server):
+        pool = ConnectionPool(server, idle_timeout=0)
+        pool.request("GET", "/a")
+        pool.request("GET", "/b")
+        assert pool.stats()["connections_opened"] == 2
+
+
+class TestUniFiAPI:
+
+    def test_requests_go_through_pool(self, server, monkeypatch):
+        monkeypatch.setattr(dhcp_force_renew, "BASE_URL", server)
+        api = UniFiAPI()
+        api.token = "tok"
+        status, body = api.put("/rest/user/abc", {"fixed_ip": "192.168.1.10"})
+        assert status == 200
+        assert body["method"] == "PUT"
+        assert body["path"] == "/proxy/network/api/s/default/rest/user/abc"
+        assert body["data"] == {"fixed_ip": "192.168.1.10"}
+        assert api.csrf == "csrf-from-server"
+
+        status, _ = api.get("/missing")
+        assert status == 404
+        assert api.pool.stats()["connections_opened"] == 1
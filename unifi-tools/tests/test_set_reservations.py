@@ -0,0 +1,185 @@
+"""Test reservation sync planning and concurrent apply."""
+
+import http.client
+import threading
+
+import pytest
+import dhcp_force_renew
+from dhcp_force_renew import (
+    AdaptiveRateLimiter, apply_reservation_plan, plan_reservations, set_reservations,
+)
+
+pytestmark = pytest.mark.unit
+
+LOST = object()
+
+WANTED = [
+    ("TP-Kitchen", "aa:bb:cc:00:00:01", "192.168.1.10"),
+    ("TP-Lounge", "aa:bb:cc:00:00:02", "192.168.1.11"),
+    ("SNS-Bar", "aa:bb:cc:00:00:03", "192.168.0.122"),
+]
+
+
+class FakeAPI:
+    """
+    Records writes; answers from a per-MAC queue of status codes (default 200).
+    An exception in the queue is raised instead; LOST applies the write and
+    then drops the connection before answering.
+    """
+
+    def __init__(self, users=(), responses=None):
+        self.users = list(users)
+        self.responses = responses or {}
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def get(self, path):
+        return 200, {"data": self.users}
+
+    def _answer(self, method, path, data):
+        mac = data.get("mac") or next(u["mac"] for u in self.users if path.endswith(u["_id"]))
+        with self.lock:
+            self.calls.append((method, path, data))
+            queue = self.responses.get(mac, [])
+            status = queue.pop(0) if queue else 200
+            if status is LOST:
+                self._land(method, path, data)
+                raise http.client.RemoteDisconnected("Remote end closed connection without response")
+            if isinstance(status, Exception):
+                raise status
+        return status, ({"data": [data]} if status == 200 else {"meta": {"msg": f"error {status}"}})
+
+    def _land(self, method, path, data):
+        if method == "POST":
+            self.users.append(dict(data, _id=f"new-{data['mac']}"))
+        else:
+            next(u for u in self.users if path.endswith(u["_id"])).update(data)
+
+    def put(self, path, data):
+        return self._answer("PUT", path, data)
+
+    def post(self, path, data):
+        return self._answer("POST", path, data)
+
+
+@pytest.fixture
+def fast_limiter():
+    return AdaptiveRateLimiter(min_interval=0.001, max_interval=0.005)
+
+
+class TestPlan:
+
+    def test_actions(self):
+        users = [
+            {"_id": "c1", "mac": "AA:BB:CC:00:00:01", "name": "TP-Kitchen",
+             "use_fixedip": True, "fixed_ip": "192.168.1.10"},
+            {"_id": "c2", "mac": "aa:bb:cc:00:00:02", "name": "TP-Lounge",
+             "use_fixedip": True, "fixed_ip": "192.168.1.99"},
+        ]
+        plan = plan_reservations(users, WANTED)
+        assert [s["action"] for s in plan] == ["noop", "update", "create"]
+        assert plan[1]["client_id"] == "c2"
+        assert plan[1]["current_ip"] == "192.168.1.99"
+        assert plan[1]["payload"]["fixed_ip"] == "192.168.1.11"
+        assert plan[2]["payload"]["mac"] == "aa:bb:cc:00:00:03"
+
+    def test_name_change_is_update(self):
+        users = [{"_id": "c1", "mac": "aa:bb:cc:00:00:01", "name": "old",
+                  "use_fixedip": True, "fixed_ip": "192.168.1.10"}]
+        assert plan_reservations(users, WANTED[:1])[0]["action"] == "update"
+
+    def test_defaults_to_all_reservations(self):
+        plan = plan_reservations([])
+        assert len(plan) == len(dhcp_force_renew.ALL_RESERVATIONS)
+        assert {s["action"] for s in plan} == {"create"}
+
+
+class TestApply:
+
+    def test_applies_only_changes_in_plan_order(self, fast_limiter):
+        api = FakeAPI()
+        plan = plan_reservations([], WANTED)
+        plan[1]["action"] = "noop"
+        results = apply_reservation_plan(api, plan, workers=3, limiter=fast_limiter)
+        assert [r["name"] for r in results] == ["TP-Kitchen", "SNS-Bar"]
+        assert all(r["ok"] and r["attempts"] == 1 for r in results)
+        assert len(api.calls) == 2
+
+    def test_retries_throttled_and_server_errors(self, fast_limiter):
+        api = FakeAPI(responses={"aa:bb:cc:00:00:01": [429, 503]})
+        results = apply_reservation_plan(api, plan_reservations([], WANTED), workers=2, limiter=fast_limiter)
+        kitchen = results[0]
+        assert kitchen["ok"] and kitchen["attempts"] == 3
+        assert fast_limiter.throttled == 2
+
+    def test_client_errors_fail_without_retry(self, fast_limiter):
+        api = FakeAPI(responses={"aa:bb:cc:00:00:02": [400]})
+        results = apply_reservation_plan(api, plan_reservations([], WANTED), limiter=fast_limiter)
+        lounge = results[1]
+        assert not lounge["ok"]
+        assert lounge["attempts"] == 1
+        assert lounge["status"] == 400
+        assert lounge["error"] == "error 400"
+
+    def test_gives_up_after_max_attempts(self, fast_limiter):
+        api = FakeAPI(responses={"aa:bb:cc:00:00:03": [500] * 10})
+        results = apply_reservation_plan(api, plan_reservations([], WANTED), limiter=fast_limiter)
+        assert not results[2]["ok"]
+        assert results[2]["attempts"] == dhcp_force_renew.RESERVATION_MAX_ATTEMPTS
+
+    def test_lost_create_is_rediffed_not_duplicated(self, fast_limiter):
+        api = FakeAPI(responses={"aa:bb:cc:00:00:01": [LOST]})
+        results = apply_reservation_plan(api, plan_reservations([], WANTED), limiter=fast_limiter)
+        kitchen = results[0]
+        assert kitchen["ok"]
+        assert kitchen["attempts"] == 1
+        assert [c[0] for c in api.calls if c[2].get("mac") == "aa:bb:cc:00:00:01"] == ["POST"]
+
+    def test_create_that_never_landed_is_sent_again(self, fast_limiter):
+        api = FakeAPI(responses={"aa:bb:cc:00:00:02": [ConnectionResetError("reset")]})
+        results = apply_reservation_plan(api, plan_reservations([], WANTED), limiter=fast_limiter)
+        lounge = results[1]
+        assert lounge["ok"]
+        assert lounge["attempts"] == 2
+        assert sum(1 for c in api.calls if c[2].get("mac") == "aa:bb:cc:00:00:02") == 2
+
+    def test_lost_update_is_rediffed(self, fast_limiter):
+        users = [{"_id": "c1", "mac": "aa:bb:cc:00:00:01", "name": "TP-Kitchen",
+                  "use_fixedip": True, "fixed_ip": "192.168.1.99"}]
+        api = FakeAPI(users, responses={"aa:bb:cc:00:00:01": [LOST]})
+        results = apply_reservation_plan(api, plan_reservations(users, WANTED[:1]), limiter=fast_limiter)
+        assert results[0]["ok"]
+        assert len(api.calls) == 1
+
+    def test_connection_errors_give_up_after_max_attempts(self, fast_limiter):
+        api = FakeAPI(responses={"aa:bb:cc:00:00:03": [BrokenPipeError("pipe")] * 10})
+        results = apply_reservation_plan(api, plan_reservations([], WANTED), limiter=fast_limiter)
+        bar = results[2]
+        assert not bar["ok"]
+        assert bar["attempts"] == dhcp_force_renew.RESERVATION_MAX_ATTEMPTS
+        assert bar["status"] is None
+        assert bar["error"] == "connection error: pipe"
+
+
+class TestRateLimiter:
+
+    def test_backoff_then_recovers(self):
+        limiter = AdaptiveRateLimiter(min_interval=0.2, max_interval=1.0)
+        limiter.backoff()
+        assert limiter.interval == 0.2
+        for _ in range(3):
+            limiter.backoff()
+        assert limiter.interval == 1.0
+        for _ in range(20):
+            limiter.success()
+        assert limiter.interval == 0.0
+
+
+class TestSetReservations:
+
+    def test_plan_only_writes_nothing(self, monkeypatch):
+        monkeypatch.setattr(dhcp_force_renew, "ALL_RESERVATIONS", WANTED)
+        api = FakeAPI()
+        plan = set_reservations(api, plan_only=True)
+        assert [s["action"] for s in plan] == ["create"] * 3
+        assert api.calls == []